@@ -0,0 +1,44 @@
+"""
+Arquivamento de consultas antigas em `ArchivedAppointment`.
+
+As consultas são movidas em lotes, do mais antigo para o mais recente; cada
+lote é copiado e removido da tabela principal na mesma transação, então uma
+interrupção não perde nem duplica linhas e basta rodar de novo.
+"""
+from django.db import transaction
+
+from .models import Appointment, ArchivedAppointment
+from .signals import appointments_bulk_changed
+
+ARCHIVED_COLUMNS = ("id", "date", "professional_id", "created_at", "updated_at")
+
+
+def archive_before(cutoff, batch_size=5000, progress=None):
+    """
+    Move as consultas com `date < cutoff` para o arquivo.
+
+    `progress(total)` é chamado após cada lote. Retorna o total movido.
+    """
+    total = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                Appointment.objects.filter(date__lt=cutoff)
+                .order_by("date", "id")
+                .values_list(*ARCHIVED_COLUMNS)[:batch_size]
+            )
+            if not rows:
+                break
+            ArchivedAppointment.objects.bulk_create(
+                ArchivedAppointment(**dict(zip(ARCHIVED_COLUMNS, row)))
+                for row in rows
+            )
+            Appointment.objects.filter(id__in=[row[0] for row in rows]).delete()
+
+        total += len(rows)
+        if progress:
+            progress(total)
+
+    if total:
+        appointments_bulk_changed.send(sender=Appointment)
+    return total
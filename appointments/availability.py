@@ -0,0 +1,126 @@
+"""
+Cálculo de horários livres na agenda dos profissionais.
+
+Cada dia de cada profissional é representado por um bitmap inteiro em que
+o bit `i` indica que o slot `i` (a partir do horário de abertura) está
+ocupado. Todas as consultas do período são carregadas em uma única
+consulta por faixa de datas, mesmo para vários profissionais.
+"""
+from bisect import bisect_right
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Appointment
+
+
+def slot_labels(slot_minutes):
+    """Retorna os rótulos `HH:MM` dos slots de um dia de atendimento."""
+    opening = settings.APPOINTMENT_OPENING_HOUR * 60
+    closing = settings.APPOINTMENT_CLOSING_HOUR * 60
+    return [
+        f"{minutes // 60:02d}:{minutes % 60:02d}"
+        for minutes in range(opening, closing - slot_minutes + 1, slot_minutes)
+    ]
+
+
+def busy_bitmaps(professional_ids, start_date, end_date, slot_minutes):
+    """
+    Retorna `{(professional_id, dia): bitmap}` com os slots ocupados.
+
+    Uma consulta ocupa `APPOINTMENT_DURATION_MINUTES` a partir do seu
+    horário e bloqueia todos os slots com os quais se sobrepõe.
+    """
+    tz = timezone.get_current_timezone()
+    duration = settings.APPOINTMENT_DURATION_MINUTES * 60
+    slot_seconds = slot_minutes * 60
+    slots_per_day = len(slot_labels(slot_minutes))
+    day_length = slots_per_day * slot_seconds
+
+    # Horários de abertura de cada dia como timestamps, para localizar o dia
+    # de cada consulta por bisect em vez de converter fusos linha a linha.
+    days = [
+        start_date + timedelta(days=offset)
+        for offset in range((end_date - start_date).days + 1)
+    ]
+    openings = [
+        timezone.make_aware(
+            datetime.combine(day, time(settings.APPOINTMENT_OPENING_HOUR)), tz
+        ).timestamp()
+        for day in days
+    ]
+
+    appointments = (
+        Appointment.objects.filter(
+            professional_id__in=professional_ids,
+            date__gt=datetime.fromtimestamp(openings[0] - duration, tz),
+            date__lt=datetime.fromtimestamp(openings[-1] + day_length, tz),
+        )
+        .order_by()
+        .values_list("professional_id", "date")
+    )
+
+    bitmaps = {}
+    for professional_id, date in appointments:
+        starts_at = date.timestamp()
+        index = bisect_right(openings, starts_at + duration) - 1
+        if index < 0:
+            continue
+        offset = starts_at - openings[index]
+        if offset >= day_length:
+            continue
+
+        first = max(0, int(offset // slot_seconds))
+        last = min(slots_per_day, -int(-(offset + duration) // slot_seconds))
+        key = (professional_id, days[index])
+        bitmaps[key] = bitmaps.get(key, 0) | (((1 << (last - first)) - 1) << first)
+
+    return bitmaps
+
+
+def compute_availability(professional_ids, start_date, end_date, slot_minutes):
+    """
+    Calcula os horários livres de cada profissional entre duas datas.
+
+    Retorna `{professional_id: [{"date": ..., "slots": [...]}, ...]}`,
+    ignorando slots que já começaram.
+    """
+    tz = timezone.get_current_timezone()
+    labels = slot_labels(slot_minutes)
+    bitmaps = busy_bitmaps(professional_ids, start_date, end_date, slot_minutes)
+
+    now = timezone.localtime(timezone.now(), tz)
+    days = []
+    day = start_date
+    while day <= end_date:
+        if day > now.date():
+            elapsed = 0
+        elif day < now.date():
+            elapsed = len(labels)
+        else:
+            minutes = (
+                now.hour * 60 + now.minute
+                - settings.APPOINTMENT_OPENING_HOUR * 60
+            )
+            elapsed = min(len(labels), max(0, -(-minutes // slot_minutes)))
+        # Slots já iniciados contam como ocupados.
+        days.append((day, day.isoformat(), (1 << elapsed) - 1))
+        day += timedelta(days=1)
+
+    free_slots_cache = {}
+    availability = {}
+    for professional_id in professional_ids:
+        schedule = []
+        for day, day_label, past_mask in days:
+            mask = bitmaps.get((professional_id, day), 0) | past_mask
+            if mask not in free_slots_cache:
+                free_slots_cache[mask] = [
+                    label
+                    for index, label in enumerate(labels)
+                    if not mask >> index & 1
+                ]
+            schedule.append({"date": day_label, "slots": free_slots_cache[mask]})
+        availability[professional_id] = schedule
+
+    return availability
@@ -0,0 +1,196 @@
+"""
+Criação, atualização e exclusão de consultas em lote.
+
+Todo o lote é validado com um número fixo de consultas ao banco,
+independente do tamanho: uma para as consultas referenciadas por id, uma
+para os profissionais fora do cache de payloads e uma para os horários já
+ocupados. As escritas são
+feitas com `bulk_create`/`bulk_update` em blocos de `chunk_size`.
+"""
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+
+from professionals.cache import professional_cache
+
+from .models import DOUBLE_BOOKING_MESSAGE, Appointment
+from .serializers import AppointmentBulkItemSerializer
+from .signals import appointments_bulk_changed
+
+PROFESSIONAL_NOT_FOUND_MESSAGE = "Profissional não encontrado."
+APPOINTMENT_NOT_FOUND_MESSAGE = "Consulta não encontrada."
+DUPLICATED_ID_MESSAGE = "Esta consulta aparece mais de uma vez no lote."
+CONCURRENT_WRITE_MESSAGE = (
+    "O lote conflitou com outra escrita simultânea; nada foi gravado."
+)
+
+
+def _result(index, status_code, pk=None, errors=None):
+    result = {"index": index, "status": status_code, "id": pk}
+    if errors:
+        result["errors"] = errors
+    return result
+
+
+def apply_bulk_operations(items, chunk_size=None):
+    """
+    Aplica as operações do lote e retorna um resultado por item.
+
+    Itens inválidos ou em conflito são reportados e ignorados; os demais
+    são gravados em uma única transação.
+    """
+    chunk_size = chunk_size or settings.APPOINTMENT_BULK_CHUNK_SIZE
+    results = [None] * len(items)
+    operations = []
+
+    for index, item in enumerate(items):
+        serializer = AppointmentBulkItemSerializer(data=item)
+        if serializer.is_valid():
+            operations.append((index, serializer.validated_data))
+        else:
+            results[index] = _result(
+                index, status.HTTP_400_BAD_REQUEST, errors=serializer.errors
+            )
+
+    # Consultas referenciadas por id (update/delete), em uma consulta
+    referenced_ids = {data["id"] for _, data in operations if "id" in data}
+    existing = Appointment.objects.only("id", "professional_id", "date").in_bulk(
+        referenced_ids
+    )
+
+    # Profissionais referenciados, do cache (os ausentes em uma consulta)
+    professional_ids = {
+        data["professional"] for _, data in operations if "professional" in data
+    }
+    valid_professionals = professional_cache.existing(professional_ids)
+
+    pending = []
+    seen_ids = set()
+    for index, data in operations:
+        pk = data.get("id")
+        if pk is not None:
+            if pk not in existing:
+                results[index] = _result(
+                    index,
+                    status.HTTP_404_NOT_FOUND,
+                    pk,
+                    {"id": [APPOINTMENT_NOT_FOUND_MESSAGE]},
+                )
+                continue
+            if pk in seen_ids:
+                results[index] = _result(
+                    index,
+                    status.HTTP_400_BAD_REQUEST,
+                    pk,
+                    {"id": [DUPLICATED_ID_MESSAGE]},
+                )
+                continue
+            seen_ids.add(pk)
+
+        professional = data.get("professional")
+        if professional is not None and professional not in valid_professionals:
+            results[index] = _result(
+                index,
+                status.HTTP_400_BAD_REQUEST,
+                pk,
+                {"professional": [PROFESSIONAL_NOT_FOUND_MESSAGE]},
+            )
+            continue
+        pending.append((index, data))
+
+    # Horário final de cada create/update
+    targets = {}
+    for index, data in pending:
+        if data["op"] == "delete":
+            continue
+        current = existing.get(data.get("id"))
+        targets[index] = (
+            data.get("professional", current and current.professional_id),
+            data.get("date", current and current.date),
+        )
+
+    # Horários já ocupados no banco, em uma única consulta por conjunto
+    occupied = {}
+    if targets:
+        rows = Appointment.objects.filter(
+            professional_id__in={slot[0] for slot in targets.values()},
+            date__in={slot[1] for slot in targets.values()},
+        ).values_list("id", "professional_id", "date")
+        occupied = {(professional_id, date): pk for pk, professional_id, date in rows}
+
+    # Só exclusões liberam horários: as atualizações são gravadas em um
+    # único UPDATE, em que o índice único é verificado linha a linha.
+    released = {data["id"] for _, data in pending if data["op"] == "delete"}
+
+    to_create, to_update, to_delete = [], [], []
+    claimed = set()
+    now = timezone.now()
+    # Atualizações reivindicam seus horários antes das criações
+    for index, data in sorted(pending, key=lambda op: op[1]["op"] != "update"):
+        pk = data.get("id")
+        if data["op"] == "delete":
+            to_delete.append((index, pk))
+            continue
+
+        slot = targets[index]
+        holder = occupied.get(slot)
+        if slot in claimed or (holder not in (None, pk) and holder not in released):
+            results[index] = _result(
+                index,
+                status.HTTP_400_BAD_REQUEST,
+                pk,
+                {"date": [DOUBLE_BOOKING_MESSAGE]},
+            )
+            continue
+        claimed.add(slot)
+
+        if data["op"] == "create":
+            to_create.append(
+                (index, Appointment(professional_id=slot[0], date=slot[1]))
+            )
+        else:
+            appointment = existing[pk]
+            appointment.professional_id, appointment.date = slot
+            appointment.updated_at = now
+            to_update.append((index, appointment))
+
+    try:
+        with transaction.atomic():
+            if to_delete:
+                Appointment.objects.filter(
+                    id__in=[pk for _, pk in to_delete]
+                ).delete()
+            if to_update:
+                Appointment.objects.bulk_update(
+                    [appointment for _, appointment in to_update],
+                    ["professional", "date", "updated_at"],
+                    batch_size=chunk_size,
+                )
+            if to_create:
+                Appointment.objects.bulk_create(
+                    [appointment for _, appointment in to_create],
+                    batch_size=chunk_size,
+                )
+    except IntegrityError:
+        errors = {"non_field_errors": [CONCURRENT_WRITE_MESSAGE]}
+        for index, pk in to_delete:
+            results[index] = _result(index, status.HTTP_409_CONFLICT, pk, errors)
+        for index, appointment in to_update:
+            results[index] = _result(
+                index, status.HTTP_409_CONFLICT, appointment.pk, errors
+            )
+        for index, _ in to_create:
+            results[index] = _result(index, status.HTTP_409_CONFLICT, None, errors)
+        return results
+
+    for index, pk in to_delete:
+        results[index] = _result(index, status.HTTP_204_NO_CONTENT, pk)
+    for index, appointment in to_update:
+        results[index] = _result(index, status.HTTP_200_OK, appointment.pk)
+    for index, appointment in to_create:
+        results[index] = _result(index, status.HTTP_201_CREATED, appointment.pk)
+
+    if to_delete or to_update or to_create:
+        appointments_bulk_changed.send(sender=Appointment)
+    return results
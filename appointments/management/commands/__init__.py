@@ -0,0 +1,3 @@
+"""
+Appointments commands module.
+"""
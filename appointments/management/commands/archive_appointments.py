@@ -0,0 +1,52 @@
+"""
+Command for moving past appointments to the archive table.
+"""
+
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from appointments.archive import archive_before
+
+
+class Command(BaseCommand):
+    help = (
+        "Move appointments older than the given number of days to the "
+        "archive table, in batches. Archived appointments are still listed "
+        "when start_date/date filters reach back into them"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than",
+            type=int,
+            required=True,
+            metavar="DAYS",
+            help="Archive appointments dated more than this many days ago",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Appointments moved per transaction",
+        )
+
+    def handle(self, *args, **options):
+        if options["older_than"] < 0:
+            raise CommandError("--older-than não pode ser negativo.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size deve ser maior que zero.")
+
+        cutoff = timezone.now() - timedelta(days=options["older_than"])
+        total = archive_before(
+            cutoff,
+            batch_size=options["batch_size"],
+            progress=lambda moved: self.stdout.write(
+                f"{moved} consultas arquivadas..."
+            ),
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Arquivamento concluído: {total} consultas anteriores a "
+                f"{timezone.localtime(cutoff):%d/%m/%Y %H:%M}."
+            )
+        )
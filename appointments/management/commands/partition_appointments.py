@@ -0,0 +1,73 @@
+"""
+Command for partitioning the appointments table by month (PostgreSQL).
+"""
+
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from appointments import partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Convert the appointments table to monthly range partitions on "
+        "PostgreSQL and create the partitions for the coming months. "
+        "Idempotent: schedule it (e.g. daily) to keep future partitions ready"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=3,
+            help="Create partitions up to this many months after the current one",
+        )
+        parser.add_argument(
+            "--detach-before",
+            metavar="YYYY-MM",
+            help=(
+                "Detach the partitions of months before this one; the "
+                "detached tables are kept for archiving or dropping"
+            ),
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("O particionamento requer PostgreSQL.")
+        if options["months_ahead"] < 0:
+            raise CommandError("--months-ahead não pode ser negativo.")
+
+        detach_before = None
+        if options["detach_before"]:
+            try:
+                detach_before = datetime.strptime(
+                    options["detach_before"], "%Y-%m"
+                ).date()
+            except ValueError:
+                raise CommandError("--detach-before deve estar no formato AAAA-MM.")
+
+        if not partitions.is_partitioned():
+            self.stdout.write("Convertendo a tabela de consultas...")
+            try:
+                partitions.convert()
+            except partitions.SchemaMismatch as error:
+                raise CommandError(str(error))
+            self.stdout.write(
+                self.style.SUCCESS("Tabela de consultas particionada por mês.")
+            )
+
+        today = timezone.now()
+        created = partitions.ensure_partitions(
+            today, partitions.add_months(today, options["months_ahead"])
+        )
+        for month in created:
+            self.stdout.write(f"Partição criada: {partitions.partition_name(month)}")
+
+        if detach_before is not None:
+            for month in partitions.detach_partitions(detach_before):
+                self.stdout.write(
+                    f"Partição desanexada: {partitions.partition_name(month)}"
+                )
+
+        self.stdout.write(self.style.SUCCESS("Partições atualizadas."))
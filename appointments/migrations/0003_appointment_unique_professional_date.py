@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0002_remove_appointment_notes'),
+        ('professionals', '0005_professional_specialty'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='appointment',
+            constraint=models.UniqueConstraint(fields=('professional', 'date'), name='unique_appointment_professional_date', violation_error_message='Já existe uma consulta marcada para este profissional neste horário.'),
+        ),
+    ]
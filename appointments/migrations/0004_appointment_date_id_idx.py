@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0003_appointment_unique_professional_date'),
+        ('professionals', '0006_professional_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['date', 'id'], name='appointment_date_id_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0004_appointment_date_id_idx'),
+        ('professionals', '0006_professional_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedAppointment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('date', models.DateTimeField(verbose_name='Data da Consulta')),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('professional', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_appointments', to='professionals.professional', verbose_name='Profissional')),
+            ],
+            options={
+                'verbose_name': 'Consulta arquivada',
+                'verbose_name_plural': 'Consultas arquivadas',
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['date', 'id'], name='archived_appointment_date_idx')],
+            },
+        ),
+    ]
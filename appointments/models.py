@@ -1,7 +1,27 @@
 from django.db import models
-from django.core.exceptions import ValidationError
 from professionals.models import Professional
 
+DOUBLE_BOOKING_MESSAGE = (
+    "Já existe uma consulta marcada para este profissional neste horário."
+)
+DOUBLE_BOOKING_CONSTRAINT = "unique_appointment_professional_date"
+
+
+def is_double_booking(error):
+    """
+    Se o `IntegrityError` veio da constraint única de (profissional, data).
+
+    O PostgreSQL informa o nome da constraint; o SQLite, só as colunas.
+    """
+    diag = getattr(error.__cause__, "diag", None)
+    if diag is not None:
+        return diag.constraint_name == DOUBLE_BOOKING_CONSTRAINT
+    message = str(error)
+    return message.startswith("UNIQUE constraint failed") and all(
+        f"{Appointment._meta.db_table}.{column}" in message
+        for column in ("professional_id", "date")
+    )
+
 
 class Appointment(models.Model):
     """
@@ -22,24 +42,54 @@ class Appointment(models.Model):
         verbose_name = "Consulta"
         verbose_name_plural = "Consultas"
         ordering = ["-date"]
+        constraints = [
+            # O índice único garante no banco que o profissional não tenha
+            # duas consultas no mesmo horário, inclusive sob concorrência.
+            models.UniqueConstraint(
+                fields=["professional", "date"],
+                name=DOUBLE_BOOKING_CONSTRAINT,
+                violation_error_message=DOUBLE_BOOKING_MESSAGE,
+            ),
+        ]
+        # O índice da constraint acima já atende aos filtros por
+        # profissional e período; este atende à ordenação padrão, ao cursor
+        # `(date, id)` e aos filtros só por período.
+        indexes = [
+            models.Index(fields=["date", "id"], name="appointment_date_id_idx"),
+        ]
 
     def __str__(self):
         nome = self.professional.preferred_name
         data = self.date.strftime("%d/%m/%Y %H:%M")
         return f"Consulta com {nome} em {data}"
 
-    def clean(self):
-        """Valida se já existe consulta para este profissional neste horário"""
-        if self.date and self.professional:
-            # Verificar se já existe uma consulta para este profissional neste horário
-            overlapping_appointments = Appointment.objects.filter(
-                professional=self.professional, date=self.date
-            ).exclude(id=self.id)
-
-            if overlapping_appointments.exists():
-                raise ValidationError(
-                    {
-                        "date": "Já existe uma consulta marcada para este profissional "
-                        "neste horário."
-                    }
-                )
+
+class ArchivedAppointment(models.Model):
+    """
+    Consulta antiga movida da tabela principal por `archive_appointments`.
+
+    Tem as mesmas colunas, na mesma ordem, de `Appointment` (inclusive o
+    id original), para que as listagens possam ler as duas tabelas com um
+    `UNION ALL`.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    date = models.DateTimeField("Data da Consulta")
+    professional = models.ForeignKey(
+        Professional,
+        on_delete=models.CASCADE,
+        related_name="archived_appointments",
+        verbose_name="Profissional",
+    )
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Consulta arquivada"
+        verbose_name_plural = "Consultas arquivadas"
+        ordering = ["-date"]
+        indexes = [
+            models.Index(
+                fields=["date", "id"], name="archived_appointment_date_idx"
+            ),
+        ]
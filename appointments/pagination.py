@@ -0,0 +1,187 @@
+from base64 import b64decode, b64encode
+from collections import namedtuple
+from urllib import parse
+
+from asgiref.sync import sync_to_async
+from django.db.models import Q, QuerySet
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+KeysetCursor = namedtuple("KeysetCursor", ["reverse", "value", "pk"])
+
+
+def filter_parts(queryset, *conditions):
+    """
+    Aplica as condições com `filter()` também a querysets combinados por
+    `union()` (ex.: consultas com o arquivo), filtrando cada parte e
+    mantendo a ordenação.
+    """
+    query = queryset.query
+    if not query.combinator:
+        for condition in conditions:
+            queryset = queryset.filter(condition)
+        return queryset
+
+    parts = [
+        filter_parts(QuerySet(model=part.model, query=part.clone()), *conditions)
+        for part in query.combined_queries
+    ]
+    combined = parts[0].union(*parts[1:], all=query.combinator_all)
+    return combined.order_by(*query.order_by)
+
+
+class AppointmentCursorPagination(CursorPagination):
+    """
+    Paginação por keyset (cursor) para consultas, ordenada por `(campo, id)`.
+
+    O modo cursor é ativado quando o parâmetro `cursor` está presente na
+    query string (vazio para a primeira página). Sem ele, a paginação
+    configurada em `DEFAULT_PAGINATION_CLASS` é usada, mantendo o
+    comportamento atual de cada ambiente.
+
+    Cada página é uma única consulta `WHERE (campo, id) < (valor, pk)
+    ORDER BY campo, id LIMIT n + 1`, sem `COUNT(*)` nem `OFFSET`, e
+    continua estável enquanto novas consultas são inseridas.
+    """
+
+    ordering = "-date"
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    invalid_cursor_message = "Cursor inválido."
+
+    def __init__(self):
+        fallback_class = api_settings.DEFAULT_PAGINATION_CLASS
+        self.fallback = fallback_class() if fallback_class else None
+        self.delegate = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param not in request.query_params:
+            self.delegate = self.fallback
+            if self.delegate is None:
+                return None
+            return self.delegate.paginate_queryset(queryset, request, view)
+
+        queryset = self._page_queryset(queryset, request, view)
+        return self._set_page(list(queryset[: self.page_size + 1]))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Versão assíncrona de `paginate_queryset`, para as views assíncronas."""
+        if self.cursor_query_param not in request.query_params:
+            self.delegate = self.fallback
+            if self.delegate is None:
+                return None
+            if hasattr(self.delegate, "apaginate_queryset"):
+                return await self.delegate.apaginate_queryset(
+                    queryset, request, view
+                )
+            return await sync_to_async(self.delegate.paginate_queryset)(
+                queryset, request, view
+            )
+
+        queryset = self._page_queryset(queryset, request, view)
+        return self._set_page(
+            [obj async for obj in queryset[: self.page_size + 1]]
+        )
+
+    def _page_queryset(self, queryset, request, view):
+        """Ordena e filtra o queryset a partir do cursor da requisição."""
+        self.delegate = None
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+
+        order = self.ordering[0]
+        self.field = order.lstrip("-")
+        descending = order.startswith("-") != self.cursor.reverse
+
+        prefix = "-" if descending else ""
+        queryset = queryset.order_by(f"{prefix}{self.field}", f"{prefix}pk")
+
+        if self.cursor.value is not None:
+            # `campo <= valor` mantém a condição indexável em (campo, id);
+            # o OR desempata registros com o mesmo valor pelo id.
+            lookup = "lt" if descending else "gt"
+            queryset = filter_parts(
+                queryset,
+                Q(**{f"{self.field}__{lookup}e": self.cursor.value}),
+                Q(**{f"{self.field}__{lookup}": self.cursor.value})
+                | Q(**{f"pk__{lookup}": self.cursor.pk}),
+            )
+        return queryset
+
+    def _set_page(self, results):
+        """Define a página e os links a partir de `page_size + 1` registros."""
+        has_following = len(results) > self.page_size
+        self.page = results[: self.page_size]
+
+        has_cursor = self.cursor.value is not None
+        if self.cursor.reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = has_cursor, has_following
+        else:
+            self.has_next, self.has_previous = has_following, has_cursor
+
+        return self.page
+
+    def get_next_link(self):
+        if self.delegate is not None:
+            return self.delegate.get_next_link()
+        if not self.has_next:
+            return None
+        if self.page:
+            return self.encode_cursor(self._cursor_for(self.page[-1], False))
+        return self.encode_cursor(self.cursor._replace(reverse=False))
+
+    def get_previous_link(self):
+        if self.delegate is not None:
+            return self.delegate.get_previous_link()
+        if not self.has_previous:
+            return None
+        if self.page:
+            return self.encode_cursor(self._cursor_for(self.page[0], True))
+        return self.encode_cursor(self.cursor._replace(reverse=True))
+
+    def get_paginated_response(self, data):
+        if self.delegate is not None:
+            return self.delegate.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param, "")
+        if not encoded:
+            return KeysetCursor(reverse=False, value=None, pk=None)
+
+        try:
+            querystring = b64decode(encoded.encode("ascii")).decode("ascii")
+            tokens = parse.parse_qs(querystring, keep_blank_values=True)
+
+            reverse = bool(int(tokens.get("r", ["0"])[0]))
+            value = parse_datetime(tokens["p"][0])
+            pk = int(tokens["i"][0])
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if value is None:
+            raise NotFound(self.invalid_cursor_message)
+
+        return KeysetCursor(reverse=reverse, value=value, pk=pk)
+
+    def encode_cursor(self, cursor):
+        tokens = {"p": cursor.value.isoformat(), "i": str(cursor.pk)}
+        if cursor.reverse:
+            tokens["r"] = "1"
+
+        querystring = parse.urlencode(tokens)
+        encoded = b64encode(querystring.encode("ascii")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def _cursor_for(self, instance, reverse):
+        return KeysetCursor(
+            reverse=reverse, value=getattr(instance, self.field), pk=instance.pk
+        )
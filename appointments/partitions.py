@@ -0,0 +1,256 @@
+"""
+Particionamento declarativo de `appointments_appointment` por mês.
+
+Só se aplica ao PostgreSQL. A tabela passa a ser `PARTITION BY RANGE (date)`
+com uma partição por mês (`appointments_appointment_pAAAAMM`, limites em
+UTC) e uma partição `default` para datas fora das partições criadas. Os
+filtros por período leem apenas as partições do intervalo e meses antigos
+podem ser desanexados (`DETACH PARTITION`) sem reescrever a tabela.
+
+O model não muda: a chave primária física passa a ser `(id, date)`, já que
+toda restrição única de uma tabela particionada precisa incluir a coluna de
+particionamento, e a constraint `(professional_id, date)` é mantida. As
+colunas da nova tabela vêm dos campos concretos de `Appointment`; se a
+tabela atual tiver outras colunas, a conversão é recusada.
+"""
+from datetime import date, datetime, timezone
+
+from django.db import connection, transaction
+
+from .models import Appointment
+
+TABLE = Appointment._meta.db_table
+LEGACY_TABLE = f"{TABLE}_legacy"
+DEFAULT_PARTITION = f"{TABLE}_default"
+SEQUENCE = f"{TABLE}_part_id_seq"
+
+
+def month_start(value):
+    """Primeiro dia do mês de `value` (date ou datetime)."""
+    return date(value.year, value.month, 1)
+
+
+def add_months(value, months):
+    """Primeiro dia do mês `months` meses depois do mês de `value`."""
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_ranges(start, end):
+    """Meses `[início, fim)` de `start` até o mês de `end`, inclusive."""
+    current = month_start(start)
+    last = month_start(end)
+    while current <= last:
+        following = add_months(current, 1)
+        yield current, following
+        current = following
+
+
+def partition_name(month):
+    return f"{TABLE}_p{month:%Y%m}"
+
+
+def _bound(month):
+    return datetime(month.year, month.month, 1, tzinfo=timezone.utc).isoformat()
+
+
+class SchemaMismatch(Exception):
+    """A tabela de consultas não tem as mesmas colunas do model."""
+
+
+def column_definitions():
+    """`(coluna, tipo e nulidade)` dos campos concretos de `Appointment`."""
+    return [
+        (
+            field.column,
+            field.db_type(connection) + ("" if field.null else " NOT NULL"),
+        )
+        for field in Appointment._meta.concrete_fields
+    ]
+
+
+def check_columns(cursor):
+    """Levanta `SchemaMismatch` se as colunas da tabela diferem das do model."""
+    table = {
+        column.name
+        for column in connection.introspection.get_table_description(cursor, TABLE)
+    }
+    model = {column for column, _ in column_definitions()}
+    if table != model:
+        raise SchemaMismatch(
+            f"Colunas de {TABLE} diferem das do model "
+            f"(só na tabela: {sorted(table - model)}, "
+            f"só no model: {sorted(model - table)}); aplique as migrações "
+            f"antes de particionar."
+        )
+
+
+def is_partitioned():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table p "
+            "JOIN pg_class c ON c.oid = p.partrelid "
+            "WHERE c.oid = to_regclass(%s)",
+            [TABLE],
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions():
+    """Meses (primeiro dia) das partições mensais anexadas, em ordem."""
+    prefix = f"{TABLE}_p"
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(%s)",
+            [TABLE],
+        )
+        names = [name for (name,) in cursor.fetchall()]
+    return sorted(
+        datetime.strptime(name[len(prefix):], "%Y%m").date()
+        for name in names
+        if name.startswith(prefix)
+    )
+
+
+def convert():
+    """
+    Recria a tabela como particionada, copiando as consultas existentes.
+
+    Roda em uma única transação (a tabela fica bloqueada durante a cópia)
+    e cria as partições dos meses que já têm consultas. As colunas vêm do
+    model (`check_columns` garante que a cópia não perde nenhuma).
+    """
+    quote = connection.ops.quote_name
+    columns = column_definitions()
+    names = ", ".join(quote(column) for column, _ in columns)
+    date_column = quote(Appointment._meta.get_field("date").column)
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"LOCK TABLE {quote(TABLE)} IN ACCESS EXCLUSIVE MODE")
+        check_columns(cursor)
+        cursor.execute(f"SELECT min(date), max(date) FROM {quote(TABLE)}")
+        first, last = cursor.fetchone()
+
+        cursor.execute(
+            f"ALTER TABLE {quote(TABLE)} RENAME TO {quote(LEGACY_TABLE)}"
+        )
+        cursor.execute(
+            f"CREATE TABLE {quote(TABLE)} ("
+            + ", ".join(f"{quote(column)} {sql}" for column, sql in columns)
+            + f") PARTITION BY RANGE ({date_column})"
+        )
+        cursor.execute(
+            f"CREATE TABLE {quote(DEFAULT_PARTITION)} "
+            f"PARTITION OF {quote(TABLE)} DEFAULT"
+        )
+        if first is not None:
+            for month, following in month_ranges(first, last):
+                _create_partition(cursor, month, following)
+
+        cursor.execute(
+            f"INSERT INTO {quote(TABLE)} ({names}) "
+            f"SELECT {names} FROM {quote(LEGACY_TABLE)}"
+        )
+        # Remove a tabela antiga antes de recriar índices e constraints,
+        # cujos nomes são únicos no schema
+        cursor.execute(f"DROP TABLE {quote(LEGACY_TABLE)}")
+
+        cursor.execute(f"CREATE SEQUENCE {quote(SEQUENCE)} AS bigint")
+        cursor.execute(
+            f"ALTER SEQUENCE {quote(SEQUENCE)} OWNED BY {quote(TABLE)}.id"
+        )
+        cursor.execute(
+            f"ALTER TABLE {quote(TABLE)} ALTER COLUMN id "
+            f"SET DEFAULT nextval('{SEQUENCE}')"
+        )
+        cursor.execute(
+            f"SELECT setval('{SEQUENCE}', "
+            f"coalesce((SELECT max(id) FROM {quote(TABLE)}), 0) + 1, false)"
+        )
+
+        cursor.execute(
+            f"ALTER TABLE {quote(TABLE)} "
+            f"ADD CONSTRAINT {quote(TABLE + '_pkey')} PRIMARY KEY (id, date)"
+        )
+        for constraint in Appointment._meta.constraints:
+            cursor.execute(
+                f"ALTER TABLE {quote(TABLE)} ADD CONSTRAINT "
+                f"{quote(constraint.name)} UNIQUE ("
+                + ", ".join(
+                    quote(Appointment._meta.get_field(name).column)
+                    for name in constraint.fields
+                )
+                + ")"
+            )
+        for index in Appointment._meta.indexes:
+            cursor.execute(
+                f"CREATE INDEX {quote(index.name)} ON {quote(TABLE)} ("
+                + ", ".join(
+                    quote(Appointment._meta.get_field(name).column)
+                    for name in index.fields
+                )
+                + ")"
+            )
+        professional = Appointment._meta.get_field("professional")
+        cursor.execute(
+            f"ALTER TABLE {quote(TABLE)} "
+            f"ADD CONSTRAINT {quote(TABLE + '_professional_id_fk')} "
+            f"FOREIGN KEY ({quote(professional.column)}) "
+            f"REFERENCES {quote(professional.related_model._meta.db_table)} "
+            f"({quote(professional.target_field.column)}) "
+            f"DEFERRABLE INITIALLY DEFERRED"
+        )
+
+
+def _create_partition(cursor, month, following):
+    """
+    Cria e anexa a partição do mês, movendo para ela as consultas do
+    período que estavam na partição `default`.
+    """
+    quote = connection.ops.quote_name
+    name = quote(partition_name(month))
+    bounds = [_bound(month), _bound(following)]
+    cursor.execute(
+        f"CREATE TABLE {name} (LIKE {quote(TABLE)} INCLUDING DEFAULTS)"
+    )
+    cursor.execute(
+        f"WITH moved AS (DELETE FROM {quote(DEFAULT_PARTITION)} "
+        f"WHERE date >= %s AND date < %s RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved",
+        bounds,
+    )
+    cursor.execute(
+        f"ALTER TABLE {quote(TABLE)} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{bounds[0]}') TO ('{bounds[1]}')"
+    )
+
+
+def ensure_partitions(start, until):
+    """Cria as partições mensais que faltam do mês de `start` ao de `until`."""
+    existing = set(list_partitions())
+    created = []
+    with transaction.atomic(), connection.cursor() as cursor:
+        for month, following in month_ranges(start, until):
+            if month not in existing:
+                _create_partition(cursor, month, following)
+                created.append(month)
+    return created
+
+
+def detach_partitions(before):
+    """
+    Desanexa as partições dos meses anteriores a `before`.
+
+    As tabelas continuam existindo, fora da tabela de consultas, para serem
+    arquivadas ou removidas.
+    """
+    quote = connection.ops.quote_name
+    detached = [month for month in list_partitions() if month < month_start(before)]
+    with transaction.atomic(), connection.cursor() as cursor:
+        for month in detached:
+            cursor.execute(
+                f"ALTER TABLE {quote(TABLE)} "
+                f"DETACH PARTITION {quote(partition_name(month))}"
+            )
+    return detached
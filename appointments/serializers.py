@@ -1,13 +1,21 @@
+from django.conf import settings
 from rest_framework import serializers
+from core.serializers import DynamicFieldsModelSerializer
 from .models import Appointment
-from professionals.serializers import ProfessionalSerializer
+from professionals.fields import (
+    ProfessionalPayloadField,
+    ProfessionalPrimaryKeyField,
+)
 
 
-class AppointmentSerializer(serializers.ModelSerializer):
+class AppointmentSerializer(DynamicFieldsModelSerializer):
     """
     Serializer for Appointment model.
     """
-    professional_data = ProfessionalSerializer(source="professional", read_only=True)
+    # O profissional vem do cache de payloads (professionals.cache), tanto na
+    # leitura quanto na validação da chave estrangeira
+    serializer_related_field = ProfessionalPrimaryKeyField
+    professional_data = ProfessionalPayloadField(source="professional_id")
 
     class Meta:
         model = Appointment
@@ -17,33 +25,97 @@ class AppointmentSerializer(serializers.ModelSerializer):
             "professional",
             "professional_data",
         ]
+        # A unicidade de (professional, date) é garantida pela constraint do
+        # banco; a view converte o IntegrityError no erro de `date`, evitando
+        # a consulta extra do UniqueTogetherValidator.
+        validators = []
+
+
+class AvailabilityQuerySerializer(serializers.Serializer):
+    """
+    Valida os parâmetros de consulta de disponibilidade.
+    """
+
+    start_date = serializers.DateField()
+    end_date = serializers.DateField(required=False)
+    slot_minutes = serializers.IntegerField(
+        required=False, min_value=5, max_value=240
+    )
 
     def validate(self, attrs):
-        """
-        Valida se já existe consulta para este profissional neste horário
-        """
-        date = attrs.get("date")
-        professional = attrs.get("professional")
-        instance = self.instance
-
-        if date and professional:
-            # Verificar se já existe consulta neste horário para este profissional
-            overlapping_appointments = Appointment.objects.filter(
-                professional=professional,
-                date=date
+        attrs.setdefault("end_date", attrs["start_date"])
+        attrs.setdefault("slot_minutes", settings.APPOINTMENT_DURATION_MINUTES)
+
+        days = (attrs["end_date"] - attrs["start_date"]).days + 1
+        if days < 1:
+            raise serializers.ValidationError(
+                {"end_date": "A data final deve ser maior ou igual à inicial."}
+            )
+        if days > settings.AVAILABILITY_MAX_DAYS:
+            raise serializers.ValidationError(
+                {
+                    "end_date": "O período máximo é de "
+                    f"{settings.AVAILABILITY_MAX_DAYS} dias."
+                }
             )
+        return attrs
 
-            # Se está atualizando um objeto existente, exclua o próprio objeto
-            if instance:
-                overlapping_appointments = overlapping_appointments.exclude(
-                    id=instance.id
-                )
 
-            if overlapping_appointments.exists():
-                msg = (
-                    "Já existe uma consulta marcada para este profissional "
-                    "neste horário."
-                )
-                raise serializers.ValidationError({"date": msg})
+class BatchAvailabilityQuerySerializer(AvailabilityQuerySerializer):
+    """
+    Parâmetros de disponibilidade para vários profissionais de uma vez.
+    """
+
+    professionals = serializers.CharField(
+        help_text="IDs dos profissionais separados por vírgula."
+    )
 
+    def validate_professionals(self, value):
+        try:
+            ids = sorted({int(item) for item in value.split(",") if item.strip()})
+        except ValueError:
+            raise serializers.ValidationError(
+                "Informe os IDs dos profissionais separados por vírgula."
+            )
+        if not ids:
+            raise serializers.ValidationError(
+                "Informe ao menos um profissional."
+            )
+        if len(ids) > settings.AVAILABILITY_MAX_PROFESSIONALS:
+            raise serializers.ValidationError(
+                "Informe no máximo "
+                f"{settings.AVAILABILITY_MAX_PROFESSIONALS} profissionais."
+            )
+        return ids
+
+
+class AppointmentBulkItemSerializer(serializers.Serializer):
+    """
+    Valida um item da carga em lote sem consultar o banco.
+
+    A existência de profissionais e consultas e os conflitos de horário são
+    verificados para o lote inteiro em `appointments.bulk`.
+    """
+
+    OPERATIONS = ("create", "update", "delete")
+
+    op = serializers.ChoiceField(choices=OPERATIONS, default="create")
+    id = serializers.IntegerField(required=False, min_value=1)
+    professional = serializers.IntegerField(required=False, min_value=1)
+    date = serializers.DateTimeField(required=False)
+
+    def validate(self, attrs):
+        op = attrs["op"]
+        if op == "create":
+            missing = [f for f in ("professional", "date") if f not in attrs]
+            if missing:
+                raise serializers.ValidationError(
+                    {field: "Este campo é obrigatório." for field in missing}
+                )
+            if "id" in attrs:
+                raise serializers.ValidationError(
+                    {"id": "Não informe o id ao criar uma consulta."}
+                )
+        elif "id" not in attrs:
+            raise serializers.ValidationError({"id": "Este campo é obrigatório."})
         return attrs
@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Enviado após escritas em lote que não disparam post_save/post_delete
+# (bulk_create, bulk_update), para que caches derivados sejam invalidados.
+appointments_bulk_changed = Signal()
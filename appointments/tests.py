@@ -1,13 +1,30 @@
 """
 Testes unitários para a aplicação appointments.
 """
+import csv
+import io
+import json
 import pytest
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
+from unittest import mock, skipUnless
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.http import StreamingHttpResponse
+from django.test import AsyncRequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils.timezone import localdate as timezone_localdate
 from rest_framework import status
 from rest_framework.test import APITestCase
 from django.contrib.auth import get_user_model
-from appointments.models import Appointment
+from appointments import partitions
+from appointments.models import Appointment, ArchivedAppointment
+from appointments.serializers import AppointmentSerializer
+from appointments.views import AppointmentViewSet
+from core.renderers import msgpack
 from tests.factories import AppointmentFactory, ProfessionalFactory
 
 User = get_user_model()
@@ -108,6 +125,23 @@ class AppointmentAPITestCase(APITestCase):
         self.assertEqual(len(response.data), 1)
         self.assertEqual(response.data[0]["id"], appointment.id)
 
+    @pytest.mark.api
+    def test_filtrar_por_data_usa_o_dia_local_como_intervalo(self):
+        """Testa o filtro por data no fuso local, sem o lookup `__date`."""
+        # 23:30 em São Paulo já é o dia seguinte em UTC
+        noite = AppointmentFactory(
+            date=datetime(2025, 12, 26, 2, 30, tzinfo=timezone.utc)
+        )
+        AppointmentFactory(date=datetime(2025, 12, 26, 3, 0, tzinfo=timezone.utc))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url_list, {"date": "2025-12-25"})
+
+        self.assertEqual([item["id"] for item in response.data], [noite.id])
+        self.assertFalse(
+            any("cast_date" in query["sql"] for query in queries.captured_queries)
+        )
+
     @pytest.mark.api
     def test_filtrar_consultas_por_periodo(self):
         """Testa a filtragem de consultas por período."""
@@ -220,6 +254,44 @@ class AppointmentAPITestCase(APITestCase):
 
         response = self.client.post(self.url_list, dados_duplicados)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("date", response.data)
+        self.assertEqual(
+            Appointment.objects.filter(professional=professional).count(), 1
+        )
+
+    @pytest.mark.api
+    def test_validacao_consulta_duplicada_na_atualizacao(self):
+        """Testa que mover uma consulta para um horário ocupado retorna 400."""
+        professional = ProfessionalFactory()
+        ocupada = AppointmentFactory(professional=professional)
+        appointment = AppointmentFactory(
+            professional=professional,
+            date=ocupada.date + timedelta(hours=1)
+        )
+        url_detail = reverse(
+            "appointment-detail",
+            kwargs={"pk": appointment.pk}
+        )
+
+        response = self.client.patch(
+            url_detail, {"date": ocupada.date.isoformat()}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("date", response.data)
+
+    @pytest.mark.api
+    def test_criar_consulta_sem_consulta_previa_de_conflito(self):
+        """Testa que a criação não executa a verificação de conflito prévia."""
+        dados_consulta = {
+            "professional": self.professional.id,
+            "date": "2025-06-15T10:30:00Z"
+        }
+
+        # Busca do profissional, savepoint, INSERT, liberação do savepoint e
+        # o payload do profissional (fora do cache) para a resposta.
+        with self.assertNumQueries(5):
+            response = self.client.post(self.url_list, dados_consulta)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
     @pytest.mark.api
     def test_dados_profissional_no_serializer(self):
@@ -342,4 +414,844 @@ class AppointmentIntegrationTestCase(APITestCase):
         professional.delete()
 
         final_count = Appointment.objects.count()
-        self.assertEqual(final_count, 0)
\ No newline at end of file
+        self.assertEqual(final_count, 0)
+
+@pytest.mark.django_db
+class AppointmentCursorPaginationTestCase(APITestCase):
+    """Testes para a paginação por cursor de consultas."""
+
+    def setUp(self):
+        """Cria consultas com datas repetidas para testar o desempate por id."""
+        self.url_list = reverse("appointment-list")
+        base_date = datetime(
+            year=2025, month=6, day=15,
+            hour=10, minute=0, second=0,
+            microsecond=0, tzinfo=timezone.utc
+        )
+        self.appointments = [
+            AppointmentFactory(date=base_date + timedelta(hours=i // 2))
+            for i in range(7)
+        ]
+
+    def _collect(self, params):
+        ids = []
+        response = self.client.get(self.url_list, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(item["id"] for item in response.data["results"])
+            if not response.data["next"]:
+                return ids, response
+            response = self.client.get(response.data["next"])
+
+    @pytest.mark.api
+    def test_sem_cursor_mantem_lista_completa(self):
+        """Sem o parâmetro cursor a resposta continua sendo a lista completa."""
+        response = self.client.get(self.url_list)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 7)
+
+    @pytest.mark.api
+    def test_percorre_todas_as_paginas_em_ordem(self):
+        """Testa que as páginas cobrem todas as consultas em (date, id)."""
+        ids, _ = self._collect({"cursor": "", "page_size": 3})
+
+        expected = [
+            a.id for a in sorted(
+                self.appointments, key=lambda a: (a.date, a.id), reverse=True
+            )
+        ]
+        self.assertEqual(ids, expected)
+
+    @pytest.mark.api
+    def test_ordenacao_crescente_e_filtros(self):
+        """Testa o cursor com ordering=date e filtro por período."""
+        start = self.appointments[2].date.isoformat()
+        ids, _ = self._collect(
+            {"cursor": "", "page_size": 2, "ordering": "date",
+             "start_date": start}
+        )
+
+        expected = [
+            a.id for a in sorted(self.appointments, key=lambda a: (a.date, a.id))
+            if a.date >= self.appointments[2].date
+        ]
+        self.assertEqual(ids, expected)
+
+    @pytest.mark.api
+    def test_link_anterior(self):
+        """Testa que o link previous retorna a página anterior."""
+        first = self.client.get(self.url_list, {"cursor": "", "page_size": 3})
+        self.assertIsNone(first.data["previous"])
+
+        second = self.client.get(first.data["next"])
+        previous = self.client.get(second.data["previous"])
+
+        self.assertEqual(
+            [item["id"] for item in previous.data["results"]],
+            [item["id"] for item in first.data["results"]],
+        )
+
+    @pytest.mark.api
+    def test_paginas_estaveis_com_insercoes(self):
+        """Testa que novas consultas não deslocam as próximas páginas."""
+        first = self.client.get(self.url_list, {"cursor": "", "page_size": 3})
+        AppointmentFactory(date=self.appointments[-1].date + timedelta(days=1))
+
+        second = self.client.get(first.data["next"])
+        expected = [
+            a.id for a in sorted(
+                self.appointments, key=lambda a: (a.date, a.id), reverse=True
+            )
+        ][3:6]
+        self.assertEqual(
+            [item["id"] for item in second.data["results"]], expected
+        )
+
+    @pytest.mark.api
+    def test_cursor_invalido(self):
+        """Testa que um cursor malformado retorna 404."""
+        response = self.client.get(self.url_list, {"cursor": "invalido"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@pytest.mark.django_db
+class AppointmentBulkTestCase(APITestCase):
+    """Testes para as operações em lote de consultas."""
+
+    def setUp(self):
+        """Configuração inicial para os testes."""
+        self.url = reverse("appointment-bulk")
+        self.professional = ProfessionalFactory()
+        self.base_date = datetime(
+            year=2030, month=3, day=10,
+            hour=9, minute=0, second=0,
+            microsecond=0, tzinfo=timezone.utc
+        )
+
+    def _slot(self, hours):
+        return (self.base_date + timedelta(hours=hours)).isoformat()
+
+    @pytest.mark.api
+    def test_criacao_em_lote_com_conflitos(self):
+        """Testa conflitos dentro do lote e contra o banco."""
+        AppointmentFactory(professional=self.professional, date=self.base_date)
+        payload = [
+            {"professional": self.professional.id, "date": self._slot(1)},
+            {"professional": self.professional.id, "date": self._slot(1)},
+            {"professional": self.professional.id, "date": self._slot(0)},
+            {"professional": 999999, "date": self._slot(2)},
+            {"professional": self.professional.id},
+            {"professional": self.professional.id, "date": self._slot(3)},
+        ]
+
+        response = self.client.post(self.url, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        statuses = [item["status"] for item in response.data["results"]]
+        self.assertEqual(statuses, [201, 400, 400, 400, 400, 201])
+        self.assertIn("date", response.data["results"][1]["errors"])
+        self.assertIn("date", response.data["results"][2]["errors"])
+        self.assertIn("professional", response.data["results"][3]["errors"])
+        self.assertEqual(response.data["succeeded"], 2)
+        self.assertEqual(Appointment.objects.count(), 3)
+
+        created_id = response.data["results"][0]["id"]
+        self.assertEqual(
+            Appointment.objects.get(id=created_id).date,
+            self.base_date + timedelta(hours=1)
+        )
+
+    @pytest.mark.api
+    def test_atualizacao_e_exclusao_em_lote(self):
+        """Testa update e delete, incluindo reuso de horário liberado."""
+        removida = AppointmentFactory(
+            professional=self.professional, date=self.base_date
+        )
+        movida = AppointmentFactory(
+            professional=self.professional, date=self._slot(1)
+        )
+        payload = [
+            {"op": "delete", "id": removida.id},
+            {"op": "update", "id": movida.id, "date": self._slot(5)},
+            {"professional": self.professional.id, "date": self._slot(0)},
+            {"op": "delete", "id": 999999},
+        ]
+
+        response = self.client.post(self.url, payload, format="json")
+
+        statuses = [item["status"] for item in response.data["results"]]
+        self.assertEqual(statuses, [204, 200, 201, 404])
+        self.assertFalse(Appointment.objects.filter(id=removida.id).exists())
+        movida.refresh_from_db()
+        self.assertEqual(movida.date, self.base_date + timedelta(hours=5))
+        self.assertTrue(
+            Appointment.objects.filter(
+                professional=self.professional, date=self.base_date
+            ).exists()
+        )
+
+    @pytest.mark.api
+    def test_lote_ndjson(self):
+        """Testa o envio do lote como NDJSON."""
+        body = "\n".join(
+            f'{{"professional": {self.professional.id}, '
+            f'"date": "{self._slot(hours)}"}}'
+            for hours in range(3)
+        )
+
+        response = self.client.post(
+            self.url, body, content_type="application/x-ndjson"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["succeeded"], 3)
+        self.assertEqual(Appointment.objects.count(), 3)
+
+    @pytest.mark.api
+    def test_numero_de_consultas_independe_do_tamanho(self):
+        """Testa que a validação do lote usa consultas em conjunto."""
+        payload = [
+            {"professional": self.professional.id, "date": self._slot(hours)}
+            for hours in range(200)
+        ]
+
+        # Profissionais, horários ocupados, savepoint, INSERT e release.
+        with self.assertNumQueries(5):
+            response = self.client.post(self.url, payload, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Appointment.objects.count(), 200)
+
+    @pytest.mark.api
+    def test_lote_invalido(self):
+        """Testa que o corpo precisa ser uma lista."""
+        response = self.client.post(
+            self.url, {"professional": self.professional.id}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@pytest.mark.django_db
+class AppointmentExportTestCase(APITestCase):
+    """Testes para a exportação de consultas em streaming."""
+
+    def setUp(self):
+        """Configuração inicial para os testes."""
+        self.url_list = reverse("appointment-list")
+        self.professional = ProfessionalFactory(preferred_name="Dra. Conceição")
+        AppointmentFactory.create_batch(3, professional=self.professional)
+        AppointmentFactory()
+
+    @pytest.mark.api
+    def test_exportar_ndjson_com_filtro(self):
+        """Testa a exportação NDJSON respeitando os filtros."""
+        response = self.client.get(
+            self.url_list,
+            {"format": "ndjson", "professional": self.professional.id}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertTrue(
+            response["Content-Type"].startswith("application/x-ndjson")
+        )
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 3)
+        row = json.loads(lines[0])
+        self.assertEqual(row["professional"], self.professional.id)
+        self.assertEqual(
+            row["professional_data"]["preferred_name"], "Dra. Conceição"
+        )
+
+    @pytest.mark.api
+    def test_exportar_csv(self):
+        """Testa a exportação CSV com colunas aninhadas achatadas."""
+        response = self.client.get(self.url_list, {"format": "csv"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("attachment", response["Content-Disposition"])
+        content = b"".join(response.streaming_content).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(len(rows), 4)
+        self.assertIn("professional_data.preferred_name", rows[0])
+
+
+@pytest.mark.django_db
+class AppointmentFastListTestCase(APITestCase):
+    """Testes para a listagem rápida baseada em FieldPlan."""
+
+    def setUp(self):
+        """Configuração inicial para os testes."""
+        self.url_list = reverse("appointment-list")
+        AppointmentFactory.create_batch(5)
+
+    def _expected(self):
+        queryset = Appointment.objects.select_related("professional")
+        return json.loads(
+            json.dumps(AppointmentSerializer(queryset, many=True).data)
+        )
+
+    @pytest.mark.api
+    def test_mesmo_formato_do_serializer(self):
+        """Testa que a listagem rápida gera o mesmo JSON do serializer."""
+        # Validador do GET condicional (Max/Count), a listagem e os
+        # profissionais fora do cache
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url_list)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content), self._expected())
+
+    @pytest.mark.api
+    def test_mesmo_formato_com_cursor(self):
+        """Testa o caminho por instâncias usado pela paginação."""
+        response = self.client.get(self.url_list, {"cursor": ""})
+
+        self.assertEqual(
+            json.loads(response.content)["results"], self._expected()
+        )
+
+
+@pytest.mark.django_db
+class AppointmentSparseFieldsTestCase(APITestCase):
+    """Testes para os parâmetros fields e expand."""
+
+    def setUp(self):
+        """Configuração inicial para os testes."""
+        self.url_list = reverse("appointment-list")
+        self.appointment = AppointmentFactory()
+
+    @pytest.mark.api
+    def test_fields_sem_join(self):
+        """Testa que fields limita o payload e remove o JOIN."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                self.url_list, {"fields": "id,date,professional"}
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            set(response.data[0]), {"id", "date", "professional"}
+        )
+        # Validador do GET condicional e a listagem, ambos sem JOIN
+        self.assertEqual(len(queries), 2)
+        for query in queries:
+            self.assertNotIn("JOIN", query["sql"])
+
+    @pytest.mark.api
+    def test_fields_sem_relacoes_nao_segue_chaves_estrangeiras(self):
+        """
+        Testa que, sem campos aninhados em fields, a consulta não vira um
+        `select_related()` sem argumentos (que seguiria todas as relações).
+        """
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                self.url_list, {"fields": "id,date", "cursor": "", "page_size": 10}
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data["results"][0]), {"id", "date"})
+        for query in queries:
+            self.assertNotIn("professionals_professional", query["sql"])
+
+    @pytest.mark.api
+    def test_expand_inclui_profissional(self):
+        """Testa que expand inclui o profissional aninhado."""
+        response = self.client.get(
+            self.url_list, {"fields": "id", "expand": "professional_data"}
+        )
+
+        self.assertEqual(set(response.data[0]), {"id", "professional_data"})
+        self.assertEqual(
+            response.data[0]["professional_data"]["id"],
+            self.appointment.professional_id
+        )
+
+    @pytest.mark.api
+    def test_fields_no_detalhe_e_no_cursor(self):
+        """Testa fields no retrieve e na paginação por cursor."""
+        url_detail = reverse(
+            "appointment-detail", kwargs={"pk": self.appointment.pk}
+        )
+        response = self.client.get(url_detail, {"fields": "id,date"})
+        self.assertEqual(set(response.data), {"id", "date"})
+
+        # Só a página: a paginação por cursor não usa o GET condicional
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                self.url_list, {"fields": "id", "cursor": ""}
+            )
+        self.assertEqual(set(response.data["results"][0]), {"id"})
+
+    @pytest.mark.api
+    def test_campos_invalidos(self):
+        """Testa que campos desconhecidos retornam 400."""
+        response = self.client.get(self.url_list, {"fields": "id,notes"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("fields", response.data)
+
+        response = self.client.get(self.url_list, {"expand": "date"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("expand", response.data)
+
+
+@pytest.mark.django_db
+class AppointmentConditionalGetTestCase(APITestCase):
+    """Testes para o GET condicional das consultas."""
+
+    def setUp(self):
+        """Configuração inicial para os testes."""
+        cache.clear()
+        self.appointment = AppointmentFactory()
+        self.url_list = reverse("appointment-list")
+        self.url_detail = reverse(
+            "appointment-detail", kwargs={"pk": self.appointment.pk}
+        )
+
+    @pytest.mark.api
+    def test_detalhe_com_if_none_match(self):
+        """Testa o 304 no detalhe com uma única consulta."""
+        etag = self.client.get(self.url_detail)["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url_detail, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    @pytest.mark.api
+    def test_pagina_por_cursor_sem_validador(self):
+        """Testa que a página por cursor não agrega o queryset inteiro."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url_list, {"cursor": ""})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("ETag", response)
+        for query in queries:
+            self.assertNotIn("COUNT(", query["sql"])
+            self.assertNotIn("JOIN", query["sql"])
+
+    @pytest.mark.api
+    def test_profissional_alterado_muda_etag(self):
+        """Testa que os dados aninhados do profissional entram no validador."""
+        etags = {
+            url: self.client.get(url)["ETag"]
+            for url in (self.url_list, self.url_detail)
+        }
+        sparse = self.client.get(self.url_list, {"fields": "id,date"})["ETag"]
+
+        professional = self.appointment.professional
+        professional.preferred_name = "Dra. Ana"
+        professional.save()
+
+        for url, etag in etags.items():
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertIn("Dra. Ana", response.content.decode())
+        # Sem `professional_data` a resposta não muda
+        response = self.client.get(
+            self.url_list, {"fields": "id,date"}, HTTP_IF_NONE_MATCH=sparse
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    @pytest.mark.api
+    @override_settings(ALLOWED_HOSTS=["testserver", "api.example.com"])
+    def test_corpo_em_cache_por_host(self):
+        """Testa que o corpo em cache, com links absolutos, é separado por host."""
+        AppointmentFactory()
+        params = {"cursor": "", "page_size": 1}
+        self.client.get(self.url_list, params)
+
+        response = self.client.get(
+            self.url_list, params, HTTP_HOST="api.example.com"
+        )
+        self.assertTrue(
+            response.json()["next"].startswith("http://api.example.com/")
+        )
+
+    @pytest.mark.api
+    def test_exportacao_sem_etag(self):
+        """Testa que a exportação em streaming não é condicional."""
+        response = self.client.get(self.url_list, {"format": "ndjson"})
+
+        self.assertNotIn("ETag", response)
+
+
+@pytest.mark.django_db
+class AppointmentPartitioningTestCase(APITestCase):
+    """Testes para o particionamento mensal da tabela de consultas."""
+
+    def test_intervalos_mensais(self):
+        """Testa os meses gerados entre duas datas, virando o ano."""
+        self.assertEqual(
+            list(
+                partitions.month_ranges(
+                    datetime(2025, 11, 20, tzinfo=timezone.utc), date(2026, 1, 5)
+                )
+            ),
+            [
+                (date(2025, 11, 1), date(2025, 12, 1)),
+                (date(2025, 12, 1), date(2026, 1, 1)),
+                (date(2026, 1, 1), date(2026, 2, 1)),
+            ],
+        )
+        self.assertEqual(
+            partitions.add_months(date(2025, 3, 31), -3), date(2024, 12, 1)
+        )
+        self.assertEqual(
+            partitions.partition_name(date(2026, 1, 1)),
+            "appointments_appointment_p202601",
+        )
+
+    def test_colunas_vem_do_model(self):
+        """Testa que a tabela particionada recebe todas as colunas do model."""
+        columns = [column for column, _ in partitions.column_definitions()]
+
+        self.assertEqual(
+            columns, [field.column for field in Appointment._meta.concrete_fields]
+        )
+        with connection.cursor() as cursor:
+            partitions.check_columns(cursor)
+
+    def test_colunas_fora_do_model_impedem_a_conversao(self):
+        """Testa que uma coluna da tabela ausente do model falha a conversão."""
+        columns = partitions.column_definitions()
+
+        with mock.patch.object(
+            partitions, "column_definitions", return_value=columns[:-1]
+        ), connection.cursor() as cursor:
+            with self.assertRaisesMessage(
+                partitions.SchemaMismatch, columns[-1][0]
+            ):
+                partitions.check_columns(cursor)
+
+    @skipUnless(connection.vendor == "sqlite", "Erro específico do SQLite")
+    def test_comando_requer_postgresql(self):
+        """Testa que o comando recusa bancos que não sejam PostgreSQL."""
+        with self.assertRaisesMessage(CommandError, "requer PostgreSQL"):
+            call_command("partition_appointments", stdout=io.StringIO())
+
+    @skipUnless(
+        connection.vendor == "postgresql", "Particionamento requer PostgreSQL"
+    )
+    def test_particiona_e_cria_meses_futuros(self):
+        """Testa a conversão, a criação de partições e a leitura por mês."""
+        antiga = AppointmentFactory(
+            date=datetime(2024, 1, 10, 12, 0, tzinfo=timezone.utc)
+        )
+        call_command(
+            "partition_appointments", "--months-ahead=1", stdout=io.StringIO()
+        )
+
+        self.assertTrue(partitions.is_partitioned())
+        self.assertIn(date(2024, 1, 1), partitions.list_partitions())
+        self.assertEqual(Appointment.objects.get().pk, antiga.pk)
+
+        nova = AppointmentFactory()
+        self.assertGreater(nova.pk, antiga.pk)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "EXPLAIN SELECT * FROM appointments_appointment "
+                "WHERE date >= '2024-01-01' AND date < '2024-02-01'"
+            )
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+        self.assertIn("appointments_appointment_p202401", plan)
+        self.assertNotIn("appointments_appointment_default", plan)
+
+
+@pytest.mark.django_db
+class AppointmentArchiveTestCase(APITestCase):
+    """Testes para o arquivamento de consultas antigas."""
+
+    def setUp(self):
+        self.url_list = reverse("appointment-list")
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        self.antigas = [
+            AppointmentFactory(date=now - timedelta(days=60, hours=i // 2))
+            for i in range(5)
+        ]
+        self.recente = AppointmentFactory(date=now + timedelta(days=1))
+        call_command(
+            "archive_appointments",
+            "--older-than=30",
+            "--batch-size=2",
+            stdout=io.StringIO(),
+        )
+        self.inicio = (now - timedelta(days=90)).isoformat()
+
+    def test_move_consultas_antigas_em_lotes(self):
+        """Testa que as consultas antigas são movidas com o id original."""
+        self.assertEqual(
+            list(Appointment.objects.values_list("id", flat=True)),
+            [self.recente.id],
+        )
+        self.assertEqual(
+            set(ArchivedAppointment.objects.values_list("id", "date")),
+            {(a.id, a.date) for a in self.antigas},
+        )
+
+    @pytest.mark.api
+    def test_listagem_sem_filtro_de_data_le_so_a_tabela_principal(self):
+        """Testa que a listagem padrão não consulta o arquivo."""
+        response = self.client.get(self.url_list)
+
+        self.assertEqual([item["id"] for item in response.data], [self.recente.id])
+        self.assertIn("ETag", response)
+
+    @pytest.mark.api
+    def test_periodo_arquivado_e_lido_junto_com_a_tabela_principal(self):
+        """Testa a leitura do arquivo quando start_date alcança o período."""
+        response = self.client.get(
+            self.url_list, {"start_date": self.inicio, "fields": "id,date"}
+        )
+
+        expected = sorted(
+            [self.recente, *self.antigas],
+            key=lambda a: (a.date, a.id),
+            reverse=True,
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["id"] for item in response.data], [a.id for a in expected]
+        )
+        self.assertEqual(set(response.data[0]), {"id", "date"})
+        self.assertNotIn("ETag", response)
+
+    @pytest.mark.api
+    def test_end_date_sem_start_date_le_o_arquivo(self):
+        """Testa que um período só com end_date inclui as consultas arquivadas."""
+        fim = (self.recente.date + timedelta(days=1)).isoformat()
+
+        response = self.client.get(self.url_list, {"end_date": fim})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            {item["id"] for item in response.data},
+            {a.id for a in [self.recente, *self.antigas]},
+        )
+
+    @pytest.mark.api
+    def test_cursor_percorre_consultas_arquivadas(self):
+        """Testa a paginação por cursor sobre a tabela principal e o arquivo."""
+        ids = []
+        response = self.client.get(
+            self.url_list,
+            {"start_date": self.inicio, "cursor": "", "page_size": 2},
+        )
+        while True:
+            ids.extend(item["id"] for item in response.data["results"])
+            if not response.data["next"]:
+                break
+            response = self.client.get(response.data["next"])
+
+        expected = sorted(
+            [self.recente, *self.antigas],
+            key=lambda a: (a.date, a.id),
+            reverse=True,
+        )
+        self.assertEqual(ids, [a.id for a in expected])
+
+    @pytest.mark.api
+    def test_filtro_por_dia_arquivado(self):
+        """Testa o filtro `date` em um dia que só tem consultas arquivadas."""
+        dia = timezone_localdate(self.antigas[0].date)
+        response = self.client.get(self.url_list, {"date": dia.isoformat()})
+
+        self.assertTrue(response.data)
+        self.assertTrue(
+            {item["id"] for item in response.data}
+            <= {a.id for a in self.antigas}
+        )
+
+
+@pytest.mark.django_db
+@override_settings(ASYNC_VIEWS=True)
+class AppointmentAsyncViewTestCase(APITestCase):
+    """Testes para list/retrieve assíncronos (ASYNC_VIEWS)."""
+
+    def setUp(self):
+        """Cria consultas em dias diferentes."""
+        cache.clear()
+        self.professional = ProfessionalFactory()
+        now = datetime.now(timezone.utc)
+        self.appointments = [
+            AppointmentFactory(
+                professional=self.professional, date=now + timedelta(days=day)
+            )
+            for day in range(1, 4)
+        ]
+        self.url_list = reverse("appointment-list")
+
+    def call(self, actions, request, **kwargs):
+        """Chama a view assíncrona do viewset e renderiza a resposta."""
+        view = AppointmentViewSet.as_view(actions)
+        self.assertTrue(iscoroutinefunction(view))
+        response = async_to_sync(view)(request, **kwargs)
+        if hasattr(response, "render"):
+            response.render()
+        return response
+
+    def sync_json(self, url):
+        """Resposta da view síncrona, sem o corpo em cache da assíncrona."""
+        cache.clear()
+        return self.client.get(url).json()
+
+    def test_listagem_igual_a_sincrona(self):
+        """Testa a listagem, com filtro e cursor, igual à da view síncrona."""
+        for url in (
+            self.url_list,
+            f"{self.url_list}?professional={self.professional.pk}&fields=id,date",
+            f"{self.url_list}?cursor=&page_size=2",
+        ):
+            response = self.call({"get": "list"}, AsyncRequestFactory().get(url))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(json.loads(response.content), self.sync_json(url))
+
+    def test_detalhe_e_404(self):
+        """Testa o detalhe com aget() e o 404 de um id inexistente."""
+        appointment = self.appointments[0]
+        url = reverse("appointment-detail", args=[appointment.pk])
+        response = self.call(
+            {"get": "retrieve"}, AsyncRequestFactory().get(url), pk=appointment.pk
+        )
+        self.assertEqual(json.loads(response.content), self.sync_json(url))
+
+        url = reverse("appointment-detail", args=[0])
+        response = self.call({"get": "retrieve"}, AsyncRequestFactory().get(url), pk=0)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_get_condicional(self):
+        """Testa ETag e 304 na listagem assíncrona."""
+        response = self.call({"get": "list"}, AsyncRequestFactory().get(self.url_list))
+        self.assertIn("ETag", response)
+
+        response = self.call(
+            {"get": "list"},
+            AsyncRequestFactory().get(
+                self.url_list, headers={"if-none-match": response["ETag"]}
+            ),
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_exportacao_com_iterador_assincrono(self):
+        """
+        Testa que a exportação é um streaming assíncrono (lido aos poucos
+        sob ASGI) com o mesmo conteúdo da view síncrona.
+        """
+        async def consume(response):
+            return b"".join([chunk async for chunk in response.streaming_content])
+
+        for export in ("ndjson", "csv"):
+            response = self.call(
+                {"get": "list"},
+                AsyncRequestFactory().get(self.url_list, {"format": export}),
+            )
+            self.assertIsInstance(response, StreamingHttpResponse)
+            self.assertTrue(response.is_async)
+            sync = self.client.get(self.url_list, {"format": export})
+            self.assertEqual(
+                async_to_sync(consume)(response), b"".join(sync.streaming_content)
+            )
+
+    def test_escrita_continua_sincrona(self):
+        """Testa o POST pela view síncrona."""
+        actions = {"get": "list", "post": "create"}
+        date = (datetime.now(timezone.utc) + timedelta(days=10)).isoformat()
+        response = self.call(
+            actions,
+            AsyncRequestFactory().post(
+                self.url_list,
+                {"date": date, "professional": self.professional.pk},
+                content_type="application/json",
+            ),
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Appointment.objects.count(), 4)
+
+
+@pytest.mark.django_db
+@skipUnless(msgpack, "msgpack não instalado")
+class AppointmentMessagePackTestCase(APITestCase):
+    """Testes para a negociação de application/msgpack."""
+
+    def setUp(self):
+        """Configuração inicial para os testes."""
+        self.professional = ProfessionalFactory()
+        self.url_list = reverse("appointment-list")
+        self.date = datetime(2030, 3, 11, 13, 0, tzinfo=timezone.utc)
+
+    def post(self, url, data):
+        return self.client.post(
+            url,
+            msgpack.packb(data, datetime=True),
+            content_type="application/msgpack",
+            HTTP_ACCEPT="application/msgpack",
+        )
+
+    @pytest.mark.api
+    def test_listagem_igual_ao_json(self):
+        """Testa que a listagem em MessagePack tem o mesmo conteúdo do JSON."""
+        AppointmentFactory.create_batch(3)
+
+        response = self.client.get(
+            self.url_list, HTTP_ACCEPT="application/msgpack"
+        )
+
+        self.assertEqual(response["Content-Type"], "application/msgpack")
+        as_json = self.client.get(self.url_list, {"format": "json"})
+        self.assertEqual(
+            msgpack.unpackb(response.content), json.loads(as_json.content)
+        )
+
+    @pytest.mark.api
+    def test_criacao_com_timestamp(self):
+        """Testa o round-trip da data com fuso pela extensão Timestamp."""
+        response = self.post(
+            self.url_list,
+            {"professional": self.professional.id, "date": self.date},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        created = msgpack.unpackb(response.content)
+        self.assertEqual(
+            Appointment.objects.get(id=created["id"]).date, self.date
+        )
+
+        # A data devolvida volta para o mesmo instante no reenvio
+        echoed = datetime.fromisoformat(created["date"].replace("Z", "+00:00"))
+        self.assertEqual(echoed, self.date)
+        response = self.post(
+            self.url_list,
+            {"professional": self.professional.id, "date": created["date"]},
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("date", msgpack.unpackb(response.content))
+
+    @pytest.mark.api
+    def test_lote_em_msgpack(self):
+        """Testa o endpoint bulk com corpo e resposta em MessagePack."""
+        response = self.post(
+            reverse("appointment-bulk"),
+            [
+                {"professional": self.professional.id, "date": self.date},
+                {"professional": self.professional.id, "date": "invalida"},
+            ],
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        data = msgpack.unpackb(response.content)
+        self.assertEqual(
+            [result["status"] for result in data["results"]], [201, 400]
+        )
+        self.assertTrue(
+            Appointment.objects.filter(
+                professional=self.professional, date=self.date
+            ).exists()
+        )
+
+    @pytest.mark.api
+    def test_corpo_invalido(self):
+        """Testa que um corpo MessagePack inválido retorna 400."""
+        response = self.client.post(
+            self.url_list, b"\xc1", content_type="application/msgpack"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -1,4 +1,11 @@
-from rest_framework import viewsets
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import serializers, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from rest_framework.filters import SearchFilter, OrderingFilter
 from django_filters.rest_framework import (
     DjangoFilterBackend,
@@ -6,7 +13,23 @@ from django_filters.rest_framework import (
     DateTimeFilter,
     DateFilter
 )
-from .models import Appointment
+from core.mixins import (
+    AsyncReadMixin,
+    ConditionalGetMixin,
+    FastListMixin,
+    MessagePackMixin,
+    SparseFieldsMixin,
+    StreamingExportMixin,
+)
+from core.parsers import NDJSONParser, ORJSONParser
+from .bulk import apply_bulk_operations
+from .models import (
+    DOUBLE_BOOKING_MESSAGE,
+    Appointment,
+    ArchivedAppointment,
+    is_double_booking,
+)
+from .pagination import AppointmentCursorPagination
 from .serializers import AppointmentSerializer
 
 
@@ -17,7 +40,7 @@ class AppointmentFilterSet(FilterSet):
 
     start_date = DateTimeFilter(field_name="date", lookup_expr="gte")
     end_date = DateTimeFilter(field_name="date", lookup_expr="lte")
-    date = DateFilter(field_name="date", lookup_expr="date")
+    date = DateFilter(method="filter_day")
 
     class Meta:
         model = Appointment
@@ -25,20 +48,174 @@ class AppointmentFilterSet(FilterSet):
             "professional": ["exact"],
         }
 
+    def filter_day(self, queryset, name, value):
+        """
+        Filtra o dia no fuso atual como um intervalo de `date`, que usa o
+        índice (e a poda de partições), ao contrário do lookup `__date`.
+        """
+        start = timezone.make_aware(datetime.combine(value, time.min))
+        end = timezone.make_aware(
+            datetime.combine(value + timedelta(days=1), time.min)
+        )
+        return queryset.filter(date__gte=start, date__lt=end)
+
 
-class AppointmentViewSet(viewsets.ModelViewSet):
+class AppointmentViewSet(
+    ConditionalGetMixin,
+    MessagePackMixin,
+    SparseFieldsMixin,
+    StreamingExportMixin,
+    FastListMixin,
+    AsyncReadMixin,
+    viewsets.ModelViewSet,
+):
     """
     API endpoint para visualização e edição de consultas.
+
+    list:
+    Retorna as consultas. Envie `?cursor=` para paginar por cursor
+    (keyset em `(date, id)`), seguindo os links `next`/`previous`.
+    Com `?format=ndjson` ou `?format=csv` exporta todas as consultas
+    filtradas em streaming. Responde com `ETag` e aceita `If-None-Match`
+    (304). Quando `start_date`, `end_date` ou `date` alcançam consultas
+    arquivadas, elas também são listadas (um `end_date` sozinho cobre todo
+    o histórico).
+
+    bulk:
+    Cria, atualiza e remove consultas em lote a partir de uma lista JSON
+    ou de um corpo NDJSON, retornando o resultado de cada item.
     """
 
     serializer_class = AppointmentSerializer
     filter_backends = [DjangoFilterBackend, OrderingFilter]
     filterset_class = AppointmentFilterSet
+    pagination_class = AppointmentCursorPagination
+    fast_list = True
+    expandable_fields = ("professional_data",)
+    conditional_related = {"professional_data": "professional"}
     ordering_fields = ["date", "created_at"]
     ordering = ["-date"]
+    archive_query_params = ("start_date", "end_date", "date")
 
     def get_queryset(self):
         """
-        Retorna consultas com prefetch dos dados do profissional
+        Retorna as consultas; os dados do profissional vêm do cache de
+        payloads (`professionals.cache`), sem JOIN.
+        """
+        return Appointment.objects.all()
+
+    def get_archived_queryset(self):
+        """
+        Consultas arquivadas que atendem aos filtros da listagem, ou `None`.
+
+        O arquivo só é lido na listagem, quando o período pedido
+        (`start_date`, `end_date` ou `date`) alcança consultas arquivadas;
+        sem filtro de data a listagem continua só com a tabela principal.
+        """
+        if hasattr(self, "_archived_queryset"):
+            return self._archived_queryset
+
+        self._archived_queryset = None
+        params = self.request.query_params
+        if self.action != "list" or not any(
+            name in params for name in self.archive_query_params
+        ):
+            return None
+
+        filterset = self.filterset_class(
+            params,
+            queryset=ArchivedAppointment.objects.all(),
+            request=self.request,
+        )
+        # Filtros inválidos geram o erro 400 na tabela principal
+        if filterset.is_valid() and filterset.qs.exists():
+            self._archived_queryset = filterset.qs
+        return self._archived_queryset
+
+    def is_conditional(self, request):
+        # O validador do GET condicional não considera o arquivo
+        return (
+            super().is_conditional(request)
+            and self.get_archived_queryset() is None
+        )
+
+    def filter_queryset(self, queryset):
+        """
+        Soma as consultas arquivadas com um `UNION ALL`, com as mesmas
+        colunas e a ordenação da consulta principal.
+        """
+        queryset = super().filter_queryset(queryset)
+        archived = self.get_archived_queryset()
+        if archived is None:
+            return queryset
+
+        names, defer = queryset.query.deferred_loading
+        if names:
+            archived = archived.defer(*names) if defer else archived.only(*names)
+        ordering = queryset.query.order_by or Appointment._meta.ordering
+        return (
+            queryset.order_by()
+            .union(archived.order_by(), all=True)
+            .order_by(*ordering)
+        )
+
+    def perform_create(self, serializer):
+        self._save_or_reject_double_booking(serializer)
+
+    def perform_update(self, serializer):
+        self._save_or_reject_double_booking(serializer)
+
+    def _save_or_reject_double_booking(self, serializer):
         """
-        return Appointment.objects.all().select_related("professional")
+        Salva a consulta contando com a constraint única do banco.
+
+        O savepoint isola a falha para que a violação da constraint vire o
+        mesmo erro 400 em `date` que a validação retornava; outros
+        `IntegrityError` (ex.: chave estrangeira) não são mascarados.
+        """
+        try:
+            with transaction.atomic():
+                serializer.save()
+        except IntegrityError as error:
+            if not is_double_booking(error):
+                raise
+            raise serializers.ValidationError({"date": DOUBLE_BOOKING_MESSAGE})
+
+    @action(
+        detail=False,
+        methods=["post"],
+        parser_classes=[ORJSONParser, NDJSONParser],
+    )
+    def bulk(self, request):
+        """
+        Aplica um lote de operações `create`, `update` e `delete`.
+
+        Retorna 200 quando todos os itens foram aplicados e 207 quando algum
+        item foi rejeitado; o status de cada item vem em `results`.
+        """
+        items = request.data
+        if not isinstance(items, list):
+            raise serializers.ValidationError(
+                {"non_field_errors": ["Envie uma lista de consultas."]}
+            )
+        if len(items) > settings.APPOINTMENT_BULK_MAX_ITEMS:
+            raise serializers.ValidationError(
+                {
+                    "non_field_errors": [
+                        "O lote deve ter no máximo "
+                        f"{settings.APPOINTMENT_BULK_MAX_ITEMS} itens."
+                    ]
+                }
+            )
+
+        results = apply_bulk_operations(items)
+        failed = sum(1 for result in results if result["status"] >= 400)
+        return Response(
+            {
+                "total": len(results),
+                "succeeded": len(results) - failed,
+                "failed": failed,
+                "results": results,
+            },
+            status=status.HTTP_207_MULTI_STATUS if failed else status.HTTP_200_OK,
+        )
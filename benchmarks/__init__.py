@@ -0,0 +1,7 @@
+"""
+Benchmarks da Medical API.
+
+Cada módulo é executável com `python -m benchmarks.<módulo>` e imprime os
+resultados em JSON. Por padrão usam `core.settings.testing` (SQLite em
+memória); defina `DJANGO_SETTINGS_MODULE` para medir contra o PostgreSQL.
+"""
@@ -0,0 +1,189 @@
+"""
+Compara as leituras pelas views síncronas (WSGI) e assíncronas (ASGI,
+`ASYNC_VIEWS`).
+
+Cada cenário (listagem de consultas com cursor, detalhe de profissional e
+página inicial) roda `--requests` vezes pelo handler WSGI (test client,
+uma requisição por vez, como uma thread de worker) e pelo handler ASGI
+(`AsyncClient`, com `--concurrency` requisições em andamento no mesmo
+event loop). Os caches do GET condicional e da página inicial ficam
+desligados para que toda requisição chegue ao banco.
+
+Com o SQLite em memória dos testes as consultas das requisições ASGI rodam
+todas na thread principal (o banco só existe nela): o resultado mostra o
+custo das trocas de thread. Com um banco de verdade (ex.:
+`DJANGO_SETTINGS_MODULE=core.settings.production`, já populado) cada
+requisição tem sua thread, como sob o uvicorn, e a espera pelo banco se
+sobrepõe.
+
+    python -m benchmarks.asgi --rows 5000 --requests 200 --concurrency 16
+"""
+import argparse
+import asyncio
+import time
+from types import ModuleType
+
+from benchmarks.common import percentiles, report, setup_django
+
+
+def urlconf(async_views):
+    """
+    URLs dos cenários com as views síncronas ou assíncronas, antes das do
+    projeto (usadas pelos templates).
+    """
+    from django.test.utils import override_settings
+    from django.urls import path
+
+    from appointments.views import AppointmentViewSet
+    from core import urls
+    from pages.views import AsyncHomeView, HomeView
+    from professionals.views import ProfessionalViewSet
+
+    module = ModuleType("benchmarks.asgi.urls")
+    with override_settings(ASYNC_VIEWS=async_views):
+        module.urlpatterns = [
+            path(
+                "api/appointments/",
+                AppointmentViewSet.as_view({"get": "list"}),
+                name="appointment-list",
+            ),
+            path(
+                "api/professionals/<int:pk>/",
+                ProfessionalViewSet.as_view({"get": "retrieve"}),
+                name="professional-detail",
+            ),
+            path(
+                "",
+                (AsyncHomeView if async_views else HomeView).as_view(),
+                name="home",
+            ),
+            *urls.urlpatterns,
+        ]
+    return module
+
+
+def summarize(timings, elapsed):
+    return {
+        "throughput_rps": round(len(timings) / elapsed, 1),
+        "latency_ms": percentiles(timings),
+    }
+
+
+def run_wsgi(paths):
+    """Requisições em sequência pelo handler WSGI."""
+    from django.test import Client
+
+    client = Client()
+    timings = []
+    started = time.perf_counter()
+    for path in paths:
+        start = time.perf_counter()
+        response = client.get(path, HTTP_ACCEPT="application/json")
+        timings.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, response.status_code
+    return summarize(timings, time.perf_counter() - started)
+
+
+async def run_asgi(paths, concurrency, thread_per_request):
+    """Requisições concorrentes pelo handler ASGI."""
+    from asgiref.sync import ThreadSensitiveContext
+    from django.test import AsyncClient
+
+    client = AsyncClient()
+    slots = asyncio.Semaphore(concurrency)
+    timings = []
+
+    async def request(path):
+        async with slots:
+            start = time.perf_counter()
+            if thread_per_request:
+                async with ThreadSensitiveContext():
+                    response = await client.get(path, ACCEPT="application/json")
+            else:
+                response = await client.get(path, ACCEPT="application/json")
+            timings.append((time.perf_counter() - start) * 1000)
+            assert response.status_code == 200, response.status_code
+
+    started = time.perf_counter()
+    await asyncio.gather(*(request(path) for path in paths))
+    return summarize(timings, time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from datetime import timedelta
+
+    from asgiref.sync import async_to_sync
+    from django.conf import settings
+    from django.test.utils import override_settings
+    from django.utils import timezone
+
+    from appointments.models import Appointment
+    from professionals.models import Professional
+    from tests.factories import ProfessionalFactory
+
+    if Appointment.objects.count() < args.rows:
+        professionals = ProfessionalFactory.create_batch(100)
+        start = timezone.now()
+        Appointment.objects.bulk_create(
+            [
+                Appointment(
+                    professional=professionals[index % len(professionals)],
+                    date=start + timedelta(minutes=30 * index),
+                )
+                for index in range(args.rows)
+            ],
+            batch_size=1000,
+        )
+
+    professional_ids = list(
+        Professional.objects.values_list("pk", flat=True)[: args.requests]
+    )
+    scenarios = {
+        "list": ["/api/appointments/?cursor=&page_size=50"] * args.requests,
+        "retrieve": [
+            f"/api/professionals/{professional_ids[index % len(professional_ids)]}/"
+            for index in range(args.requests)
+        ],
+        "home": ["/"] * args.requests,
+    }
+    in_memory = settings.DATABASES["default"]["NAME"] == ":memory:"
+
+    results = {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "thread_per_request": not in_memory,
+        "scenarios": {},
+    }
+    # Sem o orçamento de consultas: requisições que dividem a thread (e a
+    # conexão) somam as consultas umas das outras nas métricas
+    with override_settings(
+        CONDITIONAL_CACHE_TIMEOUT=0, HOME_CACHE_TIMEOUT=0, QUERY_BUDGETS={}
+    ):
+        wsgi_urls, asgi_urls = urlconf(False), urlconf(True)
+        for name, paths in scenarios.items():
+            with override_settings(ROOT_URLCONF=wsgi_urls):
+                run_wsgi(paths[:5])  # Aquecimento
+                wsgi = run_wsgi(paths)
+            with override_settings(ROOT_URLCONF=asgi_urls):
+                # async_to_sync: a thread principal atende o sync_to_async
+                asgi = async_to_sync(run_asgi)(
+                    paths, args.concurrency, not in_memory
+                )
+            results["scenarios"][name] = {
+                "wsgi": wsgi,
+                "asgi": asgi,
+                "speedup": round(asgi["throughput_rps"] / wsgi["throughput_rps"], 2),
+            }
+    report(results)
+
+
+if __name__ == "__main__":
+    main()
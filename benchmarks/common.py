@@ -0,0 +1,61 @@
+"""
+Funções compartilhadas pelos benchmarks.
+"""
+import json
+import os
+import statistics
+import sys
+import time
+
+import django
+
+
+def setup_django():
+    """Configura o Django e cria as tabelas no banco de benchmark."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings.testing")
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    django.setup()
+
+    from django.conf import settings
+    from django.core.management import call_command
+
+    if settings.DATABASES["default"]["NAME"] == ":memory:":
+        call_command("migrate", run_syncdb=True, verbosity=0)
+
+
+def measure(func, repeat=5):
+    """Executa `func` `repeat` vezes e retorna as estatísticas em ms."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "min_ms": round(min(timings), 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "max_ms": round(max(timings), 3),
+    }
+
+
+def percentiles(timings):
+    """Retorna p50/p90/p95/p99 e máximo (em ms) de uma lista de tempos."""
+    if not timings:
+        return {}
+    ordered = sorted(timings)
+
+    def at(fraction):
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * fraction))], 3)
+
+    return {
+        "p50": at(0.50),
+        "p90": at(0.90),
+        "p95": at(0.95),
+        "p99": at(0.99),
+        "max": round(ordered[-1], 3),
+    }
+
+
+def report(results):
+    """Imprime os resultados em JSON."""
+    json.dump(results, sys.stdout, indent=2, ensure_ascii=False)
+    sys.stdout.write("\n")
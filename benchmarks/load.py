@@ -0,0 +1,275 @@
+"""
+Teste de carga dos principais endpoints da API.
+
+Executa cada cenário (listagem, filtro, busca, criação, disponibilidade)
+por `--requests` requisições e reporta vazão, percentis de latência e
+consultas SQL por requisição (lidas do header `Server-Timing`).
+
+Há dois drivers:
+
+- `client` (padrão): o test client do Django no próprio processo, sem
+  rede. Popula o banco antes (`--professionals`/`--appointments`) e
+  funciona com o SQLite em memória dos testes.
+- `http`: um gerador de carga HTTP local com `--concurrency` threads
+  contra um servidor já em execução (`--url`), populado com
+  `python -m benchmarks.seed` usando as mesmas configurações.
+
+    python -m benchmarks.load --professionals 1000 --appointments 50000
+    python -m benchmarks.load --url http://localhost:8000 --concurrency 8
+
+Contra um servidor que exige autenticação (como nas configurações de
+produção), passe `--user usuario:senha` (HTTP Basic) ou `--token` (enviado
+como `Authorization: Bearer <token>`): o header vai em todas as
+requisições, inclusive nas do aquecimento.
+
+Use `--output` para gravar o JSON e comparar execuções entre commits.
+"""
+import argparse
+import base64
+import itertools
+import json
+import random
+import re
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from urllib.parse import quote
+
+from benchmarks.common import percentiles, report, setup_django
+from benchmarks.seed import add_arguments
+
+SCENARIOS = ("list", "filter", "search", "create", "availability")
+QUERIES_PATTERN = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+
+class Scenarios:
+    """Gera as requisições de cada cenário a partir de uma amostra do banco."""
+
+    def __init__(self, professional_ids, names, seed):
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.professional_ids = professional_ids
+        self.names = names
+        # Horários futuros distintos, para que as criações não conflitem
+        self.slots = itertools.count()
+        self.base = datetime(2100, 1, 1, tzinfo=timezone.utc)
+
+    def choice(self, values):
+        with self.lock:
+            return self.rng.choice(values)
+
+    def request(self, name):
+        """Retorna `(método, caminho, corpo)` de uma requisição do cenário."""
+        if name == "list":
+            return "GET", "/api/appointments/?cursor=&page_size=50", None
+        if name == "filter":
+            professional = self.choice(self.professional_ids)
+            return "GET", f"/api/appointments/?professional={professional}", None
+        if name == "search":
+            term = self.choice(self.names).split()[0][:4]
+            return "GET", f"/api/professionals/?search={quote(term)}", None
+        if name == "create":
+            slot = next(self.slots)
+            body = {
+                "professional": self.choice(self.professional_ids),
+                "date": (self.base + timedelta(minutes=30 * slot)).isoformat(),
+            }
+            return "POST", "/api/appointments/", body
+        if name == "availability":
+            professional = self.choice(self.professional_ids)
+            start = date.today()
+            return (
+                "GET",
+                f"/api/professionals/{professional}/availability/"
+                f"?start_date={start}&end_date={start + timedelta(days=6)}",
+                None,
+            )
+        raise ValueError(f"Cenário desconhecido: {name}")
+
+
+def authorization_header(user=None, token=None):
+    """Valor do header `Authorization` para `usuario:senha` ou um token."""
+    if token:
+        return f"Bearer {token}"
+    if user:
+        return "Basic " + base64.b64encode(user.encode()).decode()
+    return None
+
+
+def client_driver(authorization=None):
+    """Envia as requisições pelo test client do Django."""
+    from django.test import Client
+
+    headers = {"Authorization": authorization} if authorization else {}
+    client = Client(headers=headers)
+
+    def send(method, path, body):
+        if method == "POST":
+            response = client.post(
+                path, json.dumps(body), content_type="application/json"
+            )
+        else:
+            response = client.get(path)
+        return response.status_code, response.get("Server-Timing", "")
+
+    return send
+
+
+def http_driver(base_url, authorization=None):
+    """Envia as requisições por HTTP para um servidor em execução."""
+    headers = {"Content-Type": "application/json"}
+    if authorization:
+        headers["Authorization"] = authorization
+
+    def send(method, path, body):
+        data = json.dumps(body).encode() if body is not None else None
+        request = urllib.request.Request(
+            base_url.rstrip("/") + path,
+            data=data,
+            method=method,
+            headers=headers,
+        )
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+                return response.status, response.headers.get("Server-Timing", "")
+        except urllib.error.HTTPError as error:
+            return error.code, error.headers.get("Server-Timing", "")
+
+    return send
+
+
+def run_scenario(send, scenarios, name, requests, concurrency):
+    """Executa um cenário e retorna suas estatísticas."""
+    timings, queries, errors = [], [], 0
+    lock = threading.Lock()
+
+    def one(_):
+        nonlocal errors
+        method, path, body = scenarios.request(name)
+        started_at = time.perf_counter()
+        status, server_timing = send(method, path, body)
+        elapsed = (time.perf_counter() - started_at) * 1000
+        match = QUERIES_PATTERN.search(server_timing)
+        with lock:
+            timings.append(elapsed)
+            if match:
+                queries.append(int(match.group(1)))
+            if status >= 400:
+                errors += 1
+
+    started_at = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(concurrency) as executor:
+            list(executor.map(one, range(requests)))
+    else:
+        for index in range(requests):
+            one(index)
+    duration = time.perf_counter() - started_at
+
+    return {
+        "requests": requests,
+        "errors": errors,
+        "throughput_rps": round(requests / duration, 1),
+        "latency_ms": percentiles(timings),
+        "queries": {
+            "median": sorted(queries)[len(queries) // 2] if queries else None,
+            "max": max(queries, default=None),
+        },
+    }
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    add_arguments(parser)
+    parser.set_defaults(professionals=1000, appointments=50000)
+    parser.add_argument("--url", help="Servidor alvo (ativa o driver http)")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument(
+        "--scenarios", default=",".join(SCENARIOS),
+        help="Cenários separados por vírgula",
+    )
+    parser.add_argument("--output", help="Arquivo JSON de saída")
+    auth = parser.add_mutually_exclusive_group()
+    auth.add_argument(
+        "--user", metavar="USUARIO:SENHA", help="Autenticação HTTP Basic"
+    )
+    auth.add_argument(
+        "--token", help="Token enviado como Authorization: Bearer"
+    )
+    args = parser.parse_args()
+    if args.user and ":" not in args.user:
+        parser.error("--user deve estar no formato usuario:senha.")
+    authorization = authorization_header(args.user, args.token)
+
+    setup_django()
+
+    from professionals.models import Professional
+
+    if args.url:
+        send = http_driver(args.url, authorization)
+        concurrency = args.concurrency
+    else:
+        from benchmarks.seed import seed
+
+        seed(args.professionals, args.appointments, args.seed)
+        send = client_driver(authorization)
+        # O test client compartilha a conexão do processo
+        concurrency = 1
+
+    sample = list(
+        Professional.objects.order_by("id").values_list("id", "preferred_name")[
+            :1000
+        ]
+    )
+    if not sample:
+        parser.error("Nenhum profissional no banco; rode benchmarks.seed antes.")
+    scenarios = Scenarios(
+        [pk for pk, _ in sample], [name for _, name in sample], args.seed
+    )
+
+    results = {
+        "commit": current_commit(),
+        "driver": "http" if args.url else "client",
+        "concurrency": concurrency,
+        "seed": args.seed,
+        "professionals": Professional.objects.count(),
+        "scenarios": {},
+    }
+    for name in args.scenarios.split(","):
+        name = name.strip()
+        if name not in SCENARIOS:
+            parser.error(f"Cenário desconhecido: {name}")
+        # Aquecimento: a primeira requisição monta caches e conexões
+        send(*scenarios.request(name))
+        results["scenarios"][name] = run_scenario(
+            send, scenarios, name, args.requests, concurrency
+        )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(results, output, indent=2, ensure_ascii=False)
+    report(results)
+
+
+if __name__ == "__main__":
+    main()
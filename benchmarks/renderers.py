@@ -0,0 +1,105 @@
+"""
+Compara o `JSONRenderer` do DRF (json da biblioteca padrão) com o
+`ORJSONRenderer` na listagem de consultas.
+
+Mede a renderização isolada dos dados da listagem e a requisição completa
+a `/api/appointments/` pelo test client, com o cache do GET condicional
+desligado para que cada requisição passe pelo renderer.
+
+    python -m benchmarks.renderers --rows 10000
+"""
+import argparse
+
+from benchmarks.common import measure, report, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from datetime import timedelta
+
+    from django.test import Client
+    from django.test.utils import override_settings
+    from django.utils import timezone
+    from rest_framework.renderers import JSONRenderer
+
+    from appointments.models import Appointment
+    from appointments.serializers import AppointmentSerializer
+    from appointments.views import AppointmentViewSet
+    from core import renderers
+    from core.serializers import FieldPlan
+    from tests.factories import ProfessionalFactory
+
+    if renderers.orjson is None:
+        parser.error("orjson não instalado; nada a comparar.")
+
+    if Appointment.objects.count() < args.rows:
+        professionals = ProfessionalFactory.create_batch(100)
+        start = timezone.now()
+        Appointment.objects.bulk_create(
+            [
+                Appointment(
+                    professional=professionals[index % len(professionals)],
+                    date=start + timedelta(minutes=30 * index),
+                )
+                for index in range(args.rows)
+            ],
+            batch_size=1000,
+        )
+
+    queryset = Appointment.objects.all()[: args.rows]
+    data = list(FieldPlan(AppointmentSerializer()).iter_queryset(queryset))
+    stdlib, fast = JSONRenderer(), renderers.ORJSONRenderer()
+    assert stdlib.render(data) == fast.render(data)
+
+    client = Client()
+    default_renderers = AppointmentViewSet.renderer_classes
+
+    def endpoint(renderer_class):
+        def request():
+            response = client.get(
+                "/api/appointments/", HTTP_ACCEPT="application/json"
+            )
+            assert response.status_code == 200
+
+        def run():
+            AppointmentViewSet.renderer_classes = [
+                renderer_class,
+                *default_renderers[1:],
+            ]
+            try:
+                request()
+            finally:
+                AppointmentViewSet.renderer_classes = default_renderers
+
+        return run
+
+    results = {
+        "rows": len(data),
+        "render_only": {
+            "json": measure(lambda: stdlib.render(data), args.repeat),
+            "orjson": measure(lambda: fast.render(data), args.repeat),
+        },
+    }
+    with override_settings(CONDITIONAL_CACHE_TIMEOUT=0):
+        # Aquecimento: cache de profissionais e conexões
+        endpoint(JSONRenderer)()
+        results["endpoint"] = {
+            "json": measure(endpoint(JSONRenderer), args.repeat),
+            "orjson": measure(endpoint(renderers.ORJSONRenderer), args.repeat),
+        }
+
+    for timings in (results["render_only"], results["endpoint"]):
+        timings["speedup"] = round(
+            timings["json"]["median_ms"] / timings["orjson"]["median_ms"], 2
+        )
+    report(results)
+
+
+if __name__ == "__main__":
+    main()
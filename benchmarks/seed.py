@@ -0,0 +1,146 @@
+"""
+Popula o banco com volumes realistas para os benchmarks.
+
+Os profissionais são montados com `ProfessionalFactory.build_batch`
+(mesmos dados fictícios dos testes) e tudo é gravado com `bulk_create` em
+lotes. Com a mesma `--seed` os dados gerados são sempre
+os mesmos; se o banco já tiver os volumes pedidos, nada é criado.
+
+    python -m benchmarks.seed --professionals 100000 --appointments 10000000
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import report, setup_django
+
+DEFAULT_PROFESSIONALS = 100_000
+DEFAULT_APPOINTMENTS = 10_000_000
+DEFAULT_SEED = 42
+BATCH_SIZE = 5_000
+
+SPECIALTIES = [
+    "Cardiologia",
+    "Clínica Geral",
+    "Dermatologia",
+    "Ginecologia",
+    "Neurologia",
+    "Ortopedia",
+    "Pediatria",
+    "Psiquiatria",
+    None,
+]
+
+
+def slot_dates(count, start, opening_hour, slots_per_day, slot_minutes):
+    """Gera `count` horários de consulta dentro do horário de atendimento."""
+    for slot in range(count):
+        day, position = divmod(slot, slots_per_day)
+        yield start + timedelta(
+            days=day, hours=opening_hour, minutes=position * slot_minutes
+        )
+
+
+def seed(professionals, appointments, seed=DEFAULT_SEED, batch_size=BATCH_SIZE):
+    """
+    Cria profissionais e consultas até atingir os volumes pedidos.
+
+    As consultas são distribuídas igualmente entre os profissionais, em
+    horários consecutivos a partir de 30 dias atrás, sem violar a
+    restrição única `(professional, date)`.
+    """
+    import factory.random
+    from django.conf import settings
+    from django.utils import timezone
+
+    from appointments.models import Appointment
+    from professionals.models import Professional
+    from tests.factories import ProfessionalFactory
+
+    factory.random.reseed_random(seed)
+    rng = random.Random(seed)
+    timings = {}
+
+    started_at = time.perf_counter()
+    existing = Professional.objects.count()
+    for offset in range(existing, professionals, batch_size):
+        size = min(batch_size, professionals - offset)
+        batch = ProfessionalFactory.build_batch(size)
+        for index, professional in enumerate(batch, start=offset):
+            professional.contact = f"{index:011d}"
+            professional.specialty = rng.choice(SPECIALTIES)
+        Professional.objects.bulk_create(batch, batch_size=batch_size)
+    timings["professionals_s"] = round(time.perf_counter() - started_at, 2)
+
+    started_at = time.perf_counter()
+    existing = Appointment.objects.count()
+    owners = [
+        Professional(id=pk)
+        for pk in Professional.objects.order_by("id").values_list(
+            "id", flat=True
+        )[:professionals]
+    ]
+    if existing < appointments and owners:
+        slot_minutes = settings.APPOINTMENT_DURATION_MINUTES
+        slots_per_day = (
+            (settings.APPOINTMENT_CLOSING_HOUR - settings.APPOINTMENT_OPENING_HOUR)
+            * 60
+            // slot_minutes
+        )
+        today = timezone.localdate()
+        start = timezone.make_aware(
+            datetime(today.year, today.month, today.day) - timedelta(days=30)
+        )
+        per_professional = -(-appointments // len(owners))
+        dates = list(
+            slot_dates(
+                per_professional,
+                start,
+                settings.APPOINTMENT_OPENING_HOUR,
+                slots_per_day,
+                slot_minutes,
+            )
+        )
+
+        # Consulta `n` -> profissional `n % P`, horário `n // P`. Todos os
+        # campos de `AppointmentFactory` seriam sobrescritos aqui, então as
+        # instâncias são criadas direto (a factory custa ~140us por objeto).
+        batch = []
+        for index in range(existing, appointments):
+            slot, position = divmod(index, len(owners))
+            batch.append(Appointment(professional=owners[position], date=dates[slot]))
+            if len(batch) == batch_size:
+                Appointment.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            Appointment.objects.bulk_create(batch)
+    timings["appointments_s"] = round(time.perf_counter() - started_at, 2)
+
+    return {
+        "professionals": Professional.objects.count(),
+        "appointments": Appointment.objects.count(),
+        "seed": seed,
+        **timings,
+    }
+
+
+def add_arguments(parser):
+    parser.add_argument(
+        "--professionals", type=int, default=DEFAULT_PROFESSIONALS
+    )
+    parser.add_argument("--appointments", type=int, default=DEFAULT_APPOINTMENTS)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    setup_django()
+    report(seed(args.professionals, args.appointments, args.seed))
+
+
+if __name__ == "__main__":
+    main()
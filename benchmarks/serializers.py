@@ -0,0 +1,88 @@
+"""
+Compara a serialização da listagem de consultas: `AppointmentSerializer`
+com `many=True` contra o `FieldPlan` usado por `FastListMixin`.
+
+    python -m benchmarks.serializers --rows 10000
+"""
+import argparse
+import json
+
+from benchmarks.common import measure, report, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from datetime import timedelta
+
+    from django.utils import timezone
+    from rest_framework.renderers import JSONRenderer
+
+    from appointments.models import Appointment
+    from appointments.serializers import AppointmentSerializer
+    from core.serializers import FieldPlan
+    from tests.factories import ProfessionalFactory
+
+    if Appointment.objects.count() < args.rows:
+        professionals = ProfessionalFactory.create_batch(100)
+        start = timezone.now()
+        Appointment.objects.bulk_create(
+            [
+                Appointment(
+                    professional=professionals[index % len(professionals)],
+                    date=start + timedelta(minutes=30 * index),
+                )
+                for index in range(args.rows)
+            ],
+            batch_size=1000,
+        )
+
+    queryset = Appointment.objects.select_related("professional")[: args.rows]
+    plan = FieldPlan(AppointmentSerializer())
+    renderer = JSONRenderer()
+
+    def drf():
+        return renderer.render(AppointmentSerializer(queryset, many=True).data)
+
+    def fast():
+        return renderer.render(list(plan.iter_queryset(queryset)))
+
+    assert json.loads(drf()) == json.loads(fast())
+
+    # Apenas a serialização, com as linhas já carregadas do banco
+    instances = list(queryset)
+    rows = list(queryset.values_list(*plan.lookups))
+
+    def drf_only():
+        return AppointmentSerializer(instances, many=True).data
+
+    def fast_only():
+        return plan.from_rows(rows)
+
+    results = {
+        "rows": args.rows,
+        "end_to_end": {
+            "serializer": measure(drf, args.repeat),
+            "field_plan": measure(fast, args.repeat),
+        },
+        "serialization_only": {
+            "serializer": measure(drf_only, args.repeat),
+            "field_plan": measure(fast_only, args.repeat),
+        },
+    }
+    for timings in (results["end_to_end"], results["serialization_only"]):
+        timings["speedup"] = round(
+            timings["serializer"]["median_ms"]
+            / timings["field_plan"]["median_ms"],
+            2,
+        )
+    report(results)
+
+
+if __name__ == "__main__":
+    main()
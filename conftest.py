@@ -1,5 +1,8 @@
+from importlib import import_module
+
 import pytest
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import Client
 from rest_framework.test import APIClient
 from tests.factories import UserFactory, ProfessionalFactory, AppointmentFactory
@@ -7,6 +10,23 @@ from tests.factories import UserFactory, ProfessionalFactory, AppointmentFactory
 User = get_user_model()
 
 
+@pytest.fixture(scope="session")
+def django_db_setup(django_db_setup, django_db_blocker):
+    """
+    Cria no PostgreSQL a estrutura da busca textual (extensões, configuração
+    `portuguese_unaccent`, trigger e índices), que vem de uma migração
+    `RunPython` e por isso não existe com `--nomigrations`.
+    """
+    if connection.vendor != "postgresql":
+        return
+    migration = import_module(
+        "professionals.migrations.0006_professional_search_vector"
+    )
+    with django_db_blocker.unblock(), connection.cursor() as cursor:
+        for statement in migration.FORWARD_SQL:
+            cursor.execute(statement)
+
+
 @pytest.fixture
 def api_client():
     """Cliente API para testes."""
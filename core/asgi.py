@@ -12,5 +12,13 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings.production')
+# Leituras com views assíncronas (core.mixins.AsyncReadMixin)
+os.environ.setdefault('ASYNC_VIEWS', 'True')
 
 application = get_asgi_application()
+
+# Sob ASGI cada requisição usaria uma conexão nova; com DB_POOL as conexões
+# vêm do pool, aberto aqui antes do primeiro request.
+from core.db_pool import open_pools  # noqa: E402
+
+open_pools()
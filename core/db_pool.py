@@ -0,0 +1,25 @@
+"""
+Pools de conexões do PostgreSQL (psycopg 3).
+
+Com `OPTIONS["pool"]` em um banco de `DATABASES`, o Django mantém um
+`psycopg_pool.ConnectionPool` por alias e processo, aberto na primeira
+consulta. `open_pools()` abre os pools antes de o worker atender, para que
+a abertura das conexões mínimas não entre na latência das primeiras
+requisições.
+"""
+from django.db import connections
+
+
+def pooled_aliases():
+    """Aliases de `DATABASES` configurados com pool."""
+    return [
+        alias
+        for alias in connections
+        if connections[alias].settings_dict.get("OPTIONS", {}).get("pool")
+    ]
+
+
+def open_pools(timeout=30.0):
+    """Abre os pools e espera as `min_size` conexões de cada um."""
+    for alias in pooled_aliases():
+        connections[alias].pool.open(wait=True, timeout=timeout)
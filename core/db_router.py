@@ -0,0 +1,122 @@
+"""
+Roteamento de leituras para réplicas do banco.
+
+As leituras de requisições seguras (GET/HEAD/OPTIONS) vão para uma das
+réplicas de `DATABASE_REPLICAS`; escritas, requisições que alteram dados e
+todo código fora de uma requisição (comandos, shell, tarefas) usam o
+`default`. O estado da requisição em andamento fica em uma `ContextVar`,
+aberta por `core.middleware.ReplicaRoutingMiddleware`.
+
+Sem réplicas configuradas o router não interfere (retorna `None`).
+"""
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+_current = ContextVar("replica_routing", default=None)
+
+
+class RoutingState:
+    """Decisão de roteamento de uma requisição."""
+
+    def __init__(self, use_primary=False):
+        self.use_primary = use_primary
+        self.replica = None
+        self.wrote = False
+
+    def read_alias(self):
+        if self.use_primary:
+            return DEFAULT_DB_ALIAS
+        # A mesma réplica durante toda a requisição (ex.: contagem e página)
+        if self.replica is None:
+            self.replica = random.choice(settings.DATABASE_REPLICAS)
+        return self.replica
+
+
+def activate(state):
+    return _current.set(state)
+
+
+def deactivate(token):
+    _current.reset(token)
+
+
+def current_state():
+    """Estado da requisição em andamento, se houver."""
+    return _current.get()
+
+
+def bind(iterable, state):
+    """
+    Itera `iterable` com `state` ativo a cada item.
+
+    O conteúdo de respostas em streaming é consumido depois que o
+    middleware sai; sem isso as leituras da exportação iriam para o
+    `default`.
+    """
+    iterator = iter(iterable)
+    while True:
+        token = activate(state)
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            deactivate(token)
+        yield item
+
+
+async def abind(aiterable, state):
+    """Versão de `bind` para o conteúdo assíncrono (ASGI)."""
+    iterator = aiter(aiterable)
+    while True:
+        token = activate(state)
+        try:
+            item = await anext(iterator)
+        except StopAsyncIteration:
+            return
+        finally:
+            deactivate(token)
+        yield item
+
+
+class ReplicaRouter:
+    """
+    Leituras de requisições seguras nas réplicas; o resto no `default`.
+
+    Uma escrita durante a requisição passa a ler do `default` até o fim
+    dela, e o middleware mantém o cliente no `default` por
+    `DATABASE_REPLICA_PIN_SECONDS` ("read your own writes").
+    """
+
+    def db_for_read(self, model, **hints):
+        if not settings.DATABASE_REPLICAS:
+            return None
+        state = _current.get()
+        if state is None:
+            return DEFAULT_DB_ALIAS
+        return state.read_alias()
+
+    def db_for_write(self, model, **hints):
+        if not settings.DATABASE_REPLICAS:
+            return None
+        state = _current.get()
+        if state is not None:
+            state.wrote = True
+            state.use_primary = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Réplicas têm os mesmos dados do `default`
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # As réplicas recebem o schema pela replicação
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
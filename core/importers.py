@@ -0,0 +1,409 @@
+"""
+Importação em massa de profissionais e consultas (`import_data`).
+
+O arquivo (CSV com cabeçalho ou NDJSON) é lido em streaming e processado
+em lotes. Cada lote é validado de uma vez, carregado em uma tabela
+temporária de staging (`COPY FROM STDIN` no PostgreSQL) e mesclado na
+tabela final com SQL, na mesma transação que grava o checkpoint usado para
+retomar a importação.
+
+Nas consultas, linhas cujo `(professional, date)` já existe no banco (ou
+se repete no arquivo) são reportadas como conflito e ignoradas. Se outra
+escrita grava o mesmo horário entre a checagem e o `INSERT`, o `ON
+CONFLICT DO NOTHING` descarta a linha, que entra na contagem de ignoradas.
+
+Como o merge não passa pelos signals, ao fim de cada execução o cache de
+payloads dos profissionais, o da página inicial e o índice do autocomplete
+deste processo são descartados.
+"""
+import csv
+import io
+import json
+import os
+
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from appointments.models import DOUBLE_BOOKING_MESSAGE, Appointment
+from pages.views import invalidate_home_context
+from professionals.autocomplete import professional_index
+from professionals.cache import professional_cache
+from professionals.models import Professional
+from professionals.serializers import CONTACT_ERROR_MESSAGE
+
+from .models import ImportCheckpoint
+from .synthetic import copy_rows, datetime_adapter, insert_rows
+
+STAGING_TABLE = "import_staging"
+REQUIRED_MESSAGE = "Este campo é obrigatório."
+PROFESSIONAL_NOT_FOUND_MESSAGE = "Profissional não encontrado."
+INVALID_DATE_MESSAGE = "Data e hora inválidas."
+
+
+class ImportFormatError(ValueError):
+    """O arquivo não está no formato esperado."""
+
+
+class CountingReader(io.RawIOBase):
+    """Arquivo binário que conta os bytes lidos, para o progresso."""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        count = self.raw.readinto(buffer)
+        self.bytes_read += count or 0
+        return count
+
+    def close(self):
+        self.raw.close()
+        super().close()
+
+
+def read_records(stream, file_format):
+    """Gera `(linha, registro)` de um arquivo CSV ou NDJSON."""
+    if file_format == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as error:
+            raise ImportFormatError(f"JSON inválido na linha {line_number}: {error}")
+        if not isinstance(record, dict):
+            raise ImportFormatError(
+                f"A linha {line_number} deve conter um objeto JSON."
+            )
+        yield line_number, record
+
+
+def _text(record, name):
+    value = record.get(name)
+    return value.strip() if isinstance(value, str) else value
+
+
+class Importer:
+    """Base dos importadores: validação do lote e merge via staging."""
+
+    kind = None
+    staging_columns = ()
+
+    def validate(self, batch):
+        """Retorna `(linhas válidas, rejeitadas)` para um lote de registros."""
+        raise NotImplementedError
+
+    def merge(self, cursor):
+        """Grava o staging na tabela final; retorna `(importadas, erros)`."""
+        raise NotImplementedError
+
+    def load(self, rows):
+        """Carrega e mescla um lote válido; retorna `(importadas, erros)`."""
+        quote = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {quote(STAGING_TABLE)}")
+            columns = ", ".join(
+                f"{quote(name)} {column_type}"
+                for name, column_type in self.staging_columns
+            )
+            cursor.execute(f"CREATE TEMPORARY TABLE {quote(STAGING_TABLE)} ({columns})")
+
+        names = [name for name, _ in self.staging_columns]
+        if connection.vendor == "postgresql":
+            copy_rows(STAGING_TABLE, names, rows)
+        else:
+            insert_rows(STAGING_TABLE, names, rows)
+
+        with connection.cursor() as cursor:
+            result = self.merge(cursor)
+            cursor.execute(f"DROP TABLE {quote(STAGING_TABLE)}")
+        return result
+
+
+class ProfessionalImporter(Importer):
+    """Importa profissionais (`preferred_name`, `profession`, `specialty`,
+    `address`, `contact`)."""
+
+    kind = "professionals"
+    fields = ("preferred_name", "profession", "specialty", "address", "contact")
+    required = ("preferred_name", "profession", "address", "contact")
+    staging_columns = (
+        ("line", "bigint"),
+        ("preferred_name", "varchar(255)"),
+        ("profession", "varchar(100)"),
+        ("specialty", "varchar(100)"),
+        ("address", "text"),
+        ("contact", "varchar(11)"),
+    )
+
+    def validate(self, batch):
+        columns = {
+            name: [_text(record, name) or None for _, record in batch]
+            for name in self.fields
+        }
+        errors = [{} for _ in batch]
+
+        # Mesma regra de `ProfessionalSerializer.validate_contact`, aplicada
+        # ao lote inteiro de uma vez
+        contact_pattern = Professional.phone_regex.regex
+        matches = map(contact_pattern.fullmatch, (c or "" for c in columns["contact"]))
+        for index, match in enumerate(matches):
+            if match is None:
+                errors[index]["contact"] = [CONTACT_ERROR_MESSAGE]
+
+        for name in self.required:
+            for index, value in enumerate(columns[name]):
+                if value is None:
+                    errors[index][name] = [REQUIRED_MESSAGE]
+        for name in self.fields:
+            max_length = Professional._meta.get_field(name).max_length
+            if max_length is None:
+                continue
+            for index, value in enumerate(columns[name]):
+                if value is not None and len(value) > max_length:
+                    errors[index].setdefault(name, []).append(
+                        f"Certifique-se de que este campo não tenha mais de "
+                        f"{max_length} caracteres."
+                    )
+
+        valid, rejected = [], []
+        for index, (line, _) in enumerate(batch):
+            if errors[index]:
+                rejected.append((line, errors[index]))
+            else:
+                valid.append(
+                    (line, *(columns[name][index] for name in self.fields))
+                )
+        return valid, rejected
+
+    def merge(self, cursor):
+        quote = connection.ops.quote_name
+        now = datetime_adapter()(timezone.now())
+        fields = ", ".join(map(quote, self.fields))
+        cursor.execute(
+            f"INSERT INTO {quote(Professional._meta.db_table)} "
+            f"({fields}, created_at, updated_at) "
+            f"SELECT {fields}, %s, %s FROM {quote(STAGING_TABLE)} ORDER BY line",
+            [now, now],
+        )
+        return cursor.rowcount, []
+
+
+class AppointmentImporter(Importer):
+    """Importa consultas (`professional`, `date`), detectando conflitos."""
+
+    kind = "appointments"
+    staging_columns = (
+        ("line", "bigint"),
+        ("professional_id", "bigint"),
+        ("date", "timestamp with time zone"),
+    )
+
+    def validate(self, batch):
+        adapt = datetime_adapter()
+        tz = timezone.get_current_timezone()
+        valid, rejected, seen = [], [], set()
+        for line, record in batch:
+            errors = {}
+            professional = _text(record, "professional")
+            try:
+                professional = int(professional)
+            except (TypeError, ValueError):
+                errors["professional"] = [
+                    REQUIRED_MESSAGE if professional in (None, "")
+                    else "Um número inteiro válido é necessário."
+                ]
+
+            raw_date = _text(record, "date")
+            date = None
+            if raw_date in (None, ""):
+                errors["date"] = [REQUIRED_MESSAGE]
+            else:
+                try:
+                    date = parse_datetime(str(raw_date))
+                except ValueError:
+                    date = None
+                if date is None:
+                    errors["date"] = [INVALID_DATE_MESSAGE]
+                elif timezone.is_naive(date):
+                    date = timezone.make_aware(date, tz)
+
+            if not errors:
+                # Repetições dentro do próprio arquivo
+                key = (professional, date.timestamp())
+                if key in seen:
+                    errors["date"] = [DOUBLE_BOOKING_MESSAGE]
+                seen.add(key)
+
+            if errors:
+                rejected.append((line, errors))
+            else:
+                valid.append((line, professional, adapt(date)))
+        return valid, rejected
+
+    def merge(self, cursor):
+        quote = connection.ops.quote_name
+        staging = quote(STAGING_TABLE)
+        appointments = quote(Appointment._meta.db_table)
+        professionals = quote(Professional._meta.db_table)
+        known = (
+            f"EXISTS (SELECT 1 FROM {professionals} p "
+            f"WHERE p.id = s.professional_id)"
+        )
+        taken = (
+            f"EXISTS (SELECT 1 FROM {appointments} a "
+            f"WHERE a.professional_id = s.professional_id AND a.date = s.date)"
+        )
+
+        errors = []
+        cursor.execute(f"SELECT line FROM {staging} s WHERE NOT {known}")
+        errors += [
+            (line, {"professional": [PROFESSIONAL_NOT_FOUND_MESSAGE]})
+            for (line,) in cursor.fetchall()
+        ]
+        cursor.execute(f"SELECT line FROM {staging} s WHERE {known} AND {taken}")
+        errors += [
+            (line, {"date": [DOUBLE_BOOKING_MESSAGE]})
+            for (line,) in cursor.fetchall()
+        ]
+
+        now = datetime_adapter()(timezone.now())
+        cursor.execute(
+            f"INSERT INTO {appointments} "
+            f"(professional_id, date, created_at, updated_at) "
+            f"SELECT s.professional_id, s.date, %s, %s FROM {staging} s "
+            f"WHERE {known} AND NOT {taken} "
+            f"ON CONFLICT (professional_id, date) DO NOTHING",
+            [now, now],
+        )
+        return cursor.rowcount, errors
+
+
+IMPORTERS = {
+    importer.kind: importer
+    for importer in (ProfessionalImporter, AppointmentImporter)
+}
+
+
+class ImportRun:
+    """
+    Executa a importação de `path` em lotes, com checkpoint por lote.
+
+    `progress` recebe o dicionário de estatísticas após cada lote e
+    `on_rejected` cada `(linha, erros)` rejeitada.
+    """
+
+    def __init__(
+        self, kind, path, file_format, batch_size, restart=False,
+        progress=None, on_rejected=None,
+    ):
+        self.importer = IMPORTERS[kind]()
+        self.path = os.path.abspath(path)
+        self.file_format = file_format
+        self.batch_size = batch_size
+        self.restart = restart
+        self.progress = progress or (lambda stats: None)
+        self.on_rejected = on_rejected or (lambda line, errors: None)
+
+    def checkpoint(self):
+        file_size = os.path.getsize(self.path)
+        checkpoint, created = ImportCheckpoint.objects.get_or_create(
+            source=self.path,
+            kind=self.importer.kind,
+            defaults={"file_size": file_size},
+        )
+        if self.restart or (not created and checkpoint.file_size != file_size):
+            if not self.restart:
+                raise ImportFormatError(
+                    "O arquivo mudou desde a última importação; use --restart "
+                    "para importá-lo do início."
+                )
+            checkpoint.file_size = file_size
+            checkpoint.line = checkpoint.imported = checkpoint.rejected = 0
+            checkpoint.skipped = 0
+            checkpoint.finished = False
+            checkpoint.save()
+        return checkpoint
+
+    def run(self):
+        checkpoint = self.checkpoint()
+        stats = {
+            "resumed_from_line": checkpoint.line,
+            "read": 0,
+            "imported": checkpoint.imported,
+            "rejected": checkpoint.rejected,
+            "skipped": checkpoint.skipped,
+            "bytes_read": 0,
+            "bytes_total": checkpoint.file_size,
+            "finished": checkpoint.finished,
+        }
+        if checkpoint.finished:
+            return stats
+
+        raw = CountingReader(open(self.path, "rb"))
+        try:
+            with io.TextIOWrapper(io.BufferedReader(raw), encoding="utf-8-sig",
+                                  newline="") as stream:
+                batch = []
+                for line, record in read_records(stream, self.file_format):
+                    if line <= checkpoint.line:
+                        continue
+                    batch.append((line, record))
+                    if len(batch) == self.batch_size:
+                        self.process(batch, checkpoint, stats, raw)
+                        batch = []
+                if batch:
+                    self.process(batch, checkpoint, stats, raw)
+        finally:
+            # Os lotes já gravados ficam mesmo se a importação falhar
+            self.invalidate_caches()
+
+        checkpoint.finished = True
+        checkpoint.save(update_fields=["finished", "updated_at"])
+        stats["finished"] = True
+        return stats
+
+    def process(self, batch, checkpoint, stats, raw):
+        valid, rejected = self.importer.validate(batch)
+        with transaction.atomic():
+            imported, conflicts = (
+                self.importer.load(valid) if valid else (0, [])
+            )
+            # Linhas válidas descartadas pelo ON CONFLICT DO NOTHING
+            skipped = len(valid) - imported - len(conflicts)
+            rejected = sorted(rejected + conflicts)
+            checkpoint.line = batch[-1][0]
+            checkpoint.imported += imported
+            checkpoint.rejected += len(rejected)
+            checkpoint.skipped += skipped
+            checkpoint.save(
+                update_fields=[
+                    "line", "imported", "rejected", "skipped", "updated_at"
+                ]
+            )
+
+        for line, errors in rejected:
+            self.on_rejected(line, errors)
+        stats.update(
+            read=stats["read"] + len(batch),
+            imported=checkpoint.imported,
+            rejected=checkpoint.rejected,
+            skipped=checkpoint.skipped,
+            bytes_read=raw.bytes_read,
+        )
+        self.progress(stats)
+
+    def invalidate_caches(self):
+        """Descarta os caches que os signals manteriam em dia."""
+        professional_cache.clear()
+        invalidate_home_context()
+        professional_index.clear()
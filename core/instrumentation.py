@@ -0,0 +1,85 @@
+"""
+Métricas por requisição: consultas SQL, tempo de banco, serialização e
+renderização.
+
+As métricas da requisição em andamento ficam em uma `ContextVar`, aberta
+por `RequestMetricsMiddleware`. Fora de uma requisição (comandos, shell)
+`track()` não faz nada.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_current = ContextVar("request_metrics", default=None)
+
+
+class QueryBudgetExceeded(Exception):
+    """Uma rota executou mais consultas SQL que o seu orçamento."""
+
+
+class RequestMetrics:
+    """Contadores e tempos (em segundos) de uma requisição."""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.queries = 0
+        self.timings = {"db": 0.0, "serialize": 0.0, "render": 0.0}
+        self._depth = {}
+        self._started = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        """Wrapper de `connection.execute_wrapper` que mede cada consulta."""
+        started_at = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.timings["db"] += time.perf_counter() - started_at
+
+    def elapsed(self):
+        return time.perf_counter() - self.started_at
+
+    def start(self, name):
+        """Abre um bloco da métrica `name`; só o mais externo é medido."""
+        depth = self._depth.get(name, 0)
+        self._depth[name] = depth + 1
+        if not depth:
+            self._started[name] = time.perf_counter()
+
+    def stop(self, name):
+        """Fecha o bloco aberto por `start`."""
+        depth = self._depth[name] - 1
+        self._depth[name] = depth
+        if not depth:
+            self.timings[name] = (
+                self.timings.get(name, 0.0)
+                + time.perf_counter()
+                - self._started.pop(name)
+            )
+
+
+def current_metrics():
+    """Retorna as métricas da requisição em andamento, se houver."""
+    return _current.get()
+
+
+def activate(metrics):
+    return _current.set(metrics)
+
+
+def deactivate(token):
+    _current.reset(token)
+
+
+@contextmanager
+def track(name):
+    """Soma o tempo do bloco à métrica `name` da requisição em andamento."""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    metrics.start(name)
+    try:
+        yield
+    finally:
+        metrics.stop(name)
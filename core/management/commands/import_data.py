@@ -0,0 +1,119 @@
+"""
+Command for bulk importing professionals and appointments from CSV/NDJSON.
+"""
+
+import json
+import os
+import time
+from django.core.management.base import BaseCommand, CommandError
+from core.importers import IMPORTERS, ImportFormatError, ImportRun
+
+
+class Command(BaseCommand):
+    help = (
+        "Import professionals or appointments from a CSV (with header) or "
+        "NDJSON file, in batches loaded through a staging table"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=sorted(IMPORTERS))
+        parser.add_argument("path", help="CSV or NDJSON file to import")
+        parser.add_argument(
+            "--format",
+            choices=["csv", "ndjson"],
+            help="File format (default: inferred from the extension)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Rows validated, staged and merged per transaction",
+        )
+        parser.add_argument(
+            "--errors",
+            help=(
+                "Write rejected and conflicting rows to this NDJSON file "
+                "(line number and errors)"
+            ),
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignore the saved checkpoint and import from the beginning",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if not os.path.isfile(path):
+            raise CommandError(f"Arquivo não encontrado: {path}")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size deve ser maior que zero.")
+
+        file_format = options["format"] or self.infer_format(path)
+        errors_file = (
+            open(options["errors"], "a", encoding="utf-8")
+            if options["errors"]
+            else None
+        )
+        self.started_at = time.perf_counter()
+
+        def on_rejected(line, errors):
+            if errors_file:
+                errors_file.write(
+                    json.dumps({"line": line, "errors": errors}, ensure_ascii=False)
+                    + "\n"
+                )
+
+        run = ImportRun(
+            options["kind"],
+            path,
+            file_format,
+            options["batch_size"],
+            restart=options["restart"],
+            progress=self.report_progress,
+            on_rejected=on_rejected,
+        )
+        try:
+            stats = run.run()
+        except ImportFormatError as e:
+            raise CommandError(str(e))
+        finally:
+            if errors_file:
+                errors_file.close()
+
+        if stats["resumed_from_line"]:
+            self.stdout.write(
+                self.style.NOTICE(
+                    f"Importação retomada após a linha {stats['resumed_from_line']}."
+                )
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Importação concluída: {stats['imported']} linhas importadas, "
+                f"{stats['rejected']} rejeitadas, {stats['skipped']} ignoradas."
+            )
+        )
+
+    def infer_format(self, path):
+        extension = os.path.splitext(path)[1].lower()
+        if extension == ".csv":
+            return "csv"
+        if extension in (".ndjson", ".jsonl"):
+            return "ndjson"
+        raise CommandError(
+            "Não foi possível inferir o formato do arquivo; use --format."
+        )
+
+    def report_progress(self, stats):
+        elapsed = time.perf_counter() - self.started_at
+        percent = (
+            100 * stats["bytes_read"] / stats["bytes_total"]
+            if stats["bytes_total"]
+            else 100
+        )
+        rate = stats["read"] / elapsed if elapsed else 0
+        self.stdout.write(
+            f"{percent:5.1f}% - {stats['read']} linhas lidas ({rate:,.0f}/s), "
+            f"{stats['imported']} importadas, {stats['rejected']} rejeitadas, "
+            f"{stats['skipped']} ignoradas"
+        )
@@ -3,9 +3,15 @@ Command for resetting the database and loading initial data.
 """
 
 import logging
+import os
+import time
+from django.core.cache import cache
 from django.core.management.base import BaseCommand, CommandError
 from django.db import connection
+from django.utils import timezone
 from django.core.management import call_command
+from core import snapshots
+from core.synthetic import SyntheticDataGenerator
 from professionals.models import Professional
 from appointments.models import Appointment
 from datetime import datetime, timedelta
@@ -27,10 +33,62 @@ class Command(BaseCommand):
             action="store_true",
             help="Do not seed initial data",
         )
+        parser.add_argument(
+            "--strategy",
+            choices=["migrations", "schema", "template"],
+            default="migrations",
+            help=(
+                "migrations (default): reverse every migration and reapply "
+                "them; schema: drop and recreate the schema (keeping its "
+                "grants and extensions), then migrate; template: restore a "
+                "PostgreSQL template snapshot keyed by the migrations and "
+                "seed options (created on first use)"
+            ),
+        )
+        parser.add_argument(
+            "--refresh-snapshot",
+            action="store_true",
+            help="Rebuild the template snapshot even if it exists",
+        )
+        parser.add_argument(
+            "--scale",
+            type=int,
+            default=0,
+            help=(
+                "Generate this many synthetic professionals instead of the "
+                "initial data"
+            ),
+        )
+        parser.add_argument(
+            "--appointments-per-professional",
+            type=int,
+            default=100,
+            help="Synthetic appointments per professional (with --scale)",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=42,
+            help="Random seed for the synthetic data",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Parallel processes for the synthetic data (PostgreSQL only)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10000,
+            help="Rows per COPY/bulk_create batch",
+        )
 
     def handle(self, *args, **options):
         no_input = options["no_input"]
-        no_seed = options["no_seed"]
+
+        if options["strategy"] == "template" and connection.vendor != "postgresql":
+            raise CommandError("A estratégia template requer PostgreSQL.")
 
         if not no_input:
             self.stdout.write(
@@ -46,22 +104,68 @@ class Command(BaseCommand):
                 return
 
         try:
-            self.reset_database()
-            self.stdout.write(
-                self.style.SUCCESS("Banco de dados resetado com sucesso!")
-            )
-
-            if not no_seed:
-                self.seed_data()
+            if options["strategy"] == "template":
+                self.reset_from_snapshot(options)
+            else:
+                self.reset_database(options["strategy"])
                 self.stdout.write(
-                    self.style.SUCCESS("Dados iniciais carregados com sucesso!")
+                    self.style.SUCCESS("Banco de dados resetado com sucesso!")
                 )
+                self.load_data(options)
         except Exception as e:
             raise CommandError(f"Erro ao resetar o banco de dados: {e}")
 
-    def reset_database(self):
+    def load_data(self, options):
+        """Load the initial or synthetic data, according to the options."""
+        if options["scale"]:
+            self.generate_synthetic_data(options)
+        elif not options["no_seed"]:
+            self.seed_data()
+            self.stdout.write(
+                self.style.SUCCESS("Dados iniciais carregados com sucesso!")
+            )
+
+    def reset_from_snapshot(self, options):
+        """
+        Restore the database from a template snapshot, creating it first if
+        there is none for the current migrations and seed options.
         """
-        Reset the database by reversing all migrations and then reapplying them.
+        data_options = {
+            "no_seed": options["no_seed"],
+            "scale": options["scale"],
+            "appointments_per_professional": (
+                options["appointments_per_professional"]
+            ),
+            "seed": options["seed"],
+        }
+        # As consultas geradas são relativas à data atual
+        if options["scale"] or not options["no_seed"]:
+            data_options["date"] = timezone.localdate()
+        name = snapshots.template_name(snapshots.snapshot_key(data_options))
+
+        if snapshots.template_exists(name) and not options["refresh_snapshot"]:
+            self.stdout.write(self.style.NOTICE(f"Restaurando snapshot {name}..."))
+            snapshots.restore_template(name)
+            cache.clear()
+            self.stdout.write(
+                self.style.SUCCESS("Banco de dados restaurado do snapshot!")
+            )
+            return
+
+        self.reset_database("schema")
+        self.load_data(options)
+        self.stdout.write(self.style.NOTICE(f"Criando snapshot {name}..."))
+        snapshots.create_template(name)
+        self.stdout.write(
+            self.style.SUCCESS("Banco de dados resetado e snapshot criado!")
+        )
+
+    def reset_database(self, strategy="migrations"):
+        """
+        Reset the database and apply all migrations.
+
+        The "migrations" strategy reverses each app's migrations first;
+        "schema" drops every table at once (DROP SCHEMA on PostgreSQL).
         """
         # Terminar todas as conexões ao banco de dados para evitar bloqueios
         self.stdout.write(self.style.NOTICE("Terminando conexões abertas..."))
@@ -77,6 +181,69 @@ class Command(BaseCommand):
         except Exception as e:
             self.stdout.write(self.style.WARNING(f"Erro ao terminar conexões: {e}"))
 
+        if strategy == "schema":
+            self.drop_schema()
+        else:
+            self.reverse_migrations()
+
+        # Aplicar todas as migrações novamente
+        self.stdout.write(self.style.NOTICE("Aplicando migrações..."))
+        call_command("migrate", "--no-input")
+
+    def drop_schema(self):
+        """
+        Drop every table at once.
+
+        On PostgreSQL the public schema is recreated with the same owner,
+        grants and extensions it had before.
+        """
+        self.stdout.write(self.style.NOTICE("Removendo o schema..."))
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                self.recreate_schema(cursor)
+                return
+
+            tables = connection.introspection.table_names(cursor)
+        with connection.schema_editor() as editor:
+            for table in tables:
+                editor.execute(
+                    f"DROP TABLE IF EXISTS {connection.ops.quote_name(table)}"
+                )
+
+    def recreate_schema(self, cursor):
+        """Recreate the PostgreSQL public schema, keeping grants and extensions."""
+        cursor.execute(
+            "SELECT nspowner::regrole::text FROM pg_namespace "
+            "WHERE nspname = 'public'"
+        )
+        (owner,) = cursor.fetchone()
+        # grantee 0 é o PUBLIC
+        cursor.execute(
+            "SELECT CASE WHEN acl.grantee = 0 THEN 'PUBLIC' "
+            "ELSE quote_ident(acl.grantee::regrole::text) END, "
+            "acl.privilege_type "
+            "FROM pg_namespace, aclexplode(nspacl) AS acl "
+            "WHERE nspname = 'public'"
+        )
+        grants = cursor.fetchall()
+        cursor.execute(
+            "SELECT quote_ident(extname) FROM pg_extension "
+            "WHERE extnamespace = 'public'::regnamespace"
+        )
+        extensions = [name for (name,) in cursor.fetchall()]
+
+        cursor.execute("DROP SCHEMA public CASCADE")
+        cursor.execute("CREATE SCHEMA public")
+        cursor.execute(f"ALTER SCHEMA public OWNER TO {owner}")
+        for grantee, privilege in grants:
+            cursor.execute(f"GRANT {privilege} ON SCHEMA public TO {grantee}")
+        for name in extensions:
+            cursor.execute(
+                f"CREATE EXTENSION IF NOT EXISTS {name} WITH SCHEMA public"
+            )
+
+    def reverse_migrations(self):
+        """Reverse the migrations of every app, one app at a time."""
         # Reverter todas as migrações
         self.stdout.write(self.style.NOTICE("Revertendo migrações..."))
 
@@ -97,9 +264,41 @@ class Command(BaseCommand):
             except Exception as e:
                 self.stdout.write(self.style.WARNING(f"Erro ao reverter {app}: {e}"))
 
-        # Aplicar todas as migrações novamente
-        self.stdout.write(self.style.NOTICE("Aplicando migrações..."))
-        call_command("migrate", "--no-input")
+    def generate_synthetic_data(self, options):
+        """Generate synthetic data in bulk (see core.synthetic)."""
+        started_at = time.perf_counter()
+        last_report = {}
+
+        def progress(kind, done, total):
+            # Um aviso a cada ~10% de cada etapa
+            step = max(1, total // 10)
+            if done == total or done // step != last_report.get(kind):
+                last_report[kind] = done // step
+                elapsed = time.perf_counter() - started_at
+                self.stdout.write(f"{kind}: {done}/{total} ({elapsed:.1f}s)")
+
+        self.stdout.write(
+            self.style.NOTICE(
+                f"Gerando {options['scale']} profissionais e "
+                f"{options['appointments_per_professional']} consultas "
+                "por profissional..."
+            )
+        )
+        SyntheticDataGenerator(
+            scale=options["scale"],
+            per_professional=options["appointments_per_professional"],
+            seed=options["seed"],
+            workers=options["workers"],
+            batch_size=options["batch_size"],
+            progress=progress,
+        ).run()
+        # Escritas em massa não disparam os signals de invalidação
+        cache.clear()
+
+        elapsed = time.perf_counter() - started_at
+        self.stdout.write(
+            self.style.SUCCESS(f"Dados sintéticos gerados em {elapsed:.1f}s!")
+        )
 
     def seed_data(self):
         """Seed the database with initial data."""
@@ -0,0 +1,202 @@
+"""
+Métricas Prometheus da API.
+
+Latência por rota e método (histograma), tamanhos de requisição e
+resposta, consultas SQL por requisição e contadores de erros, alimentados
+por `RequestMetricsMiddleware`, acertos/faltas dos caches da aplicação e
+o uso dos pools de conexões (`core.db_pool`), expostos em `/metrics`.
+
+Com vários workers do gunicorn, defina `PROMETHEUS_MULTIPROC_DIR` (um
+diretório vazio a cada deploy): cada processo grava seus valores em
+arquivos mmap nesse diretório e `/metrics` agrega todos eles (ver
+`gunicorn.conf.py`). `prometheus_client` é opcional; sem ele as métricas
+ficam desativadas.
+
+Fora do `DEBUG`, `/metrics` exige o header
+`Authorization: Bearer <METRICS_TOKEN>`; sem `METRICS_TOKEN` o endpoint
+fica fechado.
+"""
+import os
+import secrets
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+
+from .db_pool import pooled_aliases
+
+try:
+    import prometheus_client
+    from prometheus_client import multiprocess
+except ImportError:  # pragma: no cover - dependência opcional
+    prometheus_client = None
+
+ENABLED = prometheus_client is not None
+
+if ENABLED:
+    LATENCY = prometheus_client.Histogram(
+        "http_request_duration_seconds",
+        "Latência das requisições por rota.",
+        ["route", "method", "status"],
+        buckets=settings.METRICS_LATENCY_BUCKETS,
+    )
+    REQUEST_SIZE = prometheus_client.Summary(
+        "http_request_size_bytes",
+        "Tamanho do corpo das requisições.",
+        ["route", "method"],
+    )
+    RESPONSE_SIZE = prometheus_client.Summary(
+        "http_response_size_bytes",
+        "Tamanho do corpo das respostas (exceto streaming).",
+        ["route", "method"],
+    )
+    QUERIES = prometheus_client.Histogram(
+        "http_request_db_queries",
+        "Consultas SQL por requisição.",
+        ["route", "method"],
+        buckets=settings.METRICS_QUERY_BUCKETS,
+    )
+    DB_TIME = prometheus_client.Histogram(
+        "http_request_db_duration_seconds",
+        "Tempo de banco por requisição.",
+        ["route", "method"],
+        buckets=settings.METRICS_LATENCY_BUCKETS,
+    )
+    ERRORS = prometheus_client.Counter(
+        "http_request_errors",
+        "Respostas 5xx e exceções não tratadas por rota.",
+        ["route", "method", "error"],
+    )
+    CACHE_REQUESTS = prometheus_client.Counter(
+        "cache_requests",
+        "Leituras dos caches da aplicação por resultado (hit/miss).",
+        ["cache", "result"],
+    )
+    DB_POOL_CONNECTIONS = prometheus_client.Gauge(
+        "db_pool_connections",
+        "Conexões dos pools por estado (open/available).",
+        ["alias", "state"],
+        multiprocess_mode="livesum",
+    )
+    DB_POOL_WAITING = prometheus_client.Gauge(
+        "db_pool_requests_waiting",
+        "Pedidos aguardando uma conexão livre do pool.",
+        ["alias"],
+        multiprocess_mode="livesum",
+    )
+    DB_POOL_REQUESTS = prometheus_client.Counter(
+        "db_pool_requests",
+        "Conexões pedidas ao pool, por resultado (ok/error).",
+        ["alias", "result"],
+    )
+    DB_POOL_WAIT = prometheus_client.Counter(
+        "db_pool_wait_seconds",
+        "Tempo total de espera por uma conexão do pool.",
+        ["alias"],
+    )
+    DB_POOL_CONNECT = prometheus_client.Counter(
+        "db_pool_connect_seconds",
+        "Tempo total gasto pelos pools abrindo conexões.",
+        ["alias"],
+    )
+
+
+def observe_request(request, response, route, metrics, exception=None):
+    """
+    Registra as métricas de uma requisição concluída.
+
+    Respostas 5xx contam um erro, rotulado com a classe de `exception`
+    quando a resposta veio de uma exceção não tratada pela view.
+    """
+    if not ENABLED:
+        return
+
+    route = route or "unmatched"
+    method = request.method
+    LATENCY.labels(route, method, str(response.status_code)).observe(
+        metrics.elapsed()
+    )
+    QUERIES.labels(route, method).observe(metrics.queries)
+    DB_TIME.labels(route, method).observe(metrics.timings["db"])
+    REQUEST_SIZE.labels(route, method).observe(
+        int(request.META.get("CONTENT_LENGTH") or 0)
+    )
+    if not response.streaming:
+        RESPONSE_SIZE.labels(route, method).observe(len(response.content))
+    if response.status_code >= 500:
+        error = (
+            type(exception).__name__ if exception else str(response.status_code)
+        )
+        ERRORS.labels(route, method, error).inc()
+
+
+def observe_cache(name, hits, misses):
+    """Conta os acertos e as faltas de uma leitura do cache `name`."""
+    if not ENABLED:
+        return
+    if hits:
+        CACHE_REQUESTS.labels(name, "hit").inc(hits)
+    if misses:
+        CACHE_REQUESTS.labels(name, "miss").inc(misses)
+
+
+def observe_pools():
+    """
+    Publica as estatísticas dos pools de conexões do processo.
+
+    Usa `pop_stats()`, que zera os contadores do pool a cada leitura, para
+    somar só o intervalo desde a requisição anterior.
+    """
+    if not ENABLED:
+        return
+    for alias in pooled_aliases():
+        stats = connections[alias].pool.pop_stats()
+        DB_POOL_CONNECTIONS.labels(alias, "open").set(stats.get("pool_size", 0))
+        DB_POOL_CONNECTIONS.labels(alias, "available").set(
+            stats.get("pool_available", 0)
+        )
+        DB_POOL_WAITING.labels(alias).set(stats.get("requests_waiting", 0))
+        errors = stats.get("requests_errors", 0)
+        DB_POOL_REQUESTS.labels(alias, "ok").inc(
+            stats.get("requests_num", 0) - errors
+        )
+        DB_POOL_REQUESTS.labels(alias, "error").inc(errors)
+        DB_POOL_WAIT.labels(alias).inc(stats.get("requests_wait_ms", 0) / 1000)
+        DB_POOL_CONNECT.labels(alias).inc(stats.get("connections_ms", 0) / 1000)
+
+
+def authorized(request):
+    """Confere o token de `/metrics` (dispensado com `DEBUG` sem token)."""
+    token = settings.METRICS_TOKEN
+    if not token:
+        return settings.DEBUG
+    scheme, _, credentials = request.headers.get("Authorization", "").partition(" ")
+    return scheme.lower() == "bearer" and secrets.compare_digest(
+        credentials.encode(), token.encode()
+    )
+
+
+def metrics_view(request):
+    """Exposição das métricas no formato texto do Prometheus."""
+    if not authorized(request):
+        return HttpResponse(
+            "Token de métricas ausente ou inválido.\n",
+            status=403,
+            content_type="text/plain",
+        )
+    if not ENABLED:
+        return HttpResponse(
+            "prometheus_client não instalado.\n",
+            status=503,
+            content_type="text/plain",
+        )
+
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = prometheus_client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    return HttpResponse(
+        prometheus_client.generate_latest(registry),
+        content_type=prometheus_client.CONTENT_TYPE_LATEST,
+    )
@@ -0,0 +1,263 @@
+"""
+Middlewares compartilhados do projeto.
+"""
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.paginator import Page
+from django.db import connections
+
+from . import db_router
+from . import metrics as prometheus
+from .instrumentation import (
+    QueryBudgetExceeded,
+    RequestMetrics,
+    activate,
+    current_metrics,
+    deactivate,
+)
+
+logger = logging.getLogger("core.requests")
+
+
+class RequestMetricsMiddleware:
+    """
+    Mede cada requisição e publica as métricas.
+
+    Registra o número de consultas SQL e os tempos de banco, serialização,
+    renderização e total. As métricas saem no header `Server-Timing` (se
+    `REQUEST_METRICS_HEADER`) e em uma linha JSON no logger
+    `core.requests`.
+
+    `QUERY_BUDGETS` define o máximo de consultas por rota (nome da URL,
+    ex.: `"appointment-list"`) e método HTTP. Ao estourar, o middleware registra um
+    aviso ou, com `QUERY_BUDGET_ACTION = "raise"` (usado nos testes),
+    levanta `QueryBudgetExceeded`. Os orçamentos contam só as consultas da
+    view: as da autenticação (`QUERY_BUDGET_AUTH_QUERIES`) e o COUNT da
+    paginação por página são somados quando acontecem.
+
+    Com `prometheus_client` instalado, as mesmas medições alimentam os
+    histogramas expostos em `/metrics` (ver `core.metrics`).
+
+    Deve ficar no início de `MIDDLEWARE` para incluir as consultas dos
+    demais middlewares. Funciona tanto sob WSGI quanto sob ASGI.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        metrics = RequestMetrics()
+        token = activate(metrics)
+        try:
+            with self.wrap_connections(metrics):
+                response = self.get_response(request)
+        finally:
+            deactivate(token)
+        return self.publish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = activate(metrics)
+        try:
+            # As conexões são locais à thread: as consultas da requisição
+            # rodam na thread do sync_to_async, onde os wrappers são instalados
+            stack = await sync_to_async(self.wrap_connections)(metrics)
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(stack.close)()
+        finally:
+            deactivate(token)
+        return self.publish(request, response, metrics)
+
+    def wrap_connections(self, metrics):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(metrics))
+        return stack
+
+    def publish(self, request, response, metrics):
+        route = self.get_route(request)
+        self.log(request, response, route, metrics)
+        prometheus.observe_request(
+            request,
+            response,
+            route,
+            metrics,
+            getattr(request, "_unhandled_exception", None),
+        )
+        prometheus.observe_pools()
+        if getattr(settings, "REQUEST_METRICS_HEADER", True):
+            response["Server-Timing"] = self.server_timing(metrics)
+        self.check_budget(request, response, route, metrics)
+        return response
+
+    def process_template_response(self, request, response):
+        # Respostas do DRF são renderizadas depois deste ponto; o callback
+        # pós-renderização fecha o bloco aberto aqui.
+        metrics = current_metrics()
+        if metrics is not None:
+            metrics.start("render")
+            response.add_post_render_callback(
+                lambda response: metrics.stop("render")
+            )
+        return response
+
+    def process_exception(self, request, exception):
+        # O erro é contado uma vez, em publish(), com a classe da exceção no
+        # lugar do status 500 da resposta gerada a partir dela
+        request._unhandled_exception = exception
+
+    def get_route(self, request):
+        match = getattr(request, "resolver_match", None)
+        return match.view_name if match else None
+
+    def server_timing(self, metrics):
+        timings = metrics.timings
+        entries = [
+            f'db;dur={timings["db"] * 1000:.2f};desc="{metrics.queries} queries"',
+            f'serialize;dur={timings["serialize"] * 1000:.2f}',
+            f'render;dur={timings["render"] * 1000:.2f}',
+            f"total;dur={metrics.elapsed() * 1000:.2f}",
+        ]
+        return ", ".join(entries)
+
+    def log(self, request, response, route, metrics):
+        logger.info(
+            json.dumps(
+                {
+                    "method": request.method,
+                    "path": request.path,
+                    "route": route,
+                    "status": response.status_code,
+                    "queries": metrics.queries,
+                    "db_ms": round(metrics.timings["db"] * 1000, 2),
+                    "serialize_ms": round(metrics.timings["serialize"] * 1000, 2),
+                    "render_ms": round(metrics.timings["render"] * 1000, 2),
+                    "total_ms": round(metrics.elapsed() * 1000, 2),
+                }
+            )
+        )
+
+    def check_budget(self, request, response, route, metrics):
+        budgets = getattr(settings, "QUERY_BUDGETS", {}).get(route, {})
+        budget = budgets.get(request.method)
+        if budget is None:
+            return
+        budget += self.budget_overhead(request, response)
+        if metrics.queries <= budget:
+            return
+
+        message = (
+            f"{request.method} na rota '{route}' executou {metrics.queries} "
+            f"consultas (orçamento: {budget})."
+        )
+        if getattr(settings, "QUERY_BUDGET_ACTION", "log") == "raise":
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+    def budget_overhead(self, request, response):
+        """
+        Consultas feitas fora da view, somadas ao orçamento da rota: as da
+        autenticação, quando a requisição traz credenciais, e o COUNT da
+        paginação por número de página.
+        """
+        overhead = 0
+        if (
+            settings.SESSION_COOKIE_NAME in request.COOKIES
+            or "Authorization" in request.headers
+        ):
+            overhead += settings.QUERY_BUDGET_AUTH_QUERIES
+        view = getattr(response, "renderer_context", {}).get("view")
+        page = getattr(getattr(view, "paginator", None), "page", None)
+        # `count` é uma cached_property: só está no __dict__ se foi contado
+        if isinstance(page, Page) and "count" in vars(page.paginator):
+            overhead += 1
+        return overhead
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Abre o estado de `core.db_router.ReplicaRouter` para cada requisição.
+
+    Requisições seguras (GET/HEAD/OPTIONS) leem das réplicas; as demais
+    usam o `default`. Quando a requisição escreve no banco, a resposta
+    leva o cookie `DATABASE_REPLICA_PIN_COOKIE` com o prazo de
+    `DATABASE_REPLICA_PIN_SECONDS`: até lá as leituras desse cliente
+    também vão para o `default`, enquanto as réplicas alcançam a escrita.
+
+    Deve ficar antes dos middlewares que acessam o banco (sessão,
+    autenticação).
+    """
+
+    safe_methods = ("GET", "HEAD", "OPTIONS")
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        state = self.get_state(request)
+        token = db_router.activate(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            db_router.deactivate(token)
+        return self.pin(response, state)
+
+    async def __acall__(self, request):
+        state = self.get_state(request)
+        token = db_router.activate(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            db_router.deactivate(token)
+        return self.pin(response, state)
+
+    def get_state(self, request):
+        return db_router.RoutingState(
+            use_primary=(
+                request.method not in self.safe_methods or self.is_pinned(request)
+            )
+        )
+
+    def pin(self, response, state):
+        if response.streaming:
+            bind = db_router.abind if response.is_async else db_router.bind
+            response.streaming_content = bind(response.streaming_content, state)
+        if state.wrote:
+            seconds = settings.DATABASE_REPLICA_PIN_SECONDS
+            response.set_cookie(
+                settings.DATABASE_REPLICA_PIN_COOKIE,
+                f"{time.time() + seconds:.3f}",
+                max_age=seconds,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+    def is_pinned(self, request):
+        value = request.COOKIES.get(settings.DATABASE_REPLICA_PIN_COOKIE)
+        try:
+            return value is not None and float(value) > time.time()
+        except ValueError:
+            return False
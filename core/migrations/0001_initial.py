@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=500, verbose_name='Arquivo')),
+                ('kind', models.CharField(max_length=20, verbose_name='Tipo')),
+                ('file_size', models.BigIntegerField(verbose_name='Tamanho do arquivo')),
+                ('line', models.PositiveBigIntegerField(default=0, verbose_name='Última linha importada')),
+                ('imported', models.PositiveBigIntegerField(default=0, verbose_name='Linhas importadas')),
+                ('rejected', models.PositiveBigIntegerField(default=0, verbose_name='Linhas rejeitadas')),
+                ('finished', models.BooleanField(default=False, verbose_name='Concluída')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Checkpoint de importação',
+                'verbose_name_plural': 'Checkpoints de importação',
+                'constraints': [models.UniqueConstraint(fields=('source', 'kind'), name='unique_import_checkpoint')],
+            },
+        ),
+    ]
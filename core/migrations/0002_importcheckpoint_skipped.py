@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importcheckpoint',
+            name='skipped',
+            field=models.PositiveBigIntegerField(default=0, verbose_name='Linhas ignoradas'),
+        ),
+    ]
@@ -0,0 +1,587 @@
+"""
+Mixins compartilhados pelos viewsets da API.
+"""
+import hashlib
+from functools import update_wrapper
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.db.models import Count, F, Max
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import serializers
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .instrumentation import track
+from .parsers import MessagePackParser
+from .renderers import CSVRenderer, MessagePackRenderer, NDJSONRenderer, msgpack
+from .serializers import FieldPlan, serializer_columns
+
+
+class SparseFieldsMixin:
+    """
+    Suporte a `?fields=` e `?expand=` nas leituras do viewset.
+
+    `fields` limita os campos da resposta (ex.: `?fields=id,date`) e
+    `expand` inclui os campos aninhados de `expandable_fields` mesmo quando
+    não listados em `fields`. A seleção também poda o SQL: o queryset passa
+    a usar `only()` e perde o `select_related` das relações não incluídas.
+    Sem esses parâmetros a resposta continua com todos os campos.
+    """
+
+    fields_query_param = "fields"
+    expand_query_param = "expand"
+    expandable_fields = ()
+
+    def get_requested_fields(self):
+        if hasattr(self, "_requested_fields"):
+            return self._requested_fields
+
+        self._requested_fields = None
+        params = self.request.query_params
+        if self.request.method not in ("GET", "HEAD") or (
+            self.fields_query_param not in params
+            and self.expand_query_param not in params
+        ):
+            return None
+
+        available = list(self.get_serializer_class()(context={}).fields)
+        requested = self._parse_names(self.fields_query_param) or available
+        expand = self._parse_names(self.expand_query_param)
+
+        errors = {}
+        unknown = [name for name in requested if name not in available]
+        if unknown:
+            errors[self.fields_query_param] = [
+                f"Campos inválidos: {', '.join(unknown)}."
+            ]
+        not_expandable = [
+            name for name in expand if name not in self.expandable_fields
+        ]
+        if not_expandable:
+            errors[self.expand_query_param] = [
+                f"Campos não expansíveis: {', '.join(not_expandable)}."
+            ]
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        self._requested_fields = [
+            name for name in available if name in requested or name in expand
+        ]
+        return self._requested_fields
+
+    def _parse_names(self, param):
+        value = self.request.query_params.get(param, "")
+        return [name.strip() for name in value.split(",") if name.strip()]
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_requested_fields()
+        if fields is not None:
+            kwargs.setdefault("fields", fields)
+        return super().get_serializer(*args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.get_requested_fields() is None:
+            return queryset
+
+        selection = serializer_columns(self.get_serializer())
+        if selection is None:
+            return queryset
+        columns, relations = selection
+
+        # A ordenação (usada também pelo cursor) precisa estar carregada
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        annotations = queryset.query.annotations
+        columns += [
+            name.lstrip("-") for name in ordering
+            if isinstance(name, str)
+            and "__" not in name
+            and name.lstrip("-") not in annotations
+        ]
+        # `select_related()` sem argumentos seguiria todas as relações
+        queryset = queryset.select_related(None)
+        if relations:
+            queryset = queryset.select_related(*relations)
+        return queryset.only(*columns)
+
+
+class MessagePackMixin:
+    """
+    Negociação de `application/msgpack` em todas as ações do viewset.
+
+    O renderer e o parser são somados aos da view (inclusive aos de ações
+    com `parser_classes` próprios, como o `bulk`) quando o pacote `msgpack`
+    está instalado. Também aceita `?format=msgpack`.
+    """
+
+    def get_renderers(self):
+        renderers = super().get_renderers()
+        if msgpack is not None:
+            renderers.append(MessagePackRenderer())
+        return renderers
+
+    def get_parsers(self):
+        parsers = super().get_parsers()
+        if msgpack is not None:
+            parsers.append(MessagePackParser())
+        return parsers
+
+
+class FastListMixin:
+    """
+    Serve a listagem (e a exportação) por um `FieldPlan` pré-compilado.
+
+    A resposta tem o mesmo formato do `serializer_class`, mas é montada a
+    partir de `values_list()` sem instanciar models nem percorrer os campos
+    do DRF a cada linha. Ative por viewset com `fast_list = True`.
+    """
+
+    fast_list = False
+
+    def get_field_plan(self):
+        return FieldPlan(self.get_serializer())
+
+    def list(self, request, *args, **kwargs):
+        if not self.fast_list:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        plan = self.get_field_plan()
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            with track("serialize"):
+                data = plan.from_instances(page)
+            return self.get_paginated_response(data)
+
+        rows = list(queryset.values_list(*plan.lookups))
+        with track("serialize"):
+            data = plan.from_rows(rows)
+        return Response(data)
+
+    async def alist(self, request, *args, **kwargs):
+        if not self.fast_list:
+            return await super().alist(request, *args, **kwargs)
+
+        queryset = await sync_to_async(self.filter_queryset)(self.get_queryset())
+        plan = self.get_field_plan()
+
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            with track("serialize"):
+                data = await plan.afrom_instances(page)
+            return self.get_paginated_response(data)
+
+        rows = [row async for row in queryset.values_list(*plan.lookups)]
+        with track("serialize"):
+            data = await plan.afrom_rows(rows)
+        return Response(data)
+
+
+class StreamingExportMixin:
+    """
+    Exporta a listagem como NDJSON ou CSV em streaming.
+
+    Com `?format=ndjson`/`?format=csv` (ou o `Accept` correspondente), as
+    linhas são lidas com um cursor no servidor (`iterator(chunk_size=...)`)
+    e serializadas uma a uma, mantendo a memória constante. Os filtros e a
+    ordenação da view são aplicados; a paginação não.
+
+    Nas views assíncronas (`alist`) o conteúdo é um iterador assíncrono
+    sobre `aiterator()`: o Django consumiria um iterador síncrono de uma
+    vez sob ASGI, com a exportação inteira em memória.
+    """
+
+    export_chunk_size = 2000
+    export_renderer_classes = (NDJSONRenderer, CSVRenderer)
+    renderer_classes = [
+        *api_settings.DEFAULT_RENDERER_CLASSES,
+        *export_renderer_classes,
+    ]
+
+    def list(self, request, *args, **kwargs):
+        renderer = getattr(request, "accepted_renderer", None)
+        if isinstance(renderer, self.export_renderer_classes):
+            queryset = self.filter_queryset(self.get_queryset())
+            return self.stream_export(queryset, renderer)
+        return super().list(request, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        renderer = getattr(request, "accepted_renderer", None)
+        if isinstance(renderer, self.export_renderer_classes):
+            queryset = await sync_to_async(self.filter_queryset)(self.get_queryset())
+            rows = self.aget_export_rows(queryset)
+            return self.stream_export(queryset, renderer, renderer.arender_rows(rows))
+        return await super().alist(request, *args, **kwargs)
+
+    def get_export_rows(self, queryset):
+        if getattr(self, "fast_list", False):
+            yield from self.get_field_plan().iter_queryset(
+                queryset, chunk_size=self.export_chunk_size
+            )
+            return
+
+        serializer = self.get_serializer()
+        for instance in queryset.iterator(chunk_size=self.export_chunk_size):
+            yield serializer.to_representation(instance)
+
+    async def aget_export_rows(self, queryset):
+        if getattr(self, "fast_list", False):
+            async for item in self.get_field_plan().aiter_queryset(
+                queryset, chunk_size=self.export_chunk_size
+            ):
+                yield item
+            return
+
+        serializer = self.get_serializer()
+        represent = sync_to_async(serializer.to_representation)
+        async for instance in queryset.aiterator(chunk_size=self.export_chunk_size):
+            yield await represent(instance)
+
+    def stream_export(self, queryset, renderer, content=None):
+        if content is None:
+            content = renderer.render_rows(self.get_export_rows(queryset))
+        response = StreamingHttpResponse(
+            content,
+            content_type=f"{renderer.media_type}; charset={renderer.charset}",
+        )
+        if renderer.format == "csv":
+            filename = f"{self.basename or 'export'}.csv"
+            response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+class ConditionalGetMixin:
+    """
+    `ETag`/`Last-Modified` e GET condicional em `list` e `retrieve`.
+
+    O validador vem de `Max(updated_at)` e `Count` do queryset filtrado (na
+    listagem) ou do `updated_at` do objeto (no detalhe), incluindo o
+    `updated_at` das relações de `conditional_related` cujos campos aninhados
+    estão na resposta. Com `If-None-Match`/`If-Modified-Since` válidos a
+    resposta é 304, sem serializar nada.
+
+    A listagem só tem `ETag`: `Max(updated_at)`, com precisão de segundos,
+    não muda quando uma linha antiga é removida ou quando duas escritas
+    caem no mesmo segundo, e um `If-Modified-Since` responderia 304 com
+    dados velhos.
+
+    As páginas por cursor (`CursorPagination` com o parâmetro na query
+    string) não são condicionais: o validador agregaria o queryset
+    filtrado inteiro, e a página por cursor existe justamente para ler só
+    as linhas da página, com latência constante.
+
+    O corpo renderizado fica no cache `CONDITIONAL_CACHE_ALIAS` com a ETag
+    na chave: enquanto os dados não mudam, qualquer processo que use o
+    mesmo cache responde sem passar pelos serializers.
+    """
+
+    # Campo do serializer -> relação cujo `updated_at` entra no validador
+    conditional_related = {}
+    conditional_cache_prefix = "conditional"
+
+    def is_conditional(self, request):
+        renderer = getattr(request, "accepted_renderer", None)
+        return (
+            request.method in ("GET", "HEAD")
+            and renderer is not None
+            and renderer.format not in ("api", "html")
+            and not isinstance(
+                renderer, getattr(self, "export_renderer_classes", ())
+            )
+            and not self.uses_cursor(request)
+        )
+
+    def uses_cursor(self, request):
+        paginator = self.paginator
+        return (
+            isinstance(paginator, CursorPagination)
+            and paginator.cursor_query_param in request.query_params
+        )
+
+    def get_conditional_fields(self):
+        """Expressões de `updated_at` do model e das relações na resposta."""
+        fields = self.get_serializer().fields
+        lookups = ["updated_at"] + [
+            f"{relation}__updated_at"
+            for name, relation in self.conditional_related.items()
+            if name in fields
+        ]
+        return {f"conditional_{index}": lookup for index, lookup in enumerate(lookups)}
+
+    def filter_queryset(self, queryset):
+        # A listagem reaproveita o queryset filtrado usado no validador
+        filtered = getattr(self, "_conditional_queryset", None)
+        if filtered is not None:
+            return filtered
+
+        queryset = super().filter_queryset(queryset)
+        if self.action == "retrieve" and self.is_conditional(self.request):
+            queryset = queryset.annotate(
+                **{
+                    name: F(lookup)
+                    for name, lookup in self.get_conditional_fields().items()
+                }
+            )
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        if not self.is_conditional(request):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        fields = self.get_conditional_fields()
+        state = queryset.order_by().aggregate(**self._list_validators(fields))
+        stamps = [state[name] for name in fields]
+
+        def render():
+            self._conditional_queryset = queryset
+            try:
+                return super(ConditionalGetMixin, self).list(
+                    request, *args, **kwargs
+                )
+            finally:
+                self._conditional_queryset = None
+
+        return self.conditional_response(
+            request, render, stamps, state["conditional_count"], timestamped=False
+        )
+
+    async def alist(self, request, *args, **kwargs):
+        if not await sync_to_async(self.is_conditional)(request):
+            return await super().alist(request, *args, **kwargs)
+
+        queryset = await sync_to_async(self.filter_queryset)(self.get_queryset())
+        fields = self.get_conditional_fields()
+        state = await queryset.order_by().aaggregate(**self._list_validators(fields))
+        stamps = [state[name] for name in fields]
+
+        async def render():
+            self._conditional_queryset = queryset
+            try:
+                return await super(ConditionalGetMixin, self).alist(
+                    request, *args, **kwargs
+                )
+            finally:
+                self._conditional_queryset = None
+
+        return await self.aconditional_response(
+            request, render, stamps, state["conditional_count"], timestamped=False
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        if not self.is_conditional(request):
+            return super().retrieve(request, *args, **kwargs)
+
+        instance = self.get_object()
+        stamps = [getattr(instance, name) for name in self.get_conditional_fields()]
+
+        def render():
+            return Response(self.get_serializer(instance).data)
+
+        return self.conditional_response(request, render, stamps, instance.pk)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        if not await sync_to_async(self.is_conditional)(request):
+            return await super().aretrieve(request, *args, **kwargs)
+
+        instance = await self.aget_object()
+        stamps = [getattr(instance, name) for name in self.get_conditional_fields()]
+
+        async def render():
+            return Response(await self.aserialize(instance))
+
+        return await self.aconditional_response(
+            request, render, stamps, instance.pk
+        )
+
+    def _list_validators(self, fields):
+        return {
+            "conditional_count": Count("pk"),
+            **{name: Max(lookup) for name, lookup in fields.items()},
+        }
+
+    def conditional_response(self, request, render, stamps, state, timestamped=True):
+        """
+        Responde 304, o corpo em cache ou o resultado de `render()`, com os
+        headers de validação (`Last-Modified` só com `timestamped`).
+        """
+        etag, last_modified, key = self._validators(
+            request, stamps, state, timestamped
+        )
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            cache = caches[settings.CONDITIONAL_CACHE_ALIAS]
+            cached = cache.get(key)
+            if cached is not None:
+                response = self._cached_response(cached)
+            else:
+                response = self._cache_rendered(render(), cache, key)
+        return self._set_validators(response, etag, last_modified)
+
+    async def aconditional_response(
+        self, request, render, stamps, state, timestamped=True
+    ):
+        """Versão assíncrona de `conditional_response`."""
+        etag, last_modified, key = self._validators(
+            request, stamps, state, timestamped
+        )
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            cache = caches[settings.CONDITIONAL_CACHE_ALIAS]
+            cached = await cache.aget(key)
+            if cached is not None:
+                response = self._cached_response(cached)
+            else:
+                response = self._cache_rendered(await render(), cache, key)
+        return self._set_validators(response, etag, last_modified)
+
+    def _validators(self, request, stamps, state, timestamped):
+        """`(etag, last_modified, chave do cache)` da resposta."""
+        stamps = [stamp for stamp in stamps if stamp is not None]
+        last_modified = None
+        if timestamped and stamps:
+            last_modified = int(max(stamps).timestamp())
+        renderer = request.accepted_renderer
+        digest = hashlib.sha1(
+            repr(
+                (
+                    # Com esquema e host: o corpo tem links absolutos
+                    request.build_absolute_uri(),
+                    renderer.media_type,
+                    [stamp.isoformat() for stamp in stamps],
+                    state,
+                )
+            ).encode()
+        ).hexdigest()
+        key = f"{self.conditional_cache_prefix}:{digest}"
+        return f'"{digest}"', last_modified, key
+
+    def _cached_response(self, cached):
+        content, content_type = cached
+        return HttpResponse(content, content_type=content_type)
+
+    def _cache_rendered(self, response, cache, key):
+        if response.status_code == 200:
+            response.add_post_render_callback(
+                lambda rendered: cache.set(
+                    key,
+                    (rendered.content, rendered["Content-Type"]),
+                    settings.CONDITIONAL_CACHE_TIMEOUT,
+                )
+            )
+        return response
+
+    def _set_validators(self, response, etag, last_modified):
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+        return response
+
+
+class AsyncReadMixin:
+    """
+    `list` e `retrieve` assíncronos quando `ASYNC_VIEWS` está ligado (ASGI).
+
+    O DRF não tem views assíncronas: aqui a view dessas ações passa a ser
+    uma coroutine. Autenticação, permissões e throttling (`initial`) rodam
+    em uma thread, e as leituras usam o ORM e o cache assíncronos (`alist`,
+    `aretrieve`), liberando o event loop enquanto esperam o banco; as
+    exportações em streaming usam um iterador assíncrono. As demais ações
+    continuam síncronas, em uma thread.
+    Deve ficar logo antes de `viewsets.ModelViewSet` na herança.
+    """
+
+    async_actions = ("list", "retrieve")
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        if not settings.ASYNC_VIEWS or not set(actions.values()) & set(
+            cls.async_actions
+        ):
+            return view
+
+        sync_view = sync_to_async(view)
+
+        async def async_view(request, *args, **kwargs):
+            action_map = dict(actions)
+            if "get" in action_map and "head" not in action_map:
+                action_map["head"] = action_map["get"]
+            if action_map.get(request.method.lower()) not in cls.async_actions:
+                return await sync_view(request, *args, **kwargs)
+
+            self = cls(**initkwargs)
+            self.action_map = action_map
+            for method, action in action_map.items():
+                setattr(self, method, getattr(self, action))
+            self.request = request
+            self.args = args
+            self.kwargs = kwargs
+            return await self.adispatch(request, *args, **kwargs)
+
+        # cls, initkwargs e actions, usados pelo router e pelo schema
+        update_wrapper(async_view, view)
+        return csrf_exempt(async_view)
+
+    async def adispatch(self, request, *args, **kwargs):
+        """`dispatch` do DRF, aguardando a ação assíncrona."""
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            handler = getattr(self, f"a{self.action}")
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def alist(self, request, *args, **kwargs):
+        return await sync_to_async(super().list)(request, *args, **kwargs)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        return Response(await self.aserialize(instance))
+
+    async def aget_object(self):
+        """`get_object` com `aget()`."""
+        queryset = await sync_to_async(self.filter_queryset)(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        filters = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        try:
+            instance = await queryset.aget(**filters)
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404
+        self.check_object_permissions(self.request, instance)
+        return instance
+
+    async def aserialize(self, instance):
+        if getattr(self, "fast_list", False):
+            data = await self.get_field_plan().afrom_instances([instance])
+            return data[0]
+        return await sync_to_async(lambda: self.get_serializer(instance).data)()
+
+    async def apaginate_queryset(self, queryset):
+        if self.paginator is None:
+            return None
+        apaginate = getattr(self.paginator, "apaginate_queryset", None)
+        if apaginate is None:
+            return await sync_to_async(self.paginate_queryset)(queryset)
+        return await apaginate(queryset, self.request, view=self)
@@ -0,0 +1,32 @@
+from django.db import models
+
+
+class ImportCheckpoint(models.Model):
+    """
+    Progresso de uma importação do `import_data`, para retomá-la.
+
+    A linha é gravada na mesma transação de cada lote importado, então uma
+    importação interrompida recomeça exatamente após o último lote gravado.
+    """
+
+    source = models.CharField("Arquivo", max_length=500)
+    kind = models.CharField("Tipo", max_length=20)
+    file_size = models.BigIntegerField("Tamanho do arquivo")
+    line = models.PositiveBigIntegerField("Última linha importada", default=0)
+    imported = models.PositiveBigIntegerField("Linhas importadas", default=0)
+    rejected = models.PositiveBigIntegerField("Linhas rejeitadas", default=0)
+    skipped = models.PositiveBigIntegerField("Linhas ignoradas", default=0)
+    finished = models.BooleanField("Concluída", default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Checkpoint de importação"
+        verbose_name_plural = "Checkpoints de importação"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["source", "kind"], name="unique_import_checkpoint"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}: {self.source} (linha {self.line})"
@@ -0,0 +1,43 @@
+"""
+Paginação compartilhada pelos viewsets da API.
+"""
+from django.core.paginator import InvalidPage, Page
+from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+
+
+class PageNumberPagination(pagination.PageNumberPagination):
+    """
+    `PageNumberPagination` do DRF com `apaginate_queryset`, usado pelas
+    views assíncronas (`core.mixins.AsyncReadMixin`): a contagem e a página
+    são lidas com `acount()` e iteração assíncrona.
+    """
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        # `count` é uma cached_property: a contagem assíncrona a preenche
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            number = paginator.validate_number(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            )
+            raise NotFound(msg)
+
+        bottom = (number - 1) * paginator.per_page
+        top = bottom + paginator.per_page
+        if top + paginator.orphans >= paginator.count:
+            top = paginator.count
+        object_list = [obj async for obj in queryset[bottom:top]]
+        self.page = Page(object_list, number, paginator)
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        return object_list
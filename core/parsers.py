@@ -0,0 +1,96 @@
+"""
+Parsers adicionais para a API.
+
+Com o `orjson` instalado, o JSON é decodificado por ele; sem o pacote, com
+o `json` da biblioteca padrão. O MessagePack depende do pacote `msgpack`
+(extra `msgpack`); sem ele, corpos MessagePack recebem 415.
+"""
+import codecs
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError, UnsupportedMediaType
+from rest_framework.parsers import BaseParser, JSONParser
+
+from .renderers import MessagePackRenderer, ORJSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependência opcional
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - dependência opcional
+    msgpack = None
+
+loads = orjson.loads if orjson is not None else json.loads
+
+
+class ORJSONParser(JSONParser):
+    """
+    `JSONParser` acelerado pelo orjson.
+
+    O corpo é lido de uma vez e decodificado direto dos bytes. Corpos em
+    outro charset que não UTF-8, ou a ausência do orjson, caem no parser
+    padrão do DRF. Assim como nele, `NaN` e `Infinity` são rejeitados.
+    """
+
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or codecs.lookup(encoding).name != "utf-8":
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
+
+
+class MessagePackParser(BaseParser):
+    """
+    Lê um corpo MessagePack (`application/msgpack`).
+
+    Datetimes podem vir como texto ISO 8601 ou na extensão Timestamp, que é
+    decodificada como `datetime` em UTC com fuso.
+    """
+
+    media_type = "application/msgpack"
+    renderer_class = MessagePackRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if msgpack is None:
+            raise UnsupportedMediaType(media_type or self.media_type)
+        try:
+            return msgpack.unpackb(stream.read(), timestamp=3)
+        # Os erros do msgpack (ExtraData, FormatError...) são ValueError
+        except ValueError as exc:
+            raise ParseError(f"MessagePack parse error - {exc}")
+
+
+class NDJSONParser(BaseParser):
+    """
+    Lê um corpo NDJSON (um objeto JSON por linha) como uma lista.
+
+    As linhas são decodificadas à medida que o stream é lido, sem montar o
+    corpo inteiro em uma única string. Linhas em branco são ignoradas.
+    """
+
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+
+        items = []
+        for number, line in enumerate(codecs.getreader(encoding)(stream), 1):
+            if not line.strip():
+                continue
+            try:
+                items.append(loads(line))
+            except ValueError as exc:
+                raise ParseError(f"NDJSON parse error na linha {number} - {exc}")
+        return items
@@ -0,0 +1,205 @@
+"""
+Renderers adicionais para a API.
+
+Com o `orjson` instalado, o JSON (e cada linha do NDJSON) é gerado por ele;
+sem o pacote, os renderers usam o `json` da biblioteca padrão com o
+encoder do DRF, com a mesma saída. O MessagePack depende do pacote
+`msgpack` (extra `msgpack`).
+"""
+import csv
+import io
+import json
+
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependência opcional
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - dependência opcional
+    msgpack = None
+
+# Sem espaços e com o fuso UTC como "Z", como o `JSONRenderer` do DRF
+ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z if orjson is not None else 0
+)
+JS_LINE_SEPARATORS = (
+    (b"\xe2\x80\xa8", b"\\u2028"),
+    (b"\xe2\x80\xa9", b"\\u2029"),
+)
+
+
+# Tipos fora do orjson (Decimal, timedelta, lazy strings...) pelo DRF
+_default = encoders.JSONEncoder().default
+
+
+def dumps(data, indent=False):
+    """
+    Serializa `data` em JSON UTF-8 compacto, como bytes.
+
+    `datetime`, `date`, `time` e `UUID` são tratados pelo próprio orjson;
+    os demais tipos passam pelo `JSONEncoder` do DRF. Retorna `None` se o
+    orjson não está instalado ou não aceita o valor (ex.: inteiros de mais
+    de 64 bits), para que o chamador use o `json` da biblioteca padrão.
+    """
+    if orjson is None:
+        return None
+    option = ORJSON_OPTIONS | orjson.OPT_INDENT_2 if indent else ORJSON_OPTIONS
+    try:
+        content = orjson.dumps(data, default=_default, option=option)
+    except orjson.JSONEncodeError:
+        return None
+    # Como o DRF, escapa U+2028/U+2029 para manter um subconjunto de JS
+    if b"\xe2\x80" in content:
+        for raw, escaped in JS_LINE_SEPARATORS:
+            content = content.replace(raw, escaped)
+    return content
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    `JSONRenderer` acelerado pelo orjson.
+
+    Gera a mesma saída compacta do renderer do DRF. Indentações diferentes
+    de 2 (a API navegável usa 4), `COMPACT_JSON`/`UNICODE_JSON` desligados
+    ou a ausência do orjson caem no renderer padrão.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent in (None, 2) and self.compact and not self.ensure_ascii:
+            content = dumps(data, indent=indent is not None)
+            if content is not None:
+                return content
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Renderiza a resposta como MessagePack (`application/msgpack`).
+
+    O conteúdo é o mesmo do JSON: os campos de data e hora chegam dos
+    serializers como texto ISO 8601 com o fuso. Datetimes com fuso fora
+    dos serializers usam a extensão Timestamp do MessagePack; os demais
+    tipos passam pelo `JSONEncoder` do DRF.
+    """
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if msgpack is None:
+            raise ImproperlyConfigured(
+                "MessagePackRenderer requer o pacote `msgpack` "
+                "(`poetry install --extras msgpack`)."
+            )
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=_default, datetime=True)
+
+
+class RowRenderer(BaseRenderer):
+    """
+    Base dos renderers de exportação, que geram a saída linha a linha.
+
+    `render_rows` aceita qualquer iterável e `arender_rows` um iterável
+    assíncrono (views assíncronas); ambos geram os bytes sob demanda, o que
+    permite usá-los em um `StreamingHttpResponse`. As subclasses definem
+    `row_encoder()`, que devolve a função de cada linha.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        rows = data if isinstance(data, list) else [data]
+        return b"".join(self.render_rows(rows))
+
+    def render_rows(self, rows):
+        encode = self.row_encoder()
+        for row in rows:
+            yield encode(row)
+
+    async def arender_rows(self, rows):
+        encode = self.row_encoder()
+        async for row in rows:
+            yield encode(row)
+
+    def row_encoder(self):
+        raise NotImplementedError
+
+
+class NDJSONRenderer(RowRenderer):
+    """Renderiza uma lista como NDJSON, um objeto JSON por linha."""
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def row_encoder(self):
+        return self.render_line
+
+    def render_line(self, row):
+        line = dumps(row)
+        if line is None:
+            line = json.dumps(
+                row,
+                cls=encoders.JSONEncoder,
+                ensure_ascii=False,
+                separators=(",", ":"),
+            ).encode(self.charset)
+        return line + b"\n"
+
+
+class CSVRenderer(RowRenderer):
+    """
+    Renderiza uma lista como CSV.
+
+    Objetos aninhados viram colunas com o caminho separado por ponto (por
+    exemplo `professional_data.preferred_name`). O cabeçalho é definido pela
+    primeira linha.
+    """
+
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def row_encoder(self):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        header = None
+
+        def encode(row):
+            nonlocal header
+            flat = self.flatten(row)
+            if header is None:
+                header = list(flat)
+                writer.writerow(header)
+            writer.writerow([flat.get(column, "") for column in header])
+            content = buffer.getvalue().encode(self.charset)
+            buffer.seek(0)
+            buffer.truncate()
+            return content
+
+        return encode
+
+    def flatten(self, data, prefix=""):
+        flat = {}
+        for key, value in data.items():
+            column = f"{prefix}{key}"
+            if isinstance(value, dict):
+                flat.update(self.flatten(value, f"{column}."))
+            elif isinstance(value, (list, tuple)):
+                flat[column] = json.dumps(value, cls=encoders.JSONEncoder)
+            else:
+                flat[column] = "" if value is None else value
+        return flat
@@ -0,0 +1,134 @@
+"""
+Busca textual da API.
+
+No PostgreSQL a busca usa a coluna `tsvector` mantida por trigger e índices
+GIN de trigramas sobre o texto sem acentos, ordenando os resultados por
+relevância. Nos demais bancos (SQLite nos testes) cai no `SearchFilter` do
+DRF, com `ILIKE '%termo%'` nos `search_fields`.
+"""
+import re
+import unicodedata
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    TrigramWordSimilarity,
+)
+from django.db import connections
+from django.db.models import F, Func, Q, TextField, Value
+from django.db.models.functions import Lower
+from rest_framework import filters
+from rest_framework.settings import api_settings
+
+SEARCH_CONFIG = "portuguese_unaccent"
+
+
+class ImmutableUnaccent(Func):
+    """
+    `immutable_unaccent(texto)`, a versão indexável de `unaccent`.
+
+    A função é criada pela migração da busca de profissionais.
+    """
+
+    function = "immutable_unaccent"
+    output_field = TextField()
+
+
+def normalize(text):
+    """Remove acentos e converte para minúsculas, como `immutable_unaccent`."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(
+        char for char in decomposed if not unicodedata.combining(char)
+    ).lower()
+
+
+def prefix_query(term):
+    """
+    Monta um `tsquery` de prefixo (`joao:* & silva:*`) a partir do termo.
+
+    Retorna `None` quando o termo não tem nenhuma palavra.
+    """
+    words = re.findall(r"\w+", term)
+    if not words:
+        return None
+    return SearchQuery(
+        " & ".join(f"{word}:*" for word in words),
+        config=SEARCH_CONFIG,
+        search_type="raw",
+    )
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    `SearchFilter` com busca textual e por trigramas no PostgreSQL.
+
+    Cada termo de `?search=` precisa casar com `search_vector_field`
+    (prefixo, via `tsquery`) ou conter-se, sem acentos, em um dos
+    `search_trigram_fields` (`LIKE` atendido pelo índice de trigramas).
+    Sem `?ordering=`, os resultados vêm ordenados por relevância.
+
+    Atributos da view:
+
+    - `search_vector_field`: coluna `tsvector` do model.
+    - `search_trigram_fields`: campos com índice sobre
+      `immutable_unaccent(lower(campo))`.
+    - `search_exact_fields`: campos com índice de trigramas sem
+      normalização (ex.: telefones).
+    """
+
+    rank_annotation = "search_rank"
+
+    def filter_queryset(self, request, queryset, view):
+        vector_field = getattr(view, "search_vector_field", None)
+        vendor = connections[queryset.db].vendor
+        if vector_field is None or vendor != "postgresql":
+            return super().filter_queryset(request, queryset, view)
+
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+
+        trigram_fields = getattr(view, "search_trigram_fields", ())
+        exact_fields = getattr(view, "search_exact_fields", ())
+        queryset = queryset.alias(
+            **{
+                f"_search_{field}": ImmutableUnaccent(Lower(field))
+                for field in trigram_fields
+            }
+        )
+
+        for term in terms:
+            condition = Q()
+            query = prefix_query(term)
+            if query is not None:
+                condition |= Q(**{vector_field: query})
+            for field in trigram_fields:
+                condition |= Q(**{f"_search_{field}__contains": normalize(term)})
+            for field in exact_fields:
+                condition |= Q(**{f"{field}__contains": term})
+            queryset = queryset.filter(condition)
+
+        if request.query_params.get(api_settings.ORDERING_PARAM):
+            return queryset
+
+        # Relevância: rank do tsvector somado à similaridade com o primeiro
+        # campo de trigramas (o nome, no caso dos profissionais).
+        ranks = []
+        query = prefix_query(" ".join(terms))
+        if query is not None:
+            ranks.append(SearchRank(F(vector_field), query))
+        if trigram_fields:
+            ranks.append(
+                TrigramWordSimilarity(
+                    Value(normalize(" ".join(terms))),
+                    F(f"_search_{trigram_fields[0]}"),
+                )
+            )
+        if not ranks:
+            return queryset
+
+        rank = ranks[0] if len(ranks) == 1 else ranks[0] + ranks[1]
+        queryset = queryset.annotate(**{self.rank_annotation: rank})
+        return queryset.order_by(
+            f"-{self.rank_annotation}", *queryset.query.order_by
+        )
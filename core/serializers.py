@@ -0,0 +1,294 @@
+"""
+Utilitários de serialização compartilhados pelos apps.
+"""
+from datetime import datetime
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+from .instrumentation import track
+
+# Campos cujo valor vindo do banco já é a representação final; os demais
+# tipos suportados passam pelo `to_representation` do próprio campo.
+PASSTHROUGH_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.PrimaryKeyRelatedField,
+)
+CONVERTED_FIELDS = (
+    serializers.DateField,
+    serializers.DecimalField,
+    serializers.FloatField,
+    serializers.TimeField,
+    serializers.UUIDField,
+)
+
+
+def datetime_converter(field):
+    """
+    Retorna um conversor equivalente a `DateTimeField.to_representation`.
+
+    O fuso e o formato são resolvidos uma única vez, em vez de a cada valor
+    como no campo do DRF; valores fora do caso comum (datetime com fuso e
+    formato ISO 8601) são delegados ao próprio campo.
+    """
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    field_timezone = getattr(field, "timezone", None) or field.default_timezone()
+    if (
+        output_format is None
+        or output_format.lower() != ISO_8601
+        or field_timezone is None
+    ):
+        return field.to_representation
+
+    def convert(value):
+        if type(value) is not datetime or value.tzinfo is None:
+            return field.to_representation(value)
+        value = value.astimezone(field_timezone).isoformat()
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
+        return value
+
+    return convert
+
+
+class BatchedField(serializers.Field):
+    """
+    Campo somente leitura resolvido em lote a partir do valor de `source`.
+
+    `resolve_many(values)` recebe os valores distintos de uma página (ou de
+    um bloco da exportação) e retorna `{valor: representação}`, permitindo
+    buscar tudo de uma vez (ex.: `cache.get_many`). Fora de um `FieldPlan`
+    cada valor é resolvido individualmente. `aresolve_many` é a versão
+    usada pelas views assíncronas; por padrão roda `resolve_many` em uma
+    thread.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def resolve_many(self, values):
+        raise NotImplementedError
+
+    async def aresolve_many(self, values):
+        return await sync_to_async(self.resolve_many)(values)
+
+    def to_representation(self, value):
+        return self.resolve_many({value}).get(value)
+
+
+class FieldPlan:
+    """
+    Plano pré-compilado da representação de leitura de um serializer.
+
+    O plano é montado uma vez a partir dos campos do serializer e produz
+    exatamente o mesmo formato de `serializer.data`, mas a partir de tuplas
+    de `values_list()` (ou de instâncias), sem o despacho de
+    `get_attribute`/`to_representation` campo a campo.
+
+    Suporta campos simples, chaves estrangeiras como pk, serializers
+    aninhados (sem `many`) e `BatchedField` no nível principal; outros
+    campos geram `TypeError` na compilação.
+    """
+
+    def __init__(self, serializer, prefix=""):
+        model = serializer.Meta.model
+        self.entries = []
+        self.lookups = []
+        self.batched = []
+
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            source = field.source
+
+            if isinstance(field, serializers.BaseSerializer):
+                if isinstance(field, serializers.ListSerializer):
+                    raise TypeError(f"Campo '{name}' com many=True não suportado.")
+                nested = FieldPlan(field, prefix=f"{prefix}{source}__")
+                self.entries.append(
+                    (name, len(self.lookups), source, None, nested)
+                )
+                self.lookups.append(f"{prefix}{source}__pk")
+                self.lookups.extend(nested.lookups)
+                continue
+
+            if isinstance(field, BatchedField):
+                if prefix:
+                    raise TypeError(
+                        f"Campo '{name}' em lote só é suportado no nível principal."
+                    )
+                self.batched.append((name, field))
+                attname = source
+                converter = None
+            elif isinstance(field, serializers.PrimaryKeyRelatedField):
+                attname = model._meta.get_field(source).attname
+                converter = None
+            elif isinstance(field, serializers.DateTimeField):
+                attname = source
+                converter = datetime_converter(field)
+            elif isinstance(field, CONVERTED_FIELDS):
+                attname = source
+                converter = field.to_representation
+            elif isinstance(field, PASSTHROUGH_FIELDS):
+                attname = source
+                converter = None
+            else:
+                raise TypeError(
+                    f"Campo '{name}' ({type(field).__name__}) não suportado."
+                )
+
+            self.entries.append((name, len(self.lookups), attname, converter, None))
+            self.lookups.append(f"{prefix}{source}")
+
+    def _build_row(self, row, offset=0):
+        data = {}
+        for name, index, _, converter, nested in self.entries:
+            value = row[offset + index]
+            if nested is not None:
+                data[name] = (
+                    None if value is None
+                    else nested._build_row(row, offset + index + 1)
+                )
+            elif value is None or converter is None:
+                data[name] = value
+            else:
+                data[name] = converter(value)
+        return data
+
+    def _build_instance(self, instance):
+        data = {}
+        for name, _, attname, converter, nested in self.entries:
+            value = getattr(instance, attname)
+            if nested is not None:
+                data[name] = None if value is None else nested._build_instance(value)
+            elif value is None or converter is None:
+                data[name] = value
+            else:
+                data[name] = converter(value)
+        return data
+
+    def _resolve(self, items):
+        """Substitui os valores dos campos em lote pelas representações."""
+        for name, field in self.batched:
+            values = {item[name] for item in items} - {None}
+            resolved = field.resolve_many(values) if values else {}
+            for item in items:
+                value = item[name]
+                item[name] = None if value is None else resolved.get(value)
+        return items
+
+    async def _aresolve(self, items):
+        for name, field in self.batched:
+            values = {item[name] for item in items} - {None}
+            resolved = await field.aresolve_many(values) if values else {}
+            for item in items:
+                value = item[name]
+                item[name] = None if value is None else resolved.get(value)
+        return items
+
+    def from_rows(self, rows):
+        """Monta as representações a partir de tuplas de `values_list`."""
+        return self._resolve([self._build_row(row) for row in rows])
+
+    def from_instances(self, instances):
+        """Monta as representações a partir de instâncias do model."""
+        return self._resolve([self._build_instance(i) for i in instances])
+
+    async def afrom_rows(self, rows):
+        """Versão assíncrona de `from_rows`."""
+        return await self._aresolve([self._build_row(row) for row in rows])
+
+    async def afrom_instances(self, instances):
+        """Versão assíncrona de `from_instances`."""
+        return await self._aresolve([self._build_instance(i) for i in instances])
+
+    def from_row(self, row):
+        """Monta a representação a partir de uma tupla de `values_list`."""
+        return self.from_rows([row])[0]
+
+    def from_instance(self, instance):
+        """Monta a representação a partir de uma instância do model."""
+        return self.from_instances([instance])[0]
+
+    def iter_queryset(self, queryset, chunk_size=None):
+        """Gera as representações lendo apenas as colunas do plano."""
+        rows = queryset.values_list(*self.lookups)
+        if not chunk_size:
+            yield from self.from_rows(rows)
+            return
+        rows = rows.iterator(chunk_size=chunk_size)
+        while chunk := list(islice(rows, chunk_size)):
+            yield from self.from_rows(chunk)
+
+    async def aiter_queryset(self, queryset, chunk_size):
+        """
+        Versão assíncrona de `iter_queryset`, um bloco por vez.
+
+        Cada bloco é lido do mesmo cursor em uma thread. `aiterator()` não
+        serve: em `values_list()` ele executa a consulta no event loop.
+        """
+        rows = queryset.values_list(*self.lookups).iterator(chunk_size=chunk_size)
+        next_chunk = sync_to_async(lambda: list(islice(rows, chunk_size)))
+        while chunk := await next_chunk():
+            for item in await self.afrom_rows(chunk):
+                yield item
+
+
+class DynamicFieldsModelSerializer(serializers.ModelSerializer):
+    """
+    ModelSerializer que aceita `fields` para limitar os campos retornados.
+    """
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop("fields", None)
+        super().__init__(*args, **kwargs)
+
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+    def to_representation(self, instance):
+        with track("serialize"):
+            return super().to_representation(instance)
+
+
+def serializer_columns(serializer, prefix=""):
+    """
+    Retorna `(colunas, relações)` lidas pelos campos de um serializer.
+
+    As colunas servem para `only()` e as relações (serializers aninhados)
+    para `select_related()`. Retorna `None` quando algum campo não mapeia
+    para uma coluna do model, caso em que o queryset não deve ser podado.
+    """
+    model = serializer.Meta.model
+    columns = [f"{prefix}{model._meta.pk.name}"]
+    relations = []
+
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+
+        if isinstance(field, serializers.BaseSerializer):
+            if isinstance(field, serializers.ListSerializer):
+                return None
+            nested = serializer_columns(field, f"{prefix}{field.source}__")
+            if nested is None:
+                return None
+            relations.append(f"{prefix}{field.source}")
+            columns.extend(nested[0])
+            relations.extend(nested[1])
+            continue
+
+        try:
+            model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            return None
+        columns.append(f"{prefix}{field.source}")
+
+    return columns, relations
@@ -35,6 +35,8 @@ LOCAL_APPS = [
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    "core.middleware.RequestMetricsMiddleware",
+    "core.middleware.ReplicaRoutingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -75,15 +77,109 @@ STATIC_URL = "static/"
 STATIC_ROOT = BASE_DIR / "staticfiles"
 STATICFILES_DIRS = [BASE_DIR / "static"]
 
+# Réplicas de leitura (core.db_router): aliases de DATABASES que recebem as
+# leituras de requisições seguras; vazio mantém tudo no `default`. Após uma
+# escrita, o cliente lê do `default` por DATABASE_REPLICA_PIN_SECONDS.
+DATABASE_ROUTERS = ["core.db_router.ReplicaRouter"]
+DATABASE_REPLICAS = []
+DATABASE_REPLICA_PIN_SECONDS = config(
+    "DATABASE_REPLICA_PIN_SECONDS", default=5, cast=int
+)
+DATABASE_REPLICA_PIN_COOKIE = "db_primary_pin"
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Agenda de consultas
+APPOINTMENT_DURATION_MINUTES = config(
+    "APPOINTMENT_DURATION_MINUTES", default=30, cast=int
+)
+APPOINTMENT_OPENING_HOUR = config("APPOINTMENT_OPENING_HOUR", default=8, cast=int)
+APPOINTMENT_CLOSING_HOUR = config("APPOINTMENT_CLOSING_HOUR", default=18, cast=int)
+AVAILABILITY_MAX_DAYS = 31
+AVAILABILITY_MAX_PROFESSIONALS = 100
+APPOINTMENT_BULK_MAX_ITEMS = config(
+    "APPOINTMENT_BULK_MAX_ITEMS", default=10000, cast=int
+)
+APPOINTMENT_BULK_CHUNK_SIZE = 1000
+
+# Tempo (em segundos) das estatísticas da página inicial em cache
+HOME_CACHE_TIMEOUT = config("HOME_CACHE_TIMEOUT", default=60, cast=int)
+
+# list/retrieve e página inicial assíncronos (core.mixins.AsyncReadMixin);
+# ligado por core.asgi, já que sob WSGI as views assíncronas só adicionam
+# a troca de threads
+ASYNC_VIEWS = config("ASYNC_VIEWS", default=False, cast=bool)
+
+# GET condicional (core.mixins.ConditionalGetMixin): cache do corpo
+# renderizado por ETag; use um backend compartilhado entre os processos
+CONDITIONAL_CACHE_ALIAS = config("CONDITIONAL_CACHE_ALIAS", default="default")
+CONDITIONAL_CACHE_TIMEOUT = config("CONDITIONAL_CACHE_TIMEOUT", default=300, cast=int)
+
+# Cache dos payloads dos profissionais (professionals.cache); incremente a
+# versão para descartar todas as entradas
+PROFESSIONAL_CACHE_ALIAS = config("PROFESSIONAL_CACHE_ALIAS", default="default")
+PROFESSIONAL_CACHE_TIMEOUT = config(
+    "PROFESSIONAL_CACHE_TIMEOUT", default=3600, cast=int
+)
+PROFESSIONAL_CACHE_VERSION = config("PROFESSIONAL_CACHE_VERSION", default=1, cast=int)
+# Só com um cache compartilhado entre os processos o `professional_data` e a
+# validação do campo `professional` das consultas leem o cache; com um cache
+# por processo, a edição ou exclusão feita por outro worker não apareceria
+PROFESSIONAL_CACHE_SHARED = config("PROFESSIONAL_CACHE_SHARED", default=False, cast=bool)
+
+# Autocomplete de profissionais (índice em memória por processo)
+AUTOCOMPLETE_MAX_RESULTS = 20
+AUTOCOMPLETE_REFRESH_SECONDS = config(
+    "AUTOCOMPLETE_REFRESH_SECONDS", default=300, cast=int
+)
+
+# Métricas por requisição (core.middleware.RequestMetricsMiddleware)
+REQUEST_METRICS_HEADER = config("REQUEST_METRICS_HEADER", default=True, cast=bool)
+# Máximo de consultas SQL da view por rota (nome da URL) e método HTTP, sem
+# autenticação nem o COUNT da paginação (somados pelo middleware); ao
+# estourar, QUERY_BUDGET_ACTION decide entre registrar ("log") ou levantar
+# ("raise")
+QUERY_BUDGETS = {
+    "home": {"GET": 6},
+    # As listagens fazem uma consulta a mais para o validador (ETag)
+    "professional-list": {"GET": 2},
+    "professional-detail": {"GET": 1},
+    "professional-availability": {"GET": 2},
+    "professional-availability-batch": {"GET": 2},
+    "professional-autocomplete": {"GET": 1},
+    # Com o cache de profissionais frio, mais uma consulta para os ausentes
+    "appointment-list": {"GET": 4},
+    "appointment-detail": {"GET": 2},
+    "appointment-bulk": {"POST": 10},
+}
+QUERY_BUDGET_ACTION = config("QUERY_BUDGET_ACTION", default="log")
+# Somadas ao orçamento das requisições com credenciais (cookie de sessão ou
+# header Authorization): sessão e usuário da SessionAuthentication
+QUERY_BUDGET_AUTH_QUERIES = 2
+
+# Histogramas Prometheus (core.metrics), em segundos e em consultas
+METRICS_LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+METRICS_QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+# Token exigido em /metrics (Authorization: Bearer <token>); sem ele o
+# endpoint só responde com DEBUG
+METRICS_TOKEN = config("METRICS_TOKEN", default="")
+
 # REST Framework
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
-    # "DEFAULT_RENDERER_CLASSES": [
-    #     "rest_framework.renderers.JSONRenderer",
-    # ],
+    # JSON pelo orjson quando instalado (ver core.renderers/core.parsers)
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "core.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
     "DEFAULT_FILTER_BACKENDS": [
         "django_filters.rest_framework.DjangoFilterBackend",
     ],
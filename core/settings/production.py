@@ -1,4 +1,6 @@
 """Configurações para ambiente de produção."""
+from django.core.exceptions import ImproperlyConfigured
+
 from .base import *
 
 DEBUG = False
@@ -18,12 +20,71 @@ DATABASES = {
         "HOST": config("DB_HOST"),
         "PORT": config("DB_PORT", cast=int),
         "CONN_MAX_AGE": 60,
+        "CONN_HEALTH_CHECKS": True,
         "OPTIONS": {
             "sslmode": "require",
         },
     }
 }
 
+# Pool de conexões do psycopg 3 (extra `pool`: `poetry install --extras
+# pool`, que instala `psycopg[binary,pool]`). Cada worker mantém entre DB_POOL_MIN_SIZE e DB_POOL_MAX_SIZE
+# conexões, abertas no início do worker (ver `core.db_pool`); um pedido
+# espera até DB_POOL_TIMEOUT segundos por uma conexão livre e cada conexão
+# é verificada antes de ser entregue.
+DB_POOL = config("DB_POOL", default=False, cast=bool)
+if DB_POOL:
+    try:
+        import psycopg  # noqa: F401 - o pool do Django exige o psycopg 3
+        from psycopg_pool import ConnectionPool
+    except ImportError as error:
+        raise ImproperlyConfigured(
+            "DB_POOL=True requer o psycopg 3 com o pool "
+            "(`poetry install --extras pool`)."
+        ) from error
+
+    # O pool substitui as conexões persistentes
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "min_size": config("DB_POOL_MIN_SIZE", default=2, cast=int),
+        "max_size": config("DB_POOL_MAX_SIZE", default=10, cast=int),
+        "timeout": config("DB_POOL_TIMEOUT", default=10.0, cast=float),
+        "max_idle": config("DB_POOL_MAX_IDLE", default=300.0, cast=float),
+        "max_lifetime": config("DB_POOL_MAX_LIFETIME", default=1800.0, cast=float),
+        "check": ConnectionPool.check_connection,
+    }
+
+# Réplicas de leitura: hosts separados por vírgula, com as mesmas
+# credenciais do primário (ex.: DB_REPLICA_HOSTS=replica-1,replica-2)
+DB_REPLICA_HOSTS = config(
+    "DB_REPLICA_HOSTS",
+    default="",
+    cast=lambda v: [s.strip() for s in v.split(",") if s.strip()],
+)
+DATABASE_REPLICAS = []
+for index, host in enumerate(DB_REPLICA_HOSTS, start=1):
+    alias = f"replica_{index}"
+    # Cada alias (inclusive as réplicas) tem o seu próprio pool
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+# Cache compartilhado entre os workers (payloads dos profissionais, GET
+# condicional). Requer o pacote `redis`; sem REDIS_URL cada processo usa o
+# seu próprio LocMemCache.
+REDIS_URL = config("REDIS_URL", default="")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+    PROFESSIONAL_CACHE_SHARED = True
+
 # Security
 SECURE_BROWSER_XSS_FILTER = True
 SECURE_CONTENT_TYPE_NOSNIFF = True
@@ -63,7 +124,7 @@ LOGGING = {
 REST_FRAMEWORK.update(
     {
         "DEFAULT_RENDERER_CLASSES": [
-            "rest_framework.renderers.JSONRenderer",
+            "core.renderers.ORJSONRenderer",
         ],
         "DEFAULT_AUTHENTICATION_CLASSES": [
             "rest_framework.authentication.SessionAuthentication",
@@ -72,9 +133,7 @@ REST_FRAMEWORK.update(
         "DEFAULT_PERMISSION_CLASSES": [
             "rest_framework.permissions.IsAuthenticated",
         ],
-        "DEFAULT_PAGINATION_CLASS": (
-            "rest_framework.pagination.PageNumberPagination"
-        ),
+        "DEFAULT_PAGINATION_CLASS": "core.pagination.PageNumberPagination",
         "PAGE_SIZE": 20,
     }
 )
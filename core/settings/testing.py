@@ -11,7 +11,13 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": ":memory:",
-    }
+    },
+    # Banco separado no papel de réplica; só é usado pelos testes que o
+    # declaram em `databases` e ativam DATABASE_REPLICAS
+    "replica": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": ":memory:",
+    },
 }
 
 # Desabilitar migrações para testes mais rápidos
@@ -31,6 +37,9 @@ CACHES = {
     }
 }
 
+# Estouro do orçamento de consultas falha o teste
+QUERY_BUDGET_ACTION = "raise"
+
 # Configurações de senha simples para testes
 AUTH_PASSWORD_VALIDATORS = []
 
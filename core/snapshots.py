@@ -0,0 +1,97 @@
+"""
+Snapshots do banco de desenvolvimento como databases template do PostgreSQL.
+
+Um snapshot é uma cópia do banco recém-migrado (e opcionalmente populado)
+chamada `<banco>_tpl_<chave>`, em que a chave é um hash do conteúdo de
+todas as migrações e das opções de carga. Restaurar é um
+`CREATE DATABASE ... TEMPLATE`, uma cópia de arquivos feita pelo próprio
+PostgreSQL, em vez de reaplicar as migrações.
+"""
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+from django.db import connection
+from django.db.migrations.loader import MigrationLoader
+
+TEMPLATE_SUFFIX = "_tpl_"
+
+
+def migration_hash():
+    """Hash do conteúdo de todas as migrações em disco, em ordem."""
+    loader = MigrationLoader(None, ignore_no_migrations=True)
+    digest = hashlib.sha256()
+    for key in sorted(loader.disk_migrations):
+        module = sys.modules[type(loader.disk_migrations[key]).__module__]
+        digest.update("/".join(key).encode())
+        digest.update(Path(module.__file__).read_bytes())
+    return digest.hexdigest()
+
+
+def snapshot_key(data_options):
+    """Chave do snapshot: migrações + opções usadas para popular o banco."""
+    digest = hashlib.sha256(migration_hash().encode())
+    digest.update(json.dumps(data_options, sort_keys=True, default=str).encode())
+    return digest.hexdigest()[:12]
+
+
+def template_prefix():
+    """Prefixo comum dos snapshots do banco configurado."""
+    # Nomes no PostgreSQL têm no máximo 63 caracteres (a chave usa 12)
+    database = connection.settings_dict["NAME"]
+    return f"{database[:63 - 12 - len(TEMPLATE_SUFFIX)]}{TEMPLATE_SUFFIX}"
+
+
+def template_name(key):
+    """Nome do database template do snapshot `key`."""
+    return f"{template_prefix()}{key}"
+
+
+def _terminate(cursor, database):
+    cursor.execute(
+        "SELECT pg_terminate_backend(pid) FROM pg_stat_activity "
+        "WHERE datname = %s AND pid <> pg_backend_pid()",
+        [database],
+    )
+
+
+def template_exists(name):
+    with connection._nodb_cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_database WHERE datname = %s", [name])
+        return cursor.fetchone() is not None
+
+
+def restore_template(name):
+    """Recria o banco configurado a partir do template `name`."""
+    database = connection.settings_dict["NAME"]
+    quote = connection.ops.quote_name
+    connection.close()
+    with connection._nodb_cursor() as cursor:
+        _terminate(cursor, database)
+        cursor.execute(f"DROP DATABASE IF EXISTS {quote(database)}")
+        cursor.execute(
+            f"CREATE DATABASE {quote(database)} TEMPLATE {quote(name)}"
+        )
+
+
+def create_template(name):
+    """
+    Salva o banco configurado como template `name` e remove os snapshots
+    antigos do mesmo banco.
+    """
+    database = connection.settings_dict["NAME"]
+    quote = connection.ops.quote_name
+    connection.close()
+    with connection._nodb_cursor() as cursor:
+        _terminate(cursor, database)
+        cursor.execute(f"DROP DATABASE IF EXISTS {quote(name)}")
+        cursor.execute(f"CREATE DATABASE {quote(name)} TEMPLATE {quote(database)}")
+
+        cursor.execute(
+            "SELECT datname FROM pg_database "
+            "WHERE starts_with(datname, %s) AND datname <> %s",
+            [template_prefix(), name],
+        )
+        for (stale,) in cursor.fetchall():
+            cursor.execute(f"DROP DATABASE IF EXISTS {quote(stale)}")
@@ -0,0 +1,282 @@
+"""
+Geração de dados sintéticos em grande volume (`reset_db --scale`).
+
+Os dados são gerados em blocos independentes: cada bloco usa um gerador
+aleatório derivado de `(seed, tipo, primeiro id)`, então o resultado é o
+mesmo com qualquer número de processos. Nomes, ruas e cidades vêm de
+listas pt_BR geradas uma vez com o Faker e combinadas por bloco.
+
+No PostgreSQL as linhas são gravadas com `COPY FROM STDIN`; nos demais
+bancos, com `executemany` em uma transação por bloco.
+"""
+import csv
+import io
+import math
+import multiprocessing
+import random
+from datetime import datetime, time, timedelta
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.management.color import no_style
+from django.db import connection, connections, transaction
+from django.utils import timezone
+
+from appointments.models import Appointment
+from professionals.models import Professional
+
+POOL_SIZE = 2000
+# Fração dos horários ocupados na agenda de cada profissional
+OCCUPANCY = 0.5
+
+SPECIALTIES = [
+    ("Cardiologista", "Cardiologia"),
+    ("Clínico Geral", "Clínica Médica"),
+    ("Dermatologista", "Dermatologia"),
+    ("Endocrinologista", "Endocrinologia"),
+    ("Fisioterapeuta", "Fisioterapia"),
+    ("Ginecologista", "Ginecologia"),
+    ("Neurologista", "Neurologia"),
+    ("Nutricionista", "Nutrição"),
+    ("Oftalmologista", "Oftalmologia"),
+    ("Ortopedista", "Ortopedia"),
+    ("Pediatra", "Pediatria"),
+    ("Psicólogo", "Psicologia"),
+    ("Psiquiatra", "Psiquiatria"),
+]
+AREA_CODES = ["11", "21", "31", "41", "51", "61", "71", "81", "85", "92"]
+
+
+@lru_cache(maxsize=None)
+def name_pools(seed):
+    """Listas de nomes, sobrenomes, ruas e cidades pt_BR para a `seed`."""
+    try:
+        from faker import Faker
+    except ImportError as error:
+        raise RuntimeError(
+            "O Faker é necessário para gerar dados sintéticos "
+            "(instale as dependências de desenvolvimento)."
+        ) from error
+
+    fake = Faker("pt_BR")
+    fake.seed_instance(seed)
+    return {
+        "female": [fake.first_name_female() for _ in range(POOL_SIZE)],
+        "male": [fake.first_name_male() for _ in range(POOL_SIZE)],
+        "last": [fake.last_name() for _ in range(POOL_SIZE)],
+        "street": [fake.street_name() for _ in range(POOL_SIZE)],
+        "city": [
+            f"{fake.city()} - {fake.estado_sigla()}" for _ in range(POOL_SIZE)
+        ],
+    }
+
+
+def generate_professionals(first_id, count, seed):
+    """Gera as tuplas dos profissionais `first_id .. first_id + count - 1`."""
+    rng = random.Random(f"{seed}:professionals:{first_id}")
+    pools = name_pools(seed)
+    rows = []
+    for pk in range(first_id, first_id + count):
+        female = rng.random() < 0.5
+        first = rng.choice(pools["female"] if female else pools["male"])
+        name = (
+            f"{'Dra.' if female else 'Dr.'} {first} "
+            f"{rng.choice(pools['last'])} {rng.choice(pools['last'])}"
+        )
+        profession, specialty = rng.choice(SPECIALTIES)
+        address = (
+            f"{rng.choice(pools['street'])}, {rng.randint(1, 3000)}, "
+            f"{rng.choice(pools['city'])}"
+        )
+        contact = f"{rng.choice(AREA_CODES)}9{rng.randint(0, 99999999):08d}"
+        rows.append((pk, name, profession, specialty, address, contact))
+    return rows
+
+
+def slot_datetimes(start_day, slot_count):
+    """Horários de atendimento em dias úteis a partir de `start_day`."""
+    slot_minutes = settings.APPOINTMENT_DURATION_MINUTES
+    opening = settings.APPOINTMENT_OPENING_HOUR
+    per_day = (settings.APPOINTMENT_CLOSING_HOUR - opening) * 60 // slot_minutes
+
+    slots = []
+    day = start_day
+    while len(slots) < slot_count:
+        if day.weekday() < 5:
+            opens_at = timezone.make_aware(datetime.combine(day, time(opening)))
+            slots.extend(
+                opens_at + timedelta(minutes=index * slot_minutes)
+                for index in range(per_day)
+            )
+        day += timedelta(days=1)
+    return slots[:slot_count]
+
+
+def generate_appointments(professional_ids, per_professional, seed, start_day):
+    """
+    Gera `(professional_id, date)` sem sobreposição para cada profissional.
+
+    Cada agenda ocupa `OCCUPANCY` dos horários de uma janela de dias úteis
+    a partir de `start_day`, sorteados sem repetição.
+    """
+    rng = random.Random(f"{seed}:appointments:{professional_ids[0]}")
+    window = slot_datetimes(
+        start_day, math.ceil(per_professional / OCCUPANCY)
+    )
+    rows = []
+    for professional_id in professional_ids:
+        for slot in sorted(rng.sample(range(len(window)), per_professional)):
+            rows.append((professional_id, window[slot]))
+    return rows
+
+
+def copy_rows(table, columns, rows):
+    """Grava as linhas com `COPY FROM STDIN` (psycopg2 ou psycopg 3)."""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+
+    with connection.cursor() as cursor:
+        raw = cursor.cursor
+        if hasattr(raw, "copy_expert"):
+            raw.copy_expert(sql, buffer)
+        else:
+            with raw.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+
+
+def insert_rows(table, columns, rows):
+    """Grava as linhas com um `executemany` em uma transação."""
+    quote = connection.ops.quote_name
+    sql = (
+        f"INSERT INTO {quote(table)} ({', '.join(map(quote, columns))}) "
+        f"VALUES ({', '.join(['%s'] * len(columns))})"
+    )
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(sql, list(rows))
+
+
+def write_rows(model, columns, rows):
+    if connection.vendor == "postgresql":
+        copy_rows(model._meta.db_table, columns, rows)
+    else:
+        insert_rows(model._meta.db_table, columns, rows)
+
+
+def datetime_adapter():
+    """
+    Converte datetimes para o formato do banco, uma vez por valor.
+
+    Os horários se repetem entre os profissionais de um bloco, então a
+    conversão (fuso e formatação) é feita só na primeira ocorrência.
+    """
+    if connection.vendor == "postgresql":
+        return lru_cache(maxsize=None)(datetime.isoformat)
+    return lru_cache(maxsize=None)(connection.ops.adapt_datetimefield_value)
+
+
+def write_professionals(rows):
+    now = datetime_adapter()(timezone.now())
+    write_rows(
+        Professional,
+        [
+            "id", "preferred_name", "profession", "specialty", "address",
+            "contact", "created_at", "updated_at",
+        ],
+        (row + (now, now) for row in rows),
+    )
+
+
+def write_appointments(rows):
+    adapt = datetime_adapter()
+    now = adapt(timezone.now())
+    write_rows(
+        Appointment,
+        ["professional_id", "date", "created_at", "updated_at"],
+        (
+            (professional_id, adapt(date), now, now)
+            for professional_id, date in rows
+        ),
+    )
+
+
+def run_task(task):
+    """Executa um bloco de geração (chamado nos processos filhos)."""
+    kind, first_id, count, seed, per_professional, start_day = task
+    if kind == "professionals":
+        write_professionals(generate_professionals(first_id, count, seed))
+        return kind, count
+    ids = list(range(first_id, first_id + count))
+    rows = generate_appointments(ids, per_professional, seed, start_day)
+    write_appointments(rows)
+    return kind, len(rows)
+
+
+class SyntheticDataGenerator:
+    """
+    Gera `scale` profissionais e `per_professional` consultas para cada um.
+
+    `progress` recebe `(tipo, linhas gravadas, total)` a cada bloco.
+    """
+
+    def __init__(
+        self, scale, per_professional, seed, workers, batch_size, progress=None
+    ):
+        self.scale = scale
+        self.per_professional = per_professional
+        self.seed = seed
+        self.batch_size = batch_size
+        self.progress = progress or (lambda kind, done, total: None)
+        # SQLite não aceita escritas paralelas (e em memória cada processo
+        # teria o seu próprio banco)
+        self.workers = 1 if connection.vendor == "sqlite" else max(1, workers)
+
+    def run(self):
+        first_id = (
+            Professional.objects.order_by("-id").values_list("id", flat=True).first()
+            or 0
+        ) + 1
+        start_day = timezone.localdate() - timedelta(days=30)
+        # Valida o Faker antes de abrir processos
+        name_pools(self.seed)
+
+        professionals = [
+            ("professionals", pk, min(self.batch_size, first_id + self.scale - pk),
+             self.seed, 0, start_day)
+            for pk in range(first_id, first_id + self.scale, self.batch_size)
+        ]
+        step = max(1, self.batch_size // max(1, self.per_professional))
+        appointments = [
+            ("appointments", pk, min(step, first_id + self.scale - pk),
+             self.seed, self.per_professional, start_day)
+            for pk in range(first_id, first_id + self.scale, step)
+        ] if self.per_professional else []
+
+        self._run(professionals, self.scale)
+        self._reset_sequences()
+        self._run(appointments, self.scale * self.per_professional)
+
+    def _run(self, tasks, total):
+        done = 0
+        if self.workers == 1:
+            for task in tasks:
+                kind, count = run_task(task)
+                done += count
+                self.progress(kind, done, total)
+            return
+
+        # Os filhos (fork) abrem suas próprias conexões
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        with context.Pool(self.workers) as pool:
+            for kind, count in pool.imap_unordered(run_task, tasks):
+                done += count
+                self.progress(kind, done, total)
+
+    def _reset_sequences(self):
+        statements = connection.ops.sequence_reset_sql(no_style(), [Professional])
+        if statements:
+            with connection.cursor() as cursor:
+                for statement in statements:
+                    cursor.execute(statement)
@@ -0,0 +1,656 @@
+"""
+Testes unitários para a aplicação core.
+"""
+import json
+import os
+import tempfile
+import uuid
+import pytest
+from datetime import date, datetime, timedelta
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock, skipIf, skipUnless
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.http import HttpResponseServerError, StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.exceptions import ParseError, UnsupportedMediaType
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from core import db_pool, db_router, metrics
+from appointments.models import Appointment
+from appointments.views import AppointmentViewSet
+from core.importers import AppointmentImporter, ImportRun
+from core.instrumentation import QueryBudgetExceeded
+from core.middleware import ReplicaRoutingMiddleware, RequestMetricsMiddleware
+from core import parsers, renderers
+from core.models import ImportCheckpoint
+from core.pagination import PageNumberPagination
+from core.parsers import MessagePackParser, ORJSONParser
+from core.renderers import MessagePackRenderer, ORJSONRenderer
+from core.snapshots import snapshot_key, template_name
+from core.synthetic import SyntheticDataGenerator
+from pages.views import HOME_CONTEXT_CACHE_KEY
+from professionals.autocomplete import professional_index
+from professionals.cache import professional_cache
+from professionals.models import Professional
+from professionals.views import ProfessionalViewSet
+from tests.factories import AppointmentFactory, ProfessionalFactory
+
+
+@pytest.mark.django_db
+class RequestMetricsMiddlewareTestCase(APITestCase):
+    """Testes para as métricas por requisição."""
+
+    def setUp(self):
+        """Cria consultas para a listagem."""
+        AppointmentFactory.create_batch(3)
+        self.url = reverse("appointment-list")
+
+    def test_header_server_timing(self):
+        """Testa o header Server-Timing com consultas e tempos."""
+        response = self.client.get(self.url)
+
+        timing = response["Server-Timing"]
+        self.assertIn('db;dur=', timing)
+        # Validador do GET condicional, a listagem e os profissionais fora
+        # do cache
+        self.assertIn('desc="3 queries"', timing)
+        for metric in ("serialize;dur=", "render;dur=", "total;dur="):
+            self.assertIn(metric, timing)
+
+    def test_log_estruturado(self):
+        """Testa a linha JSON registrada para cada requisição."""
+        with self.assertLogs("core.requests", level="INFO") as logs:
+            self.client.get(self.url, {"fields": "id"})
+
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual(line["route"], "appointment-list")
+        self.assertEqual(line["status"], 200)
+        self.assertEqual(line["queries"], 2)
+        self.assertGreater(line["serialize_ms"], 0)
+        self.assertGreater(line["render_ms"], 0)
+
+    @override_settings(QUERY_BUDGETS={"appointment-list": {"GET": 0}})
+    def test_orcamento_excedido_levanta_excecao(self):
+        """Testa que o orçamento estourado falha nos testes."""
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get(self.url)
+
+    @override_settings(
+        QUERY_BUDGETS={"appointment-list": {"GET": 0}},
+        QUERY_BUDGET_ACTION="log",
+    )
+    def test_orcamento_excedido_registra_aviso(self):
+        """Testa que, fora dos testes, o estouro só gera um aviso."""
+        with self.assertLogs("core.requests", level="WARNING") as logs:
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("orçamento: 0", logs.records[-1].getMessage())
+
+    def test_orcamento_com_autenticacao_e_paginacao_de_producao(self):
+        """
+        Testa os orçamentos com a autenticação por sessão, a permissão e a
+        paginação por página configuradas em produção.
+        """
+        professional = ProfessionalFactory()
+        user = get_user_model().objects.create_user("api", password="senha")
+        self.client.force_login(user)
+        production = {
+            "authentication_classes": [SessionAuthentication],
+            "permission_classes": [IsAuthenticated],
+        }
+        pagination = type("Pagination", (PageNumberPagination,), {"page_size": 20})
+
+        with mock.patch.multiple(
+            ProfessionalViewSet, pagination_class=pagination, **production
+        ), mock.patch.multiple(AppointmentViewSet, **production):
+            for url in (
+                reverse("professional-list"),
+                reverse("professional-detail", args=[professional.pk]),
+                self.url,
+            ):
+                with self.subTest(url=url):
+                    response = self.client.get(url)
+                    self.assertEqual(response.status_code, 200)
+
+            response = self.client.get(reverse("professional-list"))
+            self.assertEqual(response.json()["count"], Professional.objects.count())
+
+    async def test_header_server_timing_sob_asgi(self):
+        """Testa as métricas com o middleware no modo assíncrono (ASGI)."""
+        response = await self.async_client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('desc="3 queries"', response["Server-Timing"])
+
+
+@skipUnless(
+    "replica" in settings.DATABASES, "alias de banco `replica` não configurado"
+)
+@override_settings(DATABASE_REPLICAS=["replica"])
+class ReplicaRoutingTestCase(APITestCase):
+    """
+    Testes para o roteamento de leituras, com o banco `replica` (separado e
+    sem replicação) no papel de réplica.
+    """
+
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse("professional-list")
+        self.professional = ProfessionalFactory()
+
+    def test_leituras_seguras_usam_a_replica(self):
+        """Testa o GET lido da réplica e o código fora de requisições no primário."""
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.data, [])
+        self.assertEqual(Professional.objects.count(), 1)
+        self.assertNotIn(settings.DATABASE_REPLICA_PIN_COOKIE, response.cookies)
+
+    def test_exportacao_em_streaming_usa_a_replica(self):
+        """Testa que a exportação, consumida após o middleware, lê da réplica."""
+        response = self.client.get(self.url, {"format": "ndjson"})
+
+        self.assertEqual(b"".join(response.streaming_content), b"")
+
+    async def test_conteudo_assincrono_mantem_o_roteamento(self):
+        """Testa que o iterador assíncrono da resposta segue na réplica."""
+
+        async def content():
+            yield str(db_router.current_state().use_primary).encode()
+
+        async def get_response(request):
+            return StreamingHttpResponse(content())
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        response = await middleware(RequestFactory().get(self.url))
+
+        self.assertTrue(response.is_async)
+        chunks = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(chunks, [b"False"])
+        self.assertIsNone(db_router.current_state())
+
+    async def test_leituras_seguras_usam_a_replica_sob_asgi(self):
+        """Testa o roteamento com o middleware no modo assíncrono (ASGI)."""
+        response = await self.async_client.get(self.url)
+
+        self.assertEqual(response.json(), [])
+
+    def test_escrita_fixa_o_cliente_no_primario(self):
+        """Testa que, após escrever, o cliente lê as próprias escritas."""
+        response = self.client.post(
+            self.url,
+            {
+                "preferred_name": "Ana Souza",
+                "profession": "Cardiologista",
+                "address": "Rua A, 1",
+                "contact": "11988887777",
+            },
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertIn(settings.DATABASE_REPLICA_PIN_COOKIE, response.cookies)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(len(response.data), 2)
+
+    def test_prazo_expirado_volta_para_a_replica(self):
+        """Testa que o cookie vencido não fixa mais o cliente no primário."""
+        self.client.cookies[settings.DATABASE_REPLICA_PIN_COOKIE] = "0"
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.data, [])
+
+
+@pytest.mark.django_db
+class PrometheusMetricsTestCase(APITestCase):
+    """Testes para o endpoint /metrics."""
+
+    @skipUnless(metrics.ENABLED, "prometheus_client não instalado")
+    @override_settings(METRICS_TOKEN="segredo")
+    def test_histograma_por_rota(self):
+        """Testa que a latência é registrada por rota, método e status."""
+        AppointmentFactory()
+        self.client.get(reverse("appointment-list"))
+
+        response = self.client.get(
+            reverse("metrics"), HTTP_AUTHORIZATION="Bearer segredo"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("http_request_db_queries_bucket", response.content.decode())
+        self.assertGreaterEqual(
+            metrics.prometheus_client.REGISTRY.get_sample_value(
+                "http_request_duration_seconds_count",
+                {"route": "appointment-list", "method": "GET", "status": "200"},
+            ),
+            1,
+        )
+
+    @skipUnless(metrics.ENABLED, "prometheus_client não instalado")
+    def test_estatisticas_do_pool(self):
+        """Testa a publicação da espera e do uso dos pools de conexões."""
+        pool = mock.Mock()
+        pool.pop_stats.return_value = {
+            "pool_size": 4,
+            "pool_available": 1,
+            "requests_num": 10,
+            "requests_errors": 1,
+            "requests_wait_ms": 1500,
+        }
+        fake = {
+            "pooled": mock.Mock(
+                settings_dict={"OPTIONS": {"pool": True}}, pool=pool
+            )
+        }
+
+        with mock.patch("core.db_pool.connections", fake), mock.patch(
+            "core.metrics.connections", fake
+        ):
+            metrics.observe_pools()
+
+        registry = metrics.prometheus_client.REGISTRY
+        self.assertEqual(
+            registry.get_sample_value(
+                "db_pool_wait_seconds_total", {"alias": "pooled"}
+            ),
+            1.5,
+        )
+        self.assertEqual(
+            registry.get_sample_value(
+                "db_pool_connections", {"alias": "pooled", "state": "open"}
+            ),
+            4,
+        )
+
+    @skipUnless(metrics.ENABLED, "prometheus_client não instalado")
+    def test_excecao_nao_tratada_conta_um_erro(self):
+        """Testa que a exceção não tratada não conta também o status 500."""
+        def view(request):
+            middleware.process_exception(request, ValueError("falhou"))
+            return HttpResponseServerError()
+
+        middleware = RequestMetricsMiddleware(view)
+        registry = metrics.prometheus_client.REGISTRY
+
+        def errors(error):
+            return registry.get_sample_value(
+                "http_request_errors_total",
+                {"route": "unmatched", "method": "GET", "error": error},
+            ) or 0
+
+        before = errors("ValueError"), errors("500")
+        middleware(RequestFactory().get("/falha/"))
+
+        self.assertEqual(errors("ValueError"), before[0] + 1)
+        self.assertEqual(errors("500"), before[1])
+
+    @override_settings(METRICS_TOKEN="segredo")
+    def test_token_obrigatorio(self):
+        """Testa que /metrics recusa requisições sem o token."""
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, 403)
+
+        response = self.client.get(
+            reverse("metrics"), HTTP_AUTHORIZATION="Bearer outro"
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_fechado_sem_token_fora_do_debug(self):
+        """Testa que, sem METRICS_TOKEN e sem DEBUG, /metrics fica fechado."""
+        response = self.client.get(reverse("metrics"))
+
+        self.assertEqual(response.status_code, 403)
+
+    @skipIf(metrics.ENABLED, "prometheus_client instalado")
+    @override_settings(METRICS_TOKEN="segredo")
+    def test_sem_prometheus_client(self):
+        """Testa a resposta de /metrics sem a dependência opcional."""
+        response = self.client.get(
+            reverse("metrics"), HTTP_AUTHORIZATION="Bearer segredo"
+        )
+
+        self.assertEqual(response.status_code, 503)
+
+
+class DatabasePoolTestCase(TestCase):
+    """Testes para a abertura dos pools de conexões."""
+
+    def test_abre_somente_os_bancos_com_pool(self):
+        """Testa que só os aliases com OPTIONS["pool"] são abertos."""
+        pooled = mock.Mock(settings_dict={"OPTIONS": {"pool": {"min_size": 2}}})
+        direct = mock.Mock(settings_dict={"OPTIONS": {}})
+
+        with mock.patch(
+            "core.db_pool.connections", {"pooled": pooled, "direct": direct}
+        ):
+            self.assertEqual(db_pool.pooled_aliases(), ["pooled"])
+            db_pool.open_pools(timeout=5)
+
+        pooled.pool.open.assert_called_once_with(wait=True, timeout=5)
+        direct.pool.open.assert_not_called()
+
+
+@pytest.mark.django_db
+class SyntheticDataGeneratorTestCase(TestCase):
+    """Testes para a geração de dados sintéticos do reset_db."""
+
+    def generate(self, seed=7):
+        SyntheticDataGenerator(
+            scale=30, per_professional=12, seed=seed, workers=1, batch_size=8
+        ).run()
+        return (
+            list(Professional.objects.order_by("id").values_list(
+                "preferred_name", "specialty", "address", "contact"
+            )),
+            list(Appointment.objects.order_by("professional_id", "date")
+                 .values_list("professional_id", "date")),
+        )
+
+    def test_volumes_e_agendas_sem_sobreposicao(self):
+        """Testa os volumes gerados e os horários das agendas."""
+        professionals, appointments = self.generate()
+
+        self.assertEqual(len(professionals), 30)
+        self.assertEqual(len(appointments), 30 * 12)
+        self.assertEqual(len(set(appointments)), len(appointments))
+        for _, date in appointments:
+            local = timezone.localtime(date)
+            self.assertLess(local.weekday(), 5)
+            self.assertGreaterEqual(local.hour, settings.APPOINTMENT_OPENING_HOUR)
+            self.assertLess(local.hour, settings.APPOINTMENT_CLOSING_HOUR)
+
+    def test_determinismo_pela_seed(self):
+        """Testa que a mesma seed gera os mesmos dados."""
+        first = self.generate()
+        Appointment.objects.all().delete()
+        Professional.objects.all().delete()
+
+        second = self.generate()
+
+        self.assertEqual(first[0], second[0])
+        self.assertEqual(
+            [date for _, date in first[1]], [date for _, date in second[1]]
+        )
+
+
+class SnapshotKeyTestCase(TestCase):
+    """Testes para a chave dos snapshots do reset_db."""
+
+    def test_chave_depende_das_opcoes(self):
+        """Testa que a chave é estável e muda com as opções de carga."""
+        options = {"scale": 1000, "seed": 42}
+
+        self.assertEqual(snapshot_key(options), snapshot_key(dict(options)))
+        self.assertNotEqual(
+            snapshot_key(options), snapshot_key({"scale": 1000, "seed": 7})
+        )
+
+    def test_nome_do_template_limitado(self):
+        """Testa o limite de 63 caracteres do nome do template."""
+        name = template_name("a" * 12)
+
+        self.assertLessEqual(len(name), 63)
+        self.assertTrue(name.endswith("_tpl_" + "a" * 12))
+
+
+class ResetDbTestCase(TestCase):
+    """Testes para a escolha da estratégia do reset_db."""
+
+    def reset_db(self, *args):
+        with mock.patch(
+            "core.management.commands.reset_db.Command.reset_database"
+        ) as reset_database, mock.patch(
+            "core.management.commands.reset_db.Command.load_data"
+        ):
+            call_command("reset_db", "--no-input", *args, stdout=StringIO())
+        return reset_database
+
+    def test_estrategia_padrao_reverte_as_migracoes(self):
+        """Testa que o DROP SCHEMA só roda quando pedido."""
+        self.reset_db().assert_called_once_with("migrations")
+        self.reset_db("--strategy", "schema").assert_called_once_with("schema")
+
+
+class ImportDataTestCase(TestCase):
+    """Testes para o comando import_data."""
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w", encoding="utf-8") as output:
+            output.write(content)
+        return path
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.errors = os.path.join(self.directory.name, "errors.ndjson")
+
+    def import_data(self, *args):
+        call_command(
+            "import_data", *args, "--errors", self.errors, stdout=StringIO()
+        )
+        with open(self.errors, encoding="utf-8") as errors:
+            return [json.loads(line) for line in errors]
+
+    def test_csv_de_profissionais_rejeita_contatos_invalidos(self):
+        """Testa a importação de CSV com validação do contato."""
+        path = self.write(
+            "professionals.csv",
+            "preferred_name,profession,specialty,address,contact\n"
+            "Dra. Ana,Cardiologista,Cardiologia,Rua A,11999990001\n"
+            "Dr. Bruno,Pediatra,,Rua B,1199\n"
+            "Dr. Carlos,Ortopedista,,Rua C,11999990003\n",
+        )
+
+        errors = self.import_data("professionals", path, "--batch-size", "2")
+
+        self.assertEqual(
+            sorted(Professional.objects.values_list("preferred_name", flat=True)),
+            ["Dr. Carlos", "Dra. Ana"],
+        )
+        self.assertIsNone(Professional.objects.get(preferred_name="Dr. Carlos").specialty)
+        self.assertEqual([error["line"] for error in errors], [3])
+        self.assertIn("contact", errors[0]["errors"])
+
+    def test_ndjson_de_consultas_reporta_conflitos(self):
+        """Testa conflitos com o banco, no arquivo e profissional inexistente."""
+        existing = AppointmentFactory()
+        professional = existing.professional
+        free = existing.date + timedelta(hours=1)
+        records = [
+            {"professional": professional.id, "date": existing.date.isoformat()},
+            {"professional": professional.id, "date": free.isoformat()},
+            {"professional": professional.id, "date": free.isoformat()},
+            {"professional": 999999, "date": free.isoformat()},
+            {"professional": professional.id, "date": "ontem"},
+        ]
+        path = self.write(
+            "appointments.ndjson", "".join(json.dumps(r) + "\n" for r in records)
+        )
+
+        errors = self.import_data("appointments", path)
+
+        self.assertEqual(professional.appointments.count(), 2)
+        self.assertTrue(professional.appointments.filter(date=free).exists())
+        self.assertEqual(
+            {error["line"]: sorted(error["errors"]) for error in errors},
+            {1: ["date"], 3: ["date"], 4: ["professional"], 5: ["date"]},
+        )
+
+    def test_linhas_descartadas_no_insert_contam_como_ignoradas(self):
+        """Testa que o resumo soma as linhas descartadas pelo ON CONFLICT."""
+        professional = ProfessionalFactory()
+        path = self.write(
+            "appointments.ndjson",
+            "".join(
+                json.dumps({
+                    "professional": professional.id,
+                    "date": (timezone.now() + timedelta(hours=hours)).isoformat(),
+                }) + "\n"
+                for hours in (1, 2)
+            ),
+        )
+
+        # Outra escrita grava um dos horários entre a checagem e o INSERT
+        with mock.patch.object(
+            AppointmentImporter, "merge", return_value=(1, [])
+        ):
+            stats = ImportRun("appointments", path, "ndjson", 10).run()
+
+        self.assertEqual(
+            (stats["read"], stats["imported"], stats["rejected"], stats["skipped"]),
+            (2, 1, 0, 1),
+        )
+        self.assertEqual(ImportCheckpoint.objects.get().skipped, 1)
+
+    def test_invalida_os_caches_ao_final(self):
+        """Testa que a importação descarta os caches mantidos pelos signals."""
+        professional = ProfessionalFactory()
+        professional_cache.store(professional)
+        cache.set(HOME_CONTEXT_CACHE_KEY, {"total": 0})
+        professional_index.search("a", 10)
+        path = self.write(
+            "professionals.ndjson",
+            json.dumps({
+                "preferred_name": "Bruno Lima",
+                "profession": "Clínico Geral",
+                "address": "Rua A",
+                "contact": "11999990001",
+            }) + "\n",
+        )
+
+        self.import_data("professionals", path)
+
+        self.assertIsNone(professional_cache.cache.get(
+            professional_cache.key(professional.pk)
+        ))
+        self.assertIsNone(cache.get(HOME_CONTEXT_CACHE_KEY))
+        self.assertEqual(
+            [item["preferred_name"] for item in professional_index.search("bru", 10)],
+            ["Bruno Lima"],
+        )
+
+    def test_retoma_do_checkpoint(self):
+        """Testa que uma importação interrompida retoma após o último lote."""
+        ProfessionalFactory()
+        path = self.write(
+            "professionals.ndjson",
+            "".join(
+                json.dumps({
+                    "preferred_name": f"Profissional {index}",
+                    "profession": "Clínico Geral",
+                    "address": "Rua A",
+                    "contact": f"1199999{index:04d}",
+                }) + "\n"
+                for index in range(5)
+            ),
+        )
+        ImportCheckpoint.objects.create(
+            source=os.path.abspath(path),
+            kind="professionals",
+            file_size=os.path.getsize(path),
+            line=3,
+            imported=3,
+        )
+
+        self.import_data("professionals", path)
+
+        self.assertEqual(
+            sorted(
+                Professional.objects.filter(
+                    preferred_name__startswith="Profissional"
+                ).values_list("preferred_name", flat=True)
+            ),
+            ["Profissional 3", "Profissional 4"],
+        )
+        checkpoint = ImportCheckpoint.objects.get()
+        self.assertTrue(checkpoint.finished)
+        self.assertEqual((checkpoint.line, checkpoint.imported), (5, 5))
+
+        # Uma nova execução não importa nada; --restart recomeça do início
+        self.import_data("professionals", path)
+        self.import_data("professionals", path, "--restart")
+        self.assertEqual(
+            Professional.objects.filter(preferred_name="Profissional 0").count(), 1
+        )
+        self.assertEqual(
+            Professional.objects.filter(preferred_name="Profissional 4").count(), 2
+        )
+
+
+class MessagePackWithoutPackageTestCase(TestCase):
+    """Testes para o renderer e o parser MessagePack sem o pacote."""
+
+    def test_renderer_e_parser_sem_msgpack(self):
+        """Testa erros explícitos em vez de chamadas a `None`."""
+        with mock.patch.object(renderers, "msgpack", None):
+            with self.assertRaisesMessage(ImproperlyConfigured, "msgpack"):
+                MessagePackRenderer().render({"id": 1})
+        with mock.patch.object(parsers, "msgpack", None):
+            with self.assertRaises(UnsupportedMediaType):
+                MessagePackParser().parse(BytesIO(b"\x80"))
+
+
+class ORJSONRendererTestCase(TestCase):
+    """Testes para o renderer e o parser JSON acelerados."""
+
+    data = {
+        "id": 1,
+        "date": datetime(2030, 1, 7, 10, 0, tzinfo=dt_timezone.utc),
+        "local": datetime(
+            2030, 1, 7, 7, 0, 0, 123456, tzinfo=dt_timezone(timedelta(hours=-3))
+        ),
+        "day": date(2030, 1, 7),
+        "price": Decimal("10.50"),
+        "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "name": "Dra. Conceição\u2028Lima",
+        "items": [{"a": None, "b": True}],
+    }
+
+    def test_mesma_saida_do_renderer_do_drf(self):
+        """Testa bytes idênticos aos do JSONRenderer, com e sem indentação."""
+        for media_type in ("application/json", "application/json; indent=2"):
+            self.assertEqual(
+                ORJSONRenderer().render(self.data, media_type),
+                JSONRenderer().render(self.data, media_type),
+            )
+
+    def test_sem_orjson(self):
+        """Testa o fallback para o json da biblioteca padrão."""
+        with mock.patch.object(renderers, "orjson", None):
+            content = ORJSONRenderer().render(self.data, "application/json")
+
+        self.assertEqual(
+            content, JSONRenderer().render(self.data, "application/json")
+        )
+
+    def test_valor_fora_do_orjson(self):
+        """Testa que inteiros de mais de 64 bits usam o renderer padrão."""
+        content = ORJSONRenderer().render({"big": 2**70}, "application/json")
+
+        self.assertEqual(content, b'{"big":1180591620717411303424}')
+
+    def test_parser(self):
+        """Testa o parser, a rejeição de NaN e o fallback sem orjson."""
+        body = json.dumps(self.data, default=str, ensure_ascii=False).encode()
+        parsed = ORJSONParser().parse(BytesIO(body))
+        self.assertEqual(parsed["name"], self.data["name"])
+
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(BytesIO(b'{"value": NaN}'))
+        with mock.patch.object(parsers, "orjson", None):
+            self.assertEqual(ORJSONParser().parse(BytesIO(body)), parsed)
@@ -22,6 +22,7 @@ from drf_spectacular.views import (
     SpectacularSwaggerView,
     SpectacularRedocView,
 )
+from core.metrics import metrics_view
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -33,6 +34,8 @@ urlpatterns = [
         name="swagger-ui",
     ),
     path("api/redoc/", SpectacularRedocView.as_view(url_name="schema"), name="redoc"),
+    # Métricas Prometheus
+    path("metrics", metrics_view, name="metrics"),
     # API URLs
     path("api/", include("professionals.urls")),
     path("api/", include("appointments.urls")),
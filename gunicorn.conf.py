@@ -0,0 +1,40 @@
+"""
+Configuração do gunicorn para produção.
+
+Uso: `gunicorn core.wsgi` (o arquivo é lido automaticamente do diretório
+atual). Para as métricas do Prometheus somarem todos os workers, exporte
+`PROMETHEUS_MULTIPROC_DIR` apontando para um diretório vazio antes de
+iniciar o servidor. Com `DB_POOL`, cada worker abre o seu pool de conexões
+ao iniciar.
+"""
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("GUNICORN_WORKERS", "4"))
+accesslog = "-"
+
+
+def on_starting(server):
+    # Arquivos de uma execução anterior distorceriam os contadores
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        for name in os.listdir(directory):
+            if name.endswith(".db"):
+                os.remove(os.path.join(directory, name))
+
+
+def post_worker_init(worker):
+    # Com DB_POOL, abre as conexões mínimas antes de o worker atender
+    from core.db_pool import open_pools
+
+    open_pools()
+
+
+def child_exit(server, worker):
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(worker.pid)
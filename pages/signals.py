@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from appointments.models import Appointment
+from appointments.signals import appointments_bulk_changed
+from professionals.models import Professional
+from .views import invalidate_home_context
+
+
+@receiver(post_save, sender=Professional)
+@receiver(post_delete, sender=Professional)
+@receiver(post_save, sender=Appointment)
+@receiver(post_delete, sender=Appointment)
+@receiver(appointments_bulk_changed)
+def invalidate_home_on_write(sender, **kwargs):
+    """Invalida as estatísticas da página inicial após qualquer escrita."""
+    invalidate_home_context()
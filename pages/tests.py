@@ -1,3 +1,93 @@
-from django.test import TestCase
+"""
+Testes unitários para a aplicação pages.
+"""
+import pytest
+from datetime import timedelta
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from pages.views import AsyncHomeView, build_home_context
+from tests.factories import AppointmentFactory, ProfessionalFactory
 
-# Create your tests here.
+
+@pytest.mark.django_db
+class HomeViewTestCase(TestCase):
+    """Testes para a página inicial."""
+
+    def setUp(self):
+        """Limpa o cache e cria profissionais em duas especialidades."""
+        cache.clear()
+        self.url = reverse("home")
+        for name in ["Ana", "Bruno", "Carla", "Daniel"]:
+            ProfessionalFactory(preferred_name=name, specialty="Cardiologia")
+        ProfessionalFactory(preferred_name="Eva", specialty="Pediatria")
+        ProfessionalFactory(preferred_name="Fábio", specialty=None)
+        self.appointment = AppointmentFactory(
+            date=timezone.now() + timedelta(days=2)
+        )
+
+    @pytest.mark.integration
+    def test_estatisticas(self):
+        """Testa contagens e agrupamento por especialidade."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+
+        context = response.context
+        self.assertEqual(context["professionals_count"], 7)
+        self.assertEqual(context["appointments_count"], 1)
+        self.assertEqual(context["specialties_count"], 2)
+
+        cardiologia, pediatria = context["specialties"]
+        self.assertEqual(cardiologia["name"], "Cardiologia")
+        self.assertEqual(cardiologia["count"], 4)
+        self.assertEqual(
+            [p.preferred_name for p in cardiologia["professionals"]],
+            ["Ana", "Bruno", "Carla"],
+        )
+        self.assertEqual(pediatria["count"], 1)
+
+    @pytest.mark.integration
+    def test_consultas_sem_n_mais_1(self):
+        """Testa que as próximas consultas não geram consulta por linha."""
+        AppointmentFactory.create_batch(4)
+        cache.clear()
+
+        with self.assertNumQueries(5):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.context["upcoming_appointments"]), 5)
+
+    @pytest.mark.integration
+    def test_contexto_em_cache_e_invalidacao(self):
+        """Testa o cache do contexto e sua invalidação após escritas."""
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+        ProfessionalFactory(specialty="Pediatria")
+        response = self.client.get(self.url)
+        self.assertEqual(response.context["professionals_count"], 8)
+
+        self.appointment.delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response.context["appointments_count"], 0)
+
+    def test_view_assincrona(self):
+        """Testa que a view assíncrona monta o mesmo contexto da síncrona."""
+        view = AsyncHomeView.as_view()
+        with self.assertNumQueries(5):
+            response = async_to_sync(view)(AsyncRequestFactory().get(self.url))
+        context = response.context_data
+        self.assertEqual(context["professionals_count"], 7)
+        self.assertEqual(context["specialties_count"], 2)
+
+        cache.clear()
+        expected = build_home_context()
+        self.assertEqual(
+            [specialty["name"] for specialty in context["specialties"]],
+            [specialty["name"] for specialty in expected["specialties"]],
+        )
+        self.assertEqual(
+            context["upcoming_appointments"], expected["upcoming_appointments"]
+        )
@@ -1,6 +1,9 @@
+from django.conf import settings
 from django.urls import path
-from .views import HomeView
+from .views import AsyncHomeView, HomeView
+
+home_view = AsyncHomeView if settings.ASYNC_VIEWS else HomeView
 
 urlpatterns = [
-    path('', HomeView.as_view(), name='home'),
+    path('', home_view.as_view(), name='home'),
 ]
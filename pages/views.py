@@ -1,68 +1,167 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Q, Window
+from django.db.models.functions import RowNumber
 from django.shortcuts import render
 from django.views.generic import TemplateView
 from professionals.models import Professional
 from appointments.models import Appointment
 from django.utils import timezone
 
+HOME_CONTEXT_CACHE_KEY = "pages:home:context"
+
+
+def home_querysets():
+    """Consultas das estatísticas da página inicial (ainda não avaliadas)."""
+    with_specialty = Professional.objects.exclude(
+        Q(specialty__isnull=True) | Q(specialty="")
+    )
+
+    specialty_counts = (
+        with_specialty.values("specialty")
+        .annotate(count=Count("id"))
+        .order_by("specialty")
+    )
+
+    # Limitando a 3 profissionais por especialidade, direto no banco
+    top_professionals = (
+        with_specialty.annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=F("specialty"),
+                order_by=F("preferred_name").asc(),
+            )
+        )
+        .filter(position__lte=3)
+        .only("id", "preferred_name", "profession", "specialty")
+        .order_by("specialty", "preferred_name")
+    )
+
+    # Próximas 5 consultas, já com o profissional usado no template
+    upcoming_appointments = (
+        Appointment.objects.filter(date__gte=timezone.now())
+        .select_related("professional")
+        .order_by("date")[:5]
+    )
+    return specialty_counts, top_professionals, upcoming_appointments
+
+
+def assemble_home_context(
+    specialty_counts,
+    top_professionals,
+    professionals_count,
+    appointments_count,
+    upcoming_appointments,
+):
+    """Monta o contexto da página inicial a partir dos resultados já lidos."""
+    professionals_by_specialty = {}
+    for professional in top_professionals:
+        professionals_by_specialty.setdefault(
+            professional.specialty, []
+        ).append(professional)
+
+    specialties = [
+        {
+            "name": row["specialty"],
+            "count": row["count"],
+            "professionals": professionals_by_specialty.get(row["specialty"], []),
+        }
+        for row in specialty_counts
+    ]
+
+    return {
+        "professionals_count": professionals_count,
+        "appointments_count": appointments_count,
+        "specialties_count": len(specialties),
+        "specialties": specialties,
+        "upcoming_appointments": upcoming_appointments,
+    }
+
+
+def build_home_context():
+    """
+    Monta as estatísticas da página inicial com agregações no banco.
+
+    O resultado fica em cache e é invalidado pelos signals de escrita em
+    `Professional` e `Appointment` (ver `pages.signals`).
+    """
+    context = cache.get(HOME_CONTEXT_CACHE_KEY)
+    if context is not None:
+        return context
+
+    specialty_counts, top_professionals, upcoming = home_querysets()
+    context = assemble_home_context(
+        list(specialty_counts),
+        list(top_professionals),
+        Professional.objects.count(),
+        Appointment.objects.count(),
+        list(upcoming),
+    )
+    cache.set(HOME_CONTEXT_CACHE_KEY, context, settings.HOME_CACHE_TIMEOUT)
+    return context
+
+
+async def abuild_home_context():
+    """Versão assíncrona de `build_home_context`, com o ORM e o cache assíncronos."""
+    context = await cache.aget(HOME_CONTEXT_CACHE_KEY)
+    if context is not None:
+        return context
+
+    specialty_counts, top_professionals, upcoming = home_querysets()
+    context = assemble_home_context(
+        [row async for row in specialty_counts],
+        [professional async for professional in top_professionals],
+        await Professional.objects.acount(),
+        await Appointment.objects.acount(),
+        [appointment async for appointment in upcoming],
+    )
+    await cache.aset(HOME_CONTEXT_CACHE_KEY, context, settings.HOME_CACHE_TIMEOUT)
+    return context
+
+
+def invalidate_home_context():
+    """Remove do cache as estatísticas da página inicial."""
+    cache.delete(HOME_CONTEXT_CACHE_KEY)
+
+
 class HomeView(TemplateView):
     """View da página inicial."""
     template_name = 'pages/home.html'
-    
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         # Obter estatísticas para exibição na página
-        context['professionals_count'] = Professional.objects.count()
-        context['appointments_count'] = Appointment.objects.count()
-
-        # Obter especialidades únicas
-        specialties = set()
-        professionals_by_specialty = {}
-
-        for professional in Professional.objects.all():
-            if hasattr(professional, 'specialty') and professional.specialty:
-                specialty = professional.specialty
-                specialties.add(specialty)
-
-                if specialty not in professionals_by_specialty:
-                    professionals_by_specialty[specialty] = []
-                professionals_by_specialty[specialty].append(professional)
-
-        context['specialties_count'] = len(specialties) if specialties else 0
-        context['specialties'] = [
-            {
-                'name': specialty,
-                'count': len(professionals),
-                # Limitando a 3 profissionais por especialidade
-                'professionals': professionals[:3]
-            }
-            for specialty, professionals in professionals_by_specialty.items()
-        ]
-
-        # Obter próximas consultas
-        context['upcoming_appointments'] = Appointment.objects.filter(
-            date__gte=timezone.now()
-        ).order_by('date')[:5]  # Próximas 5 consultas
+        context.update(self.get_stats())
 
         # Data atual para cálculo de tempo restante
         context['current_time'] = timezone.now()
 
         return context
 
+    def get_stats(self):
+        return build_home_context()
+
+
+class AsyncHomeView(HomeView):
+    """
+    Página inicial com as estatísticas lidas de forma assíncrona, usada com
+    `ASYNC_VIEWS` (ASGI).
+    """
+
+    async def get(self, request, *args, **kwargs):
+        self.stats = await abuild_home_context()
+        return super().get(request, *args, **kwargs)
+
+    def get_stats(self):
+        return self.stats
+
+
 def home(request):
     # Versão alternativa usando função ao invés de classe
-    professionals_count = Professional.objects.count()
-    appointments_count = Appointment.objects.count()
-    
-    # Obter especialidades únicas
-    specialties = set()
-    for professional in Professional.objects.all():
-        if hasattr(professional, 'specialty') and professional.specialty:
-            specialties.add(professional.specialty)
-    
-    specialties_count = len(specialties) if specialties else 0
-    
+    stats = build_home_context()
+
     return render(request, 'pages/home.html', {
-        'professionals_count': professionals_count,
-        'appointments_count': appointments_count,
-        'specialties_count': specialties_count,
+        'professionals_count': stats['professionals_count'],
+        'appointments_count': stats['appointments_count'],
+        'specialties_count': stats['specialties_count'],
     })
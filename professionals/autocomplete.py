@@ -0,0 +1,181 @@
+"""
+Índice em memória para o autocomplete de profissionais.
+
+Cada nome e especialidade é indexado por todos os seus sufixos de palavras
+("joao da silva", "da silva", "silva"), sem acentos e em minúsculas, em uma
+lista ordenada. Uma busca por prefixo é um `bisect` seguido de uma
+varredura curta, sem acesso ao banco.
+
+O índice é montado na primeira busca de cada processo e atualizado pelos
+signals de `Professional`. Escritas feitas em outros processos (outros
+workers, comandos de importação) aparecem após
+`AUTOCOMPLETE_REFRESH_SECONDS`, quando o índice é remontado em uma thread
+de fundo; até a troca, as buscas seguem respondidas pelo índice anterior.
+Só uma remontagem roda por vez em cada processo.
+"""
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db import connection
+
+from core.search import normalize
+
+from .models import Professional
+
+
+def index_keys(*texts):
+    """Retorna as chaves (sufixos de palavras normalizados) dos textos."""
+    keys = set()
+    for text in texts:
+        words = normalize(text or "").split()
+        for start in range(len(words)):
+            keys.add(" ".join(words[start:]))
+    return keys
+
+
+class PrefixIndex:
+    """Lista ordenada de `(chave, id)` com os dados de cada profissional."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._keys = []
+        self._entries = {}
+        self._built_at = None
+        # Alterações recebidas durante uma remontagem, reaplicadas na troca
+        self._pending = None
+
+    def build(self):
+        """Remonta o índice a partir do banco."""
+        with self._lock:
+            self._pending = []
+        rows = Professional.objects.values_list(
+            "id", "preferred_name", "specialty"
+        )
+        keys, entries = [], {}
+        try:
+            for pk, preferred_name, specialty in rows.iterator():
+                entries[pk] = (pk, preferred_name, specialty)
+                keys.extend(
+                    (key, pk) for key in index_keys(preferred_name, specialty)
+                )
+            keys.sort()
+        except Exception:
+            with self._lock:
+                self._pending = None
+            raise
+
+        with self._lock:
+            pending, self._pending = self._pending, None
+            self._keys, self._entries = keys, entries
+            for entry in pending:
+                if isinstance(entry, tuple):
+                    self._insert(entry)
+                else:
+                    self._discard(entry)
+            self._built_at = time.monotonic()
+
+    def ensure_built(self):
+        """
+        Monta o índice na primeira busca e agenda a remontagem em segundo
+        plano quando ele passa de `AUTOCOMPLETE_REFRESH_SECONDS`.
+        """
+        if self._built_at is None:
+            # Buscas simultâneas esperam uma única montagem
+            with self._build_lock:
+                if self._built_at is None:
+                    self.build()
+        elif self.is_stale() and self._build_lock.acquire(blocking=False):
+            threading.Thread(
+                target=self._rebuild, name="autocomplete-rebuild", daemon=True
+            ).start()
+
+    def _rebuild(self):
+        try:
+            self.build()
+        finally:
+            self._build_lock.release()
+            connection.close()
+
+    def is_stale(self):
+        return (
+            self._built_at is None
+            or time.monotonic() - self._built_at
+            > settings.AUTOCOMPLETE_REFRESH_SECONDS
+        )
+
+    def clear(self):
+        """Descarta o índice; a próxima busca o remonta."""
+        with self._lock:
+            self._keys, self._entries = [], {}
+            self._built_at = None
+
+    def add(self, professional):
+        """Inclui ou atualiza um profissional no índice já montado."""
+        entry = (
+            professional.pk,
+            professional.preferred_name,
+            professional.specialty,
+        )
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(entry)
+            if self._built_at is not None:
+                self._insert(entry)
+
+    def remove(self, pk):
+        """Remove um profissional do índice já montado."""
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(pk)
+            if self._built_at is not None:
+                self._discard(pk)
+
+    def _insert(self, entry):
+        pk, preferred_name, specialty = entry
+        self._discard(pk)
+        self._entries[pk] = entry
+        for key in index_keys(preferred_name, specialty):
+            insort(self._keys, (key, pk))
+
+    def _discard(self, pk):
+        entry = self._entries.pop(pk, None)
+        if entry is None:
+            return
+        for key in index_keys(entry[1], entry[2]):
+            position = bisect_left(self._keys, (key, pk))
+            if position < len(self._keys) and self._keys[position] == (key, pk):
+                del self._keys[position]
+
+    def search(self, query, limit):
+        """
+        Retorna até `limit` profissionais cujo nome ou especialidade tem
+        alguma palavra (ou sequência de palavras) começando por `query`.
+        """
+        self.ensure_built()
+
+        prefix = " ".join(normalize(query).split())
+        if not prefix:
+            return []
+
+        results, seen = [], set()
+        with self._lock:
+            position = bisect_left(self._keys, (prefix,))
+            while len(results) < limit and position < len(self._keys):
+                key, pk = self._keys[position]
+                if not key.startswith(prefix):
+                    break
+                if pk not in seen:
+                    seen.add(pk)
+                    results.append(self._entries[pk])
+                position += 1
+
+        return [
+            {"id": pk, "preferred_name": preferred_name, "specialty": specialty}
+            for pk, preferred_name, specialty in results
+        ]
+
+
+professional_index = PrefixIndex()
@@ -0,0 +1,173 @@
+"""
+Cache compartilhado dos payloads serializados dos profissionais.
+
+O payload de cada profissional (o `ProfessionalSerializer` do registro)
+fica no cache do Django (`PROFESSIONAL_CACHE_ALIAS`; Redis em produção)
+sob uma chave versionada: a versão combina `PROFESSIONAL_CACHE_VERSION` e
+os campos do serializer, então mudar o formato do payload não reaproveita
+entradas antigas. Os signals de `Professional` (ver
+`professionals.signals`) removem a entrada na escrita e gravam o payload
+novo após o commit; as entradas expiram após `PROFESSIONAL_CACHE_TIMEOUT`.
+
+É lido em `professional_data` das consultas e na validação da chave
+estrangeira `professional` nas escritas de consultas só com
+`PROFESSIONAL_CACHE_SHARED`: um cache por processo (locmem) não vê as
+escritas feitas por outros workers e serviria payloads velhos, então sem
+ele os payloads vêm do banco, em uma consulta por lote.
+"""
+import zlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import router
+
+from core import metrics
+from core.serializers import FieldPlan
+
+from .models import Professional
+from .serializers import ProfessionalSerializer
+
+CACHE_NAME = "professional_payload"
+
+
+class ProfessionalPayloadCache:
+    """Leitura em lote, invalidação e contadores de acertos e faltas."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._plan = None
+        self._fingerprint = None
+
+    @property
+    def cache(self):
+        return caches[settings.PROFESSIONAL_CACHE_ALIAS]
+
+    @property
+    def plan(self):
+        if self._plan is None:
+            self._plan = FieldPlan(ProfessionalSerializer())
+        return self._plan
+
+    @property
+    def prefix(self):
+        if self._fingerprint is None:
+            fields = ",".join(name for name, *_ in self.plan.entries)
+            self._fingerprint = f"{zlib.crc32(fields.encode()):08x}"
+        return (
+            f"professionals:payload:{settings.PROFESSIONAL_CACHE_VERSION}:"
+            f"{self._fingerprint}"
+        )
+
+    def key(self, pk):
+        return f"{self.prefix}:{pk}"
+
+    def get_many(self, ids):
+        """Retorna `{id: payload}` dos profissionais existentes em `ids`."""
+        if not settings.PROFESSIONAL_CACHE_SHARED:
+            rows = self._missing_queryset(ids).values_list(*self.plan.lookups)
+            return self._by_id(self._loaded(self.plan.from_rows(rows)))
+
+        keys = {self.key(pk): pk for pk in ids}
+        found = self.cache.get_many(keys)
+        payloads = {keys[key]: payload for key, payload in found.items()}
+
+        missing = [pk for pk in keys.values() if pk not in payloads]
+        if missing:
+            rows = self._missing_queryset(missing).values_list(*self.plan.lookups)
+            loaded = self._loaded(self.plan.from_rows(rows))
+            self.cache.set_many(loaded, settings.PROFESSIONAL_CACHE_TIMEOUT)
+            payloads.update(self._by_id(loaded))
+
+        self._count(len(found), len(missing))
+        return payloads
+
+    async def aget_many(self, ids):
+        """Versão assíncrona de `get_many`, para as views assíncronas."""
+        if not settings.PROFESSIONAL_CACHE_SHARED:
+            queryset = self._missing_queryset(ids)
+            rows = [
+                row async for row in queryset.values_list(*self.plan.lookups)
+            ]
+            return self._by_id(self._loaded(self.plan.from_rows(rows)))
+
+        keys = {self.key(pk): pk for pk in ids}
+        found = await self.cache.aget_many(keys)
+        payloads = {keys[key]: payload for key, payload in found.items()}
+
+        missing = [pk for pk in keys.values() if pk not in payloads]
+        if missing:
+            queryset = self._missing_queryset(missing)
+            rows = [
+                row async for row in queryset.values_list(*self.plan.lookups)
+            ]
+            loaded = self._loaded(self.plan.from_rows(rows))
+            await self.cache.aset_many(loaded, settings.PROFESSIONAL_CACHE_TIMEOUT)
+            payloads.update(self._by_id(loaded))
+
+        self._count(len(found), len(missing))
+        return payloads
+
+    def _missing_queryset(self, ids):
+        return Professional.objects.filter(pk__in=ids).order_by()
+
+    def _loaded(self, payloads):
+        return {self.key(payload["id"]): payload for payload in payloads}
+
+    def _by_id(self, loaded):
+        return {payload["id"]: payload for payload in loaded.values()}
+
+    def _count(self, hits, misses):
+        self.hits += hits
+        self.misses += misses
+        metrics.observe_cache(CACHE_NAME, hits, misses)
+
+    def get(self, pk):
+        """Payload do profissional `pk`, ou `None` se ele não existe."""
+        return self.get_many([pk]).get(pk)
+
+    def existing(self, ids):
+        """
+        Ids de `ids` com profissional existente: pelo cache com
+        `PROFESSIONAL_CACHE_SHARED`, senão em uma consulta ao banco.
+        """
+        if settings.PROFESSIONAL_CACHE_SHARED:
+            return set(self.get_many(ids))
+        return set(self._missing_queryset(ids).values_list("pk", flat=True))
+
+    def instance(self, pk):
+        """
+        `Professional` montado a partir do payload, sem consultar o banco
+        quando ele está em cache. Campos fora do payload ficam adiados.
+        """
+        payload = self.get(pk)
+        if payload is None:
+            return None
+        names = [
+            field.attname
+            for field in Professional._meta.concrete_fields
+            if field.attname in payload
+        ]
+        return Professional.from_db(
+            router.db_for_read(Professional),
+            names,
+            [payload[name] for name in names],
+        )
+
+    def store(self, instance):
+        """Grava o payload atual do profissional (write-through)."""
+        self.cache.set(
+            self.key(instance.pk),
+            self.plan.from_instance(instance),
+            settings.PROFESSIONAL_CACHE_TIMEOUT,
+        )
+
+    def invalidate(self, pk):
+        self.cache.delete(self.key(pk))
+
+    def clear(self):
+        """Descarta todos os payloads (escritas em massa, sem signals)."""
+        self.cache.clear()
+
+
+professional_cache = ProfessionalPayloadCache()
@@ -0,0 +1,51 @@
+"""
+Campos de serializer que leem os profissionais do cache de payloads.
+"""
+from django.conf import settings
+from drf_spectacular.utils import extend_schema_field
+from rest_framework import serializers
+
+from core.serializers import BatchedField
+
+from .cache import professional_cache
+from .serializers import ProfessionalSerializer
+
+
+@extend_schema_field(ProfessionalSerializer)
+class ProfessionalPayloadField(BatchedField):
+    """
+    Representação do profissional a partir do id (`source`), lida em lote
+    (do cache com `PROFESSIONAL_CACHE_SHARED`), sem JOIN na consulta de
+    origem.
+    """
+
+    def resolve_many(self, values):
+        return professional_cache.get_many(values)
+
+    async def aresolve_many(self, values):
+        return await professional_cache.aget_many(values)
+
+
+class ProfessionalPrimaryKeyField(serializers.PrimaryKeyRelatedField):
+    """
+    Chave estrangeira para `Professional` validada pelo cache de payloads,
+    evitando a consulta ao banco quando o profissional está em cache.
+
+    Só com `PROFESSIONAL_CACHE_SHARED`: um cache por processo não vê as
+    exclusões feitas por outros workers, e a validação usa o banco.
+    """
+
+    def to_internal_value(self, data):
+        if not settings.PROFESSIONAL_CACHE_SHARED:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+        instance = professional_cache.instance(pk)
+        if instance is None:
+            self.fail("does_not_exist", pk_value=data)
+        return instance
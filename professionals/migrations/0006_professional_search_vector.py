@@ -0,0 +1,113 @@
+from django.contrib.postgres.search import SearchVectorField
+from django.db import migrations
+
+# Busca textual sem acentos: extensões, configuração `portuguese_unaccent`,
+# trigger que mantém `search_vector` e índices GIN (tsvector e trigramas).
+# Só é aplicada no PostgreSQL; no SQLite a busca usa o SearchFilter padrão.
+# Os comandos são idempotentes: o conftest os reaplica no banco de testes,
+# criado sem migrações (--nomigrations) e reaproveitado (--reuse-db).
+FORWARD_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    CREATE OR REPLACE FUNCTION immutable_unaccent(text) RETURNS text AS $$
+        SELECT public.unaccent('public.unaccent'::regdictionary, $1)
+    $$ LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+    """,
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (
+            SELECT 1 FROM pg_ts_config WHERE cfgname = 'portuguese_unaccent'
+        ) THEN
+            CREATE TEXT SEARCH CONFIGURATION portuguese_unaccent
+                (COPY = portuguese);
+            ALTER TEXT SEARCH CONFIGURATION portuguese_unaccent
+                ALTER MAPPING FOR hword, hword_part, word
+                WITH unaccent, portuguese_stem;
+        END IF;
+    END
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION professionals_professional_search_vector()
+    RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('portuguese_unaccent',
+                coalesce(NEW.preferred_name, '')), 'A') ||
+            setweight(to_tsvector('portuguese_unaccent',
+                coalesce(NEW.profession, '')), 'B') ||
+            setweight(to_tsvector('portuguese_unaccent',
+                coalesce(NEW.specialty, '')), 'B') ||
+            setweight(to_tsvector('portuguese_unaccent',
+                coalesce(NEW.address, '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS professionals_professional_search_vector "
+    "ON professionals_professional",
+    """
+    CREATE TRIGGER professionals_professional_search_vector
+        BEFORE INSERT OR UPDATE ON professionals_professional
+        FOR EACH ROW
+        EXECUTE FUNCTION professionals_professional_search_vector()
+    """,
+    # Preenche as linhas existentes pelo próprio trigger
+    "UPDATE professionals_professional SET search_vector = NULL",
+    """
+    CREATE INDEX IF NOT EXISTS professional_search_vector_gin
+        ON professionals_professional USING gin (search_vector)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS professional_preferred_name_trgm
+        ON professionals_professional
+        USING gin (immutable_unaccent(lower(preferred_name)) gin_trgm_ops)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS professional_profession_trgm
+        ON professionals_professional
+        USING gin (immutable_unaccent(lower(profession)) gin_trgm_ops)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS professional_contact_trgm
+        ON professionals_professional USING gin (contact gin_trgm_ops)
+    """,
+]
+
+BACKWARD_SQL = [
+    "DROP INDEX IF EXISTS professional_contact_trgm",
+    "DROP INDEX IF EXISTS professional_profession_trgm",
+    "DROP INDEX IF EXISTS professional_preferred_name_trgm",
+    "DROP INDEX IF EXISTS professional_search_vector_gin",
+    "DROP TRIGGER IF EXISTS professionals_professional_search_vector "
+    "ON professionals_professional",
+    "DROP FUNCTION IF EXISTS professionals_professional_search_vector()",
+]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("professionals", "0005_professional_specialty"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="professional",
+            name="search_vector",
+            field=SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(_run(FORWARD_SQL), _run(BACKWARD_SQL)),
+    ]
@@ -1,3 +1,4 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.core.validators import RegexValidator
 
@@ -18,6 +19,8 @@ class Professional(models.Model):
     contact = models.CharField("Contato", max_length=11, validators=[phone_regex])
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Mantido por trigger no PostgreSQL (ver migração 0006); nulo no SQLite.
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         verbose_name = "Profissional"
@@ -1,8 +1,12 @@
+from django.conf import settings
 from rest_framework import serializers
+from core.serializers import DynamicFieldsModelSerializer
 from .models import Professional
 
+CONTACT_ERROR_MESSAGE = "O contato deve ser um número telefônico com 11 dígitos."
 
-class ProfessionalSerializer(serializers.ModelSerializer):
+
+class ProfessionalSerializer(DynamicFieldsModelSerializer):
     """
     Serializer for the Professional model.
     """
@@ -22,7 +26,16 @@ class ProfessionalSerializer(serializers.ModelSerializer):
         Validação adicional para o campo contact.
         """
         if not value.isdigit() or len(value) != 11:
-            raise serializers.ValidationError(
-                "O contato deve ser um número telefônico com 11 dígitos."
-            )
+            raise serializers.ValidationError(CONTACT_ERROR_MESSAGE)
         return value
+
+
+class AutocompleteQuerySerializer(serializers.Serializer):
+    """
+    Parâmetros do autocomplete de profissionais.
+    """
+
+    q = serializers.CharField(max_length=100)
+    limit = serializers.IntegerField(
+        min_value=1, max_value=settings.AUTOCOMPLETE_MAX_RESULTS, default=10
+    )
@@ -0,0 +1,44 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .autocomplete import professional_index
+from .cache import professional_cache
+from .models import Professional
+
+
+@receiver(post_save, sender=Professional)
+def index_professional(sender, instance, **kwargs):
+    """Atualiza o índice do autocomplete após salvar um profissional."""
+    transaction.on_commit(lambda: professional_index.add(instance))
+
+
+@receiver(post_delete, sender=Professional)
+def unindex_professional(sender, instance, **kwargs):
+    """Remove o profissional excluído do índice do autocomplete."""
+    pk = instance.pk
+    transaction.on_commit(lambda: professional_index.remove(pk))
+
+
+@receiver(post_save, sender=Professional)
+def store_professional_payload(sender, instance, **kwargs):
+    """
+    Atualiza o payload do profissional no cache.
+
+    A entrada antiga sai na hora; a nova só é gravada após o commit, para
+    que uma transação desfeita não deixe no cache dados que não existem.
+    """
+    professional_cache.invalidate(instance.pk)
+    transaction.on_commit(lambda: professional_cache.store(instance))
+
+
+@receiver(post_delete, sender=Professional)
+def invalidate_professional_payload(sender, instance, **kwargs):
+    """
+    Remove o payload do profissional excluído do cache.
+
+    A remoção é repetida após o commit, descartando um payload antigo que
+    outra requisição tenha gravado enquanto a transação estava aberta.
+    """
+    pk = instance.pk
+    professional_cache.invalidate(pk)
+    transaction.on_commit(lambda: professional_cache.invalidate(pk))
@@ -1,13 +1,33 @@
 """
 Testes unitários para a aplicação professionals.
 """
+import json
 import pytest
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from unittest import mock, skipUnless
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.db import IntegrityError, connection
+from django.test import AsyncRequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework.test import APIRequestFactory, APITestCase
 from django.contrib.auth import get_user_model
+from appointments.models import is_double_booking
+from core.pagination import PageNumberPagination
+from core.renderers import msgpack
+from core.search import normalize, prefix_query
+from professionals.autocomplete import professional_index
+from professionals.cache import professional_cache
 from professionals.models import Professional
-from tests.factories import ProfessionalFactory, UserFactory
+from professionals.views import ProfessionalViewSet
+from tests.factories import (
+    AppointmentFactory,
+    ProfessionalFactory,
+    UserFactory,
+)
 
 User = get_user_model()
 
@@ -199,6 +219,17 @@ class ProfessionalAPITestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertEqual(Professional.objects.count(), 0)
 
+    def test_listar_com_fields(self):
+        """Testa a seleção de campos na listagem de profissionais."""
+        ProfessionalFactory.create_batch(2)
+
+        response = self.client.get(
+            self.url_list, {"fields": "id,preferred_name"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data[0]), {"id", "preferred_name"})
+
     def test_profissional_inexistente(self):
         """Testa o acesso a um profissional que não existe."""
         url_detail = reverse("professional-detail", kwargs={"pk": 999})
@@ -207,6 +238,515 @@ class ProfessionalAPITestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
 
+@pytest.mark.api
+class ProfessionalSearchTestCase(APITestCase):
+    """Testes para a busca textual de profissionais."""
+
+    def test_normalizacao_e_tsquery(self):
+        """Testa a remoção de acentos e o tsquery de prefixo."""
+        self.assertEqual(normalize("João Conceição"), "joao conceicao")
+        self.assertEqual(
+            prefix_query("Jo Silva!").source_expressions[-1].value,
+            "Jo:* & Silva:*",
+        )
+        self.assertIsNone(prefix_query("&!"))
+
+    @skipUnless(
+        connection.vendor == "postgresql", "Busca textual requer PostgreSQL"
+    )
+    def test_busca_sem_acentos_ordenada_por_relevancia(self):
+        """Testa a busca sem acentos e a ordenação por relevância."""
+        exato = ProfessionalFactory(
+            preferred_name="João da Conceição", profession="Pediatra"
+        )
+        parcial = ProfessionalFactory(
+            preferred_name="Ana Paula", profession="Clínica Geral",
+            address="Rua João Conceição, 10",
+        )
+        ProfessionalFactory(preferred_name="Maria Souza")
+
+        response = self.client.get(
+            reverse("professional-list"), {"search": "joao conceicao"}
+        )
+
+        self.assertEqual(
+            [item["id"] for item in response.data], [exato.id, parcial.id]
+        )
+
+
+@pytest.mark.api
+class ProfessionalAutocompleteTestCase(APITestCase):
+    """Testes para o autocomplete de profissionais."""
+
+    def setUp(self):
+        """Configuração inicial para os testes."""
+        professional_index.clear()
+        self.url = reverse("professional-autocomplete")
+        self.joao = ProfessionalFactory(
+            preferred_name="João da Conceição", specialty="Cardiologia"
+        )
+        self.ana = ProfessionalFactory(
+            preferred_name="Ana Souza", specialty="Cardiologia Pediátrica"
+        )
+
+    def test_prefixo_sem_acentos(self):
+        """Testa a busca por prefixo de qualquer palavra, sem acentos."""
+        response = self.client.get(self.url, {"q": "concei"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data,
+            [{
+                "id": self.joao.id,
+                "preferred_name": "João da Conceição",
+                "specialty": "Cardiologia",
+            }],
+        )
+
+        response = self.client.get(self.url, {"q": "Joao da"})
+        self.assertEqual([item["id"] for item in response.data], [self.joao.id])
+
+    def test_especialidade_e_limite(self):
+        """Testa a busca pela especialidade e o limite de resultados."""
+        response = self.client.get(self.url, {"q": "cardio"})
+        self.assertEqual(len(response.data), 2)
+
+        response = self.client.get(self.url, {"q": "cardio", "limit": 1})
+        self.assertEqual(len(response.data), 1)
+
+    def test_buscas_sem_consulta_ao_banco(self):
+        """Testa que, com o índice montado, a busca não acessa o banco."""
+        self.client.get(self.url, {"q": "ana"})
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, {"q": "ana"})
+        self.assertEqual([item["id"] for item in response.data], [self.ana.id])
+
+    def test_atualizacao_incremental(self):
+        """Testa que o índice acompanha criação, edição e exclusão."""
+        self.client.get(self.url, {"q": "a"})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            novo = ProfessionalFactory(preferred_name="Bruno Lima")
+            self.joao.preferred_name = "Joaquim Alves"
+            self.joao.save()
+            self.ana.delete()
+
+        response = self.client.get(self.url, {"q": "bru"})
+        self.assertEqual([item["id"] for item in response.data], [novo.id])
+        self.assertEqual(self.client.get(self.url, {"q": "conceicao"}).data, [])
+        self.assertEqual(self.client.get(self.url, {"q": "souza"}).data, [])
+        response = self.client.get(self.url, {"q": "joaquim"})
+        self.assertEqual([item["id"] for item in response.data], [self.joao.id])
+
+    def test_indice_expirado_remontado_em_segundo_plano(self):
+        """Testa que o índice expirado segue respondendo durante a remontagem."""
+        self.client.get(self.url, {"q": "a"})
+        # Escrita de outro processo: o signal deste não a vê
+        bruno = ProfessionalFactory(preferred_name="Bruno Lima")
+
+        with override_settings(AUTOCOMPLETE_REFRESH_SECONDS=-1), mock.patch(
+            "professionals.autocomplete.threading.Thread"
+        ) as thread, self.assertNumQueries(0):
+            response = self.client.get(self.url, {"q": "bru"})
+            self.client.get(self.url, {"q": "bru"})
+
+        self.assertEqual(response.data, [])
+        thread.assert_called_once()
+        with mock.patch("professionals.autocomplete.connection"):
+            thread.call_args.kwargs["target"]()
+
+        response = self.client.get(self.url, {"q": "bru"})
+        self.assertEqual([item["id"] for item in response.data], [bruno.id])
+
+    def test_parametros_invalidos(self):
+        """Testa a validação de `q` e `limit`."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(self.url, {"q": "a", "limit": 1000})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@pytest.mark.api
+class ProfessionalExportTestCase(APITestCase):
+    """Testes para a exportação de profissionais em streaming."""
+
+    @skipUnless(msgpack, "msgpack não instalado")
+    def test_listar_em_msgpack(self):
+        """Testa a listagem em MessagePack com ?format=msgpack."""
+        ProfessionalFactory.create_batch(2)
+
+        response = self.client.get(
+            reverse("professional-list"), {"format": "msgpack"}
+        )
+
+        self.assertEqual(response["Content-Type"], "application/msgpack")
+        self.assertEqual(len(msgpack.unpackb(response.content)), 2)
+
+    def test_exportar_ndjson_com_filtro(self):
+        """Testa a exportação NDJSON respeitando o filtro por profissão."""
+        ProfessionalFactory.create_batch(2, profession="Cardiologista")
+        ProfessionalFactory(profession="Neurologista")
+
+        response = self.client.get(
+            reverse("professional-list"),
+            {"format": "ndjson", "profession": "Cardiologista"},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(json.loads(lines[0])["profession"], "Cardiologista")
+
+
+@pytest.mark.api
+class ProfessionalConditionalGetTestCase(APITestCase):
+    """Testes para ETag/Last-Modified e o GET condicional."""
+
+    def setUp(self):
+        """Configuração inicial para os testes."""
+        cache.clear()
+        self.professional = ProfessionalFactory()
+        ProfessionalFactory.create_batch(2)
+        self.url_list = reverse("professional-list")
+
+    def test_if_none_match_retorna_304(self):
+        """Testa o 304 sem serializar, apenas com a consulta do validador."""
+        response = self.client.get(self.url_list)
+        self.assertIn("ETag", response)
+        self.assertNotIn("Last-Modified", response)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                self.url_list, HTTP_IF_NONE_MATCH=response["ETag"]
+            )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+
+    def test_if_modified_since(self):
+        """Testa o 304 a partir do Last-Modified, que só o detalhe envia."""
+        url_detail = reverse(
+            "professional-detail", kwargs={"pk": self.professional.pk}
+        )
+        response = self.client.get(url_detail)
+
+        response = self.client.get(
+            url_detail, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_listagem_ignora_if_modified_since(self):
+        """Testa que remover um profissional antigo não gera 304 na listagem."""
+        since = self.client.get(
+            reverse("professional-detail", kwargs={"pk": self.professional.pk})
+        )["Last-Modified"]
+        self.professional.delete()
+
+        response = self.client.get(self.url_list, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 2)
+
+    def test_corpo_servido_do_cache(self):
+        """Testa que a segunda requisição usa o corpo renderizado em cache."""
+        first = self.client.get(
+            self.url_list, {"profession": self.professional.profession}
+        )
+
+        with self.assertNumQueries(1):
+            second = self.client.get(
+                self.url_list, {"profession": self.professional.profession}
+            )
+        self.assertFalse(hasattr(second, "data"))
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second["ETag"], first["ETag"])
+
+    def test_escrita_invalida_etag(self):
+        """Testa que alterar ou remover um profissional muda a ETag."""
+        etag = self.client.get(self.url_list)["ETag"]
+        url_detail = reverse(
+            "professional-detail", kwargs={"pk": self.professional.pk}
+        )
+        self.client.patch(url_detail, {"preferred_name": "Dra. Ana"}, format="json")
+
+        response = self.client.get(self.url_list, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("Dra. Ana", response.content.decode())
+        self.assertNotEqual(response["ETag"], etag)
+
+        etag = response["ETag"]
+        self.client.delete(url_detail)
+        response = self.client.get(self.url_list, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 2)
+
+
+@pytest.mark.api
+@override_settings(PROFESSIONAL_CACHE_SHARED=True)
+class ProfessionalPayloadCacheTestCase(APITestCase):
+    """Testes para o cache de payloads dos profissionais (compartilhado)."""
+
+    def setUp(self):
+        """Configuração inicial para os testes."""
+        cache.clear()
+        self.professional = ProfessionalFactory(preferred_name="Dra. Ana")
+        self.other = ProfessionalFactory()
+
+    def test_acertos_e_faltas(self):
+        """Testa a leitura em lote, com uma consulta só para as faltas."""
+        ids = [self.professional.id, self.other.id]
+        hits, misses = professional_cache.hits, professional_cache.misses
+
+        with self.assertNumQueries(1):
+            payloads = professional_cache.get_many(ids + [999999])
+        with self.assertNumQueries(0):
+            self.assertEqual(professional_cache.get_many(ids), payloads)
+
+        self.assertEqual(set(payloads), set(ids))
+        self.assertEqual(
+            payloads[self.professional.id]["preferred_name"], "Dra. Ana"
+        )
+        self.assertEqual(professional_cache.hits - hits, 2)
+        self.assertEqual(professional_cache.misses - misses, 3)
+
+    def test_escrita_atualiza_o_cache(self):
+        """Testa o write-through após o commit e a remoção na exclusão."""
+        professional_cache.get(self.professional.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.professional.preferred_name = "Dra. Ana Lima"
+            self.professional.save()
+
+        with self.assertNumQueries(0):
+            payload = professional_cache.get(self.professional.id)
+        self.assertEqual(payload["preferred_name"], "Dra. Ana Lima")
+
+        pk = self.professional.id
+        with self.captureOnCommitCallbacks(execute=True):
+            self.professional.delete()
+        self.assertIsNone(professional_cache.get(pk))
+
+    def test_chave_estrangeira_da_consulta_pelo_cache(self):
+        """Testa que criar uma consulta não busca o profissional no banco."""
+        professional_cache.get(self.professional.id)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                reverse("appointment-list"),
+                {
+                    "professional": self.professional.id,
+                    "date": "2030-01-07T10:00:00Z",
+                },
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            response.data["professional_data"]["preferred_name"], "Dra. Ana"
+        )
+        for query in queries:
+            self.assertNotIn("professionals_professional", query["sql"])
+
+        response = self.client.post(
+            reverse("appointment-list"),
+            {"professional": 999999, "date": "2030-01-07T11:00:00Z"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("professional", response.data)
+
+    @override_settings(PROFESSIONAL_CACHE_SHARED=False)
+    def test_cache_por_processo_le_payloads_do_banco(self):
+        """
+        Testa que, sem cache compartilhado, `professional_data` não usa uma
+        entrada velha deste processo após a edição feita por outro.
+        """
+        appointment = AppointmentFactory(professional=self.professional)
+        professional_cache.store(self.professional)
+        # Edição em outro worker: o cache deste processo não é invalidado
+        Professional.objects.filter(pk=self.professional.id).update(
+            preferred_name="Dra. Ana Lima"
+        )
+
+        response = self.client.get(
+            reverse("appointment-detail", args=[appointment.pk])
+        )
+
+        self.assertEqual(
+            response.data["professional_data"]["preferred_name"], "Dra. Ana Lima"
+        )
+
+    @override_settings(PROFESSIONAL_CACHE_SHARED=False)
+    def test_cache_por_processo_valida_chave_estrangeira_no_banco(self):
+        """
+        Testa que, sem cache compartilhado, um profissional excluído por
+        outro processo (ainda no cache deste) é rejeitado em `professional`.
+        """
+        professional_cache.get(self.other.id)
+        Professional.objects.filter(pk=self.other.id).delete()
+        professional_cache.store(self.other)
+
+        response = self.client.post(
+            reverse("appointment-list"),
+            {"professional": self.other.id, "date": "2030-01-07T10:00:00Z"},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("professional", response.data)
+        self.assertNotIn("date", response.data)
+        self.assertFalse(
+            is_double_booking(IntegrityError("FOREIGN KEY constraint failed"))
+        )
+
+
+@pytest.mark.api
+class ProfessionalAvailabilityTestCase(APITestCase):
+    """Testes para a consulta de horários livres."""
+
+    def setUp(self):
+        """Cria um profissional com consultas em um dia futuro."""
+        self.tz = ZoneInfo("America/Sao_Paulo")
+        self.professional = ProfessionalFactory()
+        AppointmentFactory(
+            professional=self.professional,
+            date=datetime(2030, 1, 15, 10, 0, tzinfo=self.tz),
+        )
+        AppointmentFactory(
+            professional=self.professional,
+            date=datetime(2030, 1, 15, 14, 15, tzinfo=self.tz),
+        )
+        self.url = reverse(
+            "professional-availability", kwargs={"pk": self.professional.pk}
+        )
+
+    def test_horarios_livres_do_dia(self):
+        """Testa que slots ocupados ou sobrepostos não são retornados."""
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, {"start_date": "2030-01-15"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["slot_minutes"], 30)
+        self.assertEqual(len(response.data["days"]), 1)
+
+        slots = response.data["days"][0]["slots"]
+        self.assertEqual(slots[0], "08:00")
+        self.assertEqual(slots[-1], "17:30")
+        self.assertNotIn("10:00", slots)
+        self.assertIn("10:30", slots)
+        self.assertNotIn("14:00", slots)
+        self.assertNotIn("14:30", slots)
+        self.assertEqual(len(slots), 17)
+
+    def test_periodo_e_tamanho_do_slot(self):
+        """Testa o período de vários dias com slots de uma hora."""
+        response = self.client.get(
+            self.url,
+            {
+                "start_date": "2030-01-14",
+                "end_date": "2030-01-16",
+                "slot_minutes": 60,
+            },
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        days = {day["date"]: day["slots"] for day in response.data["days"]}
+        self.assertEqual(len(days["2030-01-14"]), 10)
+        self.assertEqual(len(days["2030-01-16"]), 10)
+        self.assertEqual(
+            days["2030-01-15"],
+            ["08:00", "09:00", "11:00", "12:00", "13:00",
+             "15:00", "16:00", "17:00"],
+        )
+
+    def test_parametros_invalidos(self):
+        """Testa a validação do período consultado."""
+        response = self.client.get(
+            self.url, {"start_date": "2030-01-15", "end_date": "2030-01-10"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("end_date", response.data)
+
+        response = self.client.get(
+            self.url, {"start_date": "2030-01-01", "end_date": "2030-03-01"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("start_date", response.data)
+
+    def test_disponibilidade_em_lote(self):
+        """Testa a consulta de vários profissionais em uma única chamada."""
+        other = ProfessionalFactory()
+        ids = f"{self.professional.id},{other.id},999999"
+
+        with self.assertNumQueries(2):
+            response = self.client.get(
+                reverse("professional-availability-batch"),
+                {"start_date": "2030-01-15", "professionals": ids},
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        by_id = {item["professional"]: item for item in response.data}
+        self.assertEqual(set(by_id), {self.professional.id, other.id})
+        self.assertEqual(len(by_id[other.id]["days"][0]["slots"]), 20)
+        self.assertEqual(
+            len(by_id[self.professional.id]["days"][0]["slots"]), 17
+        )
+
+
+class TwoPerPagePagination(PageNumberPagination):
+    page_size = 2
+
+
+@pytest.mark.api
+class ProfessionalAsyncViewTestCase(APITestCase):
+    """Testes para list/retrieve assíncronos (ASYNC_VIEWS)."""
+
+    def setUp(self):
+        """Configuração inicial para os testes."""
+        cache.clear()
+        self.professionals = ProfessionalFactory.create_batch(3)
+        self.url_list = reverse("professional-list")
+
+    def get(self, actions, url, **kwargs):
+        """Respostas (assíncrona, síncrona) da mesma requisição."""
+        initkwargs = {"pagination_class": TwoPerPagePagination}
+        with override_settings(ASYNC_VIEWS=True):
+            view = ProfessionalViewSet.as_view(actions, **initkwargs)
+        async_response = async_to_sync(view)(AsyncRequestFactory().get(url), **kwargs)
+        async_response.render()
+
+        cache.clear()
+        view = ProfessionalViewSet.as_view(actions, **initkwargs)
+        sync_response = view(APIRequestFactory().get(url), **kwargs)
+        sync_response.render()
+        return async_response, sync_response
+
+    def test_listagem_paginada_igual_a_sincrona(self):
+        """Testa a paginação por página com acount() e iteração assíncrona."""
+        async_response, sync_response = self.get(
+            {"get": "list"}, f"{self.url_list}?page=2"
+        )
+        self.assertEqual(async_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            json.loads(async_response.content), json.loads(sync_response.content)
+        )
+        self.assertEqual(json.loads(async_response.content)["count"], 3)
+
+        async_response, _ = self.get({"get": "list"}, f"{self.url_list}?page=9")
+        self.assertEqual(async_response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_detalhe_igual_ao_sincrono(self):
+        """Testa o detalhe lido com aget()."""
+        professional = self.professionals[0]
+        url = reverse("professional-detail", args=[professional.pk])
+        async_response, sync_response = self.get(
+            {"get": "retrieve"}, url, pk=professional.pk
+        )
+        self.assertEqual(async_response.content, sync_response.content)
+
+
 @pytest.mark.unit
 class ProfessionalModelTestCase(APITestCase):
     """Testes unitários para o modelo Professional."""
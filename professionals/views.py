@@ -1,15 +1,44 @@
 from rest_framework import viewsets, filters
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from drf_spectacular.utils import extend_schema
+from appointments.availability import compute_availability
+from appointments.serializers import (
+    AvailabilityQuerySerializer,
+    BatchAvailabilityQuerySerializer,
+)
+from core.search import FullTextSearchFilter
+from core.mixins import (
+    AsyncReadMixin,
+    ConditionalGetMixin,
+    FastListMixin,
+    MessagePackMixin,
+    SparseFieldsMixin,
+    StreamingExportMixin,
+)
+from .autocomplete import professional_index
 from .models import Professional
-from .serializers import ProfessionalSerializer
+from .serializers import AutocompleteQuerySerializer, ProfessionalSerializer
 
 
-class ProfessionalViewSet(viewsets.ModelViewSet):
+class ProfessionalViewSet(
+    ConditionalGetMixin,
+    MessagePackMixin,
+    SparseFieldsMixin,
+    StreamingExportMixin,
+    FastListMixin,
+    AsyncReadMixin,
+    viewsets.ModelViewSet,
+):
     """
     API endpoint para visualização e edição de profissionais.
 
     list:
-    Retorna uma lista de todos os profissionais.
+    Retorna uma lista de todos os profissionais. Com `?format=ndjson` ou
+    `?format=csv` exporta os profissionais filtrados em streaming.
+    No PostgreSQL, `?search=` ignora acentos e ordena por relevância.
+    Responde com `ETag` e aceita `If-None-Match` (304).
 
     create:
     Cria um novo profissional.
@@ -25,16 +54,108 @@ class ProfessionalViewSet(viewsets.ModelViewSet):
 
     destroy:
     Remove um profissional específico.
+
+    availability:
+    Retorna os horários livres de um profissional no período.
+
+    batch_availability:
+    Retorna os horários livres de vários profissionais no período.
+
+    autocomplete:
+    Sugere profissionais pelo prefixo do nome ou da especialidade.
     """
 
-    queryset = Professional.objects.all()
+    queryset = Professional.objects.defer("search_vector")
     serializer_class = ProfessionalSerializer
+    # A busca vem depois da ordenação para priorizar a relevância
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
         filters.OrderingFilter,
+        FullTextSearchFilter,
     ]
     filterset_fields = ["profession"]
     search_fields = ["preferred_name", "profession", "address", "contact"]
+    search_vector_field = "search_vector"
+    search_trigram_fields = ["preferred_name", "profession"]
+    search_exact_fields = ["contact"]
     ordering_fields = ["preferred_name", "profession"]
     ordering = ["preferred_name"]
+    fast_list = True
+
+    @extend_schema(parameters=[AvailabilityQuerySerializer])
+    @action(detail=True, methods=["get"])
+    def availability(self, request, pk=None):
+        """
+        Retorna os horários livres de um profissional.
+        """
+        professional = self.get_object()
+        params = AvailabilityQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        query = params.validated_data
+
+        availability = compute_availability(
+            [professional.id],
+            query["start_date"],
+            query["end_date"],
+            query["slot_minutes"],
+        )
+        return Response(
+            {
+                "professional": professional.id,
+                "slot_minutes": query["slot_minutes"],
+                "days": availability[professional.id],
+            }
+        )
+
+    @extend_schema(
+        operation_id="professionals_availability_batch",
+        parameters=[BatchAvailabilityQuerySerializer],
+    )
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="availability",
+        url_name="availability-batch",
+    )
+    def batch_availability(self, request):
+        """
+        Retorna os horários livres de vários profissionais.
+        """
+        params = BatchAvailabilityQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        query = params.validated_data
+
+        professional_ids = list(
+            Professional.objects.filter(
+                id__in=query["professionals"]
+            ).values_list("id", flat=True)
+        )
+        availability = compute_availability(
+            professional_ids,
+            query["start_date"],
+            query["end_date"],
+            query["slot_minutes"],
+        )
+        return Response(
+            [
+                {
+                    "professional": professional_id,
+                    "slot_minutes": query["slot_minutes"],
+                    "days": availability[professional_id],
+                }
+                for professional_id in professional_ids
+            ]
+        )
+
+    @extend_schema(parameters=[AutocompleteQuerySerializer])
+    @action(detail=False, methods=["get"])
+    def autocomplete(self, request):
+        """
+        Retorna `(id, preferred_name, specialty)` dos profissionais cujo nome
+        ou especialidade começa por `q`, a partir do índice em memória.
+        """
+        params = AutocompleteQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        query = params.validated_data
+
+        return Response(professional_index.search(query["q"], query["limit"]))